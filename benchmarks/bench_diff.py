@@ -0,0 +1,73 @@
+"""Time of report.diff on a 500-page report against itself and a one-word edit.
+
+    python benchmarks/bench_diff.py [--pages 500] [--ceiling-s 2]
+
+The report is the built-in one followed by an appendix section every 20
+pages (about 40 paragraphs a page, from bench_stream.py) and a bookings
+table.  The second copy changes one word in the middle and is stored
+uncompressed, so its zip differs throughout.  Exits with status 1 when a
+diff takes longer than the ceiling or misses the edit.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report.content import default_spec  # noqa: E402
+from report.diff import diff_documents  # noqa: E402
+from report.stream import stream_report  # noqa: E402
+
+from bench_stream import appendix, bookings  # noqa: E402
+
+PARAGRAPHS_PER_PAGE = 40
+PAGES_PER_SECTION = 20
+
+
+def build(pages, edit=False, compresslevel=6):
+    spec = default_spec()
+    n = pages * PARAGRAPHS_PER_PAGE
+    per_section = PAGES_PER_SECTION * PARAGRAPHS_PER_PAGE
+    blocks = list(appendix(n))
+    if edit:
+        i = next(i for i in range(n // 2, n) if blocks[i]['type'] == 'text')
+        blocks[i] = dict(blocks[i], text=blocks[i]['text'].replace('le passé', 'le futur'))
+    for i in range(0, len(blocks), per_section):
+        spec['sections'].append({'id': f'annexe-{i // per_section}',
+                                 'blocks': blocks[i:i + per_section]})
+    spec['sections'].append({'id': 'bookings', 'blocks': [{
+        'type': 'table', 'headers': ['Réservation', 'Destination', 'Voyageur', 'Prix'],
+        'rows': list(bookings(pages * 4))}]})
+    buf = io.BytesIO()
+    stream_report(spec, buf, compresslevel=compresslevel)
+    return buf.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--ceiling-s', type=float, default=2)
+    args = parser.parse_args(argv)
+
+    reference = build(args.pages)
+    edited = build(args.pages, edit=True, compresslevel=0)
+    ok = True
+    for name, other, expected in (('same', reference, False), ('edited', edited, True)):
+        start = time.perf_counter()
+        report = diff_documents(reference, other)
+        elapsed = time.perf_counter() - start
+        ok &= elapsed <= args.ceiling_s and bool(report) == expected
+        print(f'{name:>6}  {elapsed:5.2f}s  {report.summary()}')
+        for line in report.lines(5):
+            print(f'        {line}')
+    with zipfile.ZipFile(io.BytesIO(reference)) as zf:
+        size = zf.getinfo('word/document.xml').file_size
+    print(f'{args.pages} pages, document.xml {size / 2**20:.1f} MiB (ceiling {args.ceiling_s} s)')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
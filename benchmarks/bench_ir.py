@@ -0,0 +1,92 @@
+"""Memory per paragraph: python-docx document vs the compact model (ir.py).
+
+    python benchmarks/bench_ir.py [--paragraphs 5000] [--min-ratio 5]
+
+Each model holds the same long report (the appendix of bench_stream.py)
+before saving.  Most of a python-docx document lives in libxml2, which
+tracemalloc does not see, so each model is built in a fresh process and
+measured by its resident set growth.  Building the python-docx document is
+quadratic (each paragraph is inserted before the section properties,
+found by a scan), hence the modest default.  The IR is then saved to check the
+lowering time.  Exits with status 1 when the proxy path does not take at
+least ``--min-ratio`` times the IR's memory per paragraph.
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stream import _Sink, appendix  # noqa: E402
+
+
+def _rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _measure(model, n, queue):
+    from report.build import render_block
+    from report.ir import IRDocument
+    from report.template import new_document
+    # Import and load the template outside the measurement, without freeing
+    # memory the model would then reuse unseen.
+    for doc, add in ((new_document(), render_block), (IRDocument(), IRDocument.add_block)):
+        for block in appendix(3):
+            add(doc, block)
+    gc.collect()
+    before = _rss()
+    start = time.perf_counter()
+    if model == 'proxy':
+        doc = new_document()
+        for block in appendix(n):
+            render_block(doc, block)
+    else:
+        doc = IRDocument()
+        for block in appendix(n):
+            doc.add_block(block)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    used = _rss() - before
+    save = None
+    if model == 'ir':
+        start = time.perf_counter()
+        doc.save(_Sink())
+        save = time.perf_counter() - start
+    queue.put((used, elapsed, save))
+
+
+def measure(model, n):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(model, n, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paragraphs', type=int, default=5_000)
+    parser.add_argument('--min-ratio', type=float, default=5)
+    args = parser.parse_args(argv)
+
+    n = args.paragraphs
+    print(f'{"model":>6}  {"build s":>7}  {"MiB":>7}  {"B/para":>7}  save s')
+    per_para = {}
+    for model in ('proxy', 'ir'):
+        used, elapsed, save = measure(model, n)
+        per_para[model] = used / n
+        print(f'{model:>6}  {elapsed:>7.2f}  {used / 2**20:>7.1f}  {used / n:>7.0f}  '
+              f'{"" if save is None else f"{save:.2f}"}')
+    ratio = per_para['proxy'] / max(per_para['ir'], 1)
+    print(f'ratio {ratio:.1f}x (minimum {args.min_ratio}x)')
+    return 0 if ratio >= args.min_ratio else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Merge time and peak memory against the number of reports merged.
+
+    python benchmarks/bench_merge.py [--documents 1000] [--ceiling-mb 32]
+
+The inputs are booking confirmations from report.mailmerge, and every
+tenth one is the full built-in report (screenshots included, if any), so
+styles, lists and media are shared between inputs.  They are merged by
+quarters of ``--documents``: the time per document should stay flat
+(linear merge) and the tracemalloc peak should not grow with the count.
+Exits with status 1 when the peak exceeds the ceiling.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report.build import build_report  # noqa: E402
+from report.content import default_spec  # noqa: E402
+from report.mailmerge import DESTINATIONS, mail_merge  # noqa: E402
+from report.merge import merge_documents  # noqa: E402
+
+from bench_stream import _Sink  # noqa: E402
+
+
+def records(n):
+    destinations = list(DESTINATIONS)
+    for i in range(n):
+        yield {'id': f'{i:07d}', 'destination': destinations[i % 3],
+               'departureDate': '2026-03-14', 'duration': '7', 'travelers': '2',
+               'firstName': f'Voyageur{i}', 'lastName': 'Martin',
+               'email': f'v{i}@example.com', 'phone': '0600000000'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=1000)
+    parser.add_argument('--ceiling-mb', type=float, default=32)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix='bench-merge-')
+    try:
+        mail_merge(records(args.documents), tmp)
+        names = sorted(os.listdir(tmp))
+        report = os.path.join(tmp, 'report.docx')
+        build_report(default_spec(), report)
+        paths = [report if i % 10 == 0 else os.path.join(tmp, name)
+                 for i, name in enumerate(names)]
+
+        print(f'{"documents":>9}  {"s":>6}  {"ms/doc":>7}  {"MiB out":>8}  {"peak MiB":>8}  merge')
+        worst = 0.0
+        for count in sorted({max(1, args.documents * k // 4) for k in range(1, 5)}):
+            sink = _Sink()
+            tracemalloc.start()
+            start = time.perf_counter()
+            stats = merge_documents(paths[:count], sink)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            worst = max(worst, peak)
+            print(f'{count:>9}  {elapsed:>6.2f}  {elapsed / count * 1000:>7.2f}  '
+                  f'{sink.size / 2**20:>8.1f}  {peak:>8.1f}  {stats}')
+    finally:
+        shutil.rmtree(tmp)
+    print(f'peak {worst:.1f} MiB (ceiling {args.ceiling_mb} MiB)')
+    return 0 if worst <= args.ceiling_mb else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
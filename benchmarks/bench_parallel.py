@@ -0,0 +1,97 @@
+"""Wall time of a long report rendered with -j 1 and -j N (parallel.py).
+
+    python benchmarks/bench_parallel.py [--pages 500] [--jobs 4]
+
+The report is the one of bench_diff.py: the built-in report, an appendix
+section every 20 pages and a bookings table of 4 rows a page.  Every
+slice parallel.py would hand out is first rendered and timed in this
+process; scheduling those times on ``--jobs`` workers gives the wall time
+the slicing allows (the speed-up bound on that many idle cores, pool
+start-up aside).  Both builds are then timed for real, without the
+fragment cache, and must give the same bytes.  On a machine with fewer
+cores than ``--jobs`` the measured -j N time cannot show the speed-up.
+Exits with status 1 when the two packages differ.
+"""
+import argparse
+import heapq
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report.incremental import _Assembler, build_incremental  # noqa: E402
+from report.parallel import slices  # noqa: E402
+from report.template import base_template  # noqa: E402
+
+from bench_diff import PAGES_PER_SECTION, PARAGRAPHS_PER_PAGE  # noqa: E402
+from bench_stream import appendix, bookings  # noqa: E402
+
+
+def spec(pages):
+    from report.content import default_spec
+    spec = default_spec()
+    blocks = list(appendix(pages * PARAGRAPHS_PER_PAGE))
+    per_section = PAGES_PER_SECTION * PARAGRAPHS_PER_PAGE
+    for i in range(0, len(blocks), per_section):
+        spec['sections'].append({'id': f'annexe-{i // per_section}',
+                                 'blocks': blocks[i:i + per_section]})
+    spec['sections'].append({'id': 'bookings', 'blocks': [{
+        'type': 'table', 'headers': ['Réservation', 'Destination', 'Voyageur', 'Prix'],
+        'rows': [list(row) for row in bookings(pages * 4)]}]})
+    return spec
+
+
+def slice_times(sections, jobs):
+    assembler = _Assembler(base_template())
+    times = []
+    for _, (kind, args) in slices(sections, jobs):
+        start = time.perf_counter()
+        if kind == 'rows':
+            assembler.render_rows(*args)
+        else:
+            assembler.render({'id': 'slice', 'blocks': args})
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def makespan(times, jobs):
+    """Wall time of ``times`` handed out in order to the first free of ``jobs`` workers."""
+    free = [0.0] * jobs
+    for t in times:
+        heapq.heappush(free, heapq.heappop(free) + t)
+    return max(free)
+
+
+def build(report, jobs):
+    buf = io.BytesIO()
+    start = time.perf_counter()
+    build_incremental(report, buf, cache=False, jobs=jobs)
+    return time.perf_counter() - start, buf.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--jobs', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    report = spec(args.pages)
+    times = slice_times(report['sections'], args.jobs)
+    serial, bound = sum(times), makespan(times, args.jobs)
+    print(f'{args.pages} pages, {len(times)} slices, largest {max(times):.2f}s of {serial:.2f}s')
+    print(f'slicing allows {serial / bound:.2f}x on {args.jobs} workers '
+          f'({serial:.2f}s -> {bound:.2f}s)')
+    one, reference = build(report, 1)
+    many, data = build(report, args.jobs)
+    print(f'measured: -j 1 {one:.2f}s, -j {args.jobs} {many:.2f}s ({one / many:.2f}x) '
+          f'on {os.cpu_count()} CPU(s)')
+    if data != reference:
+        print('packages differ')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Save time and file size: fastsave.save_document() against Document.save().
+
+    python benchmarks/bench_save.py [--rows 20000] [--repeat 3] [--workers 4]
+
+The document is the built-in report followed by a dark table of ``--rows``
+bookings.  Each variant saves to a BytesIO; times are the best of
+``--repeat`` runs.  Every output is reopened with python-docx as a check.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+
+from report.build import render_spec  # noqa: E402
+from report.content import default_spec  # noqa: E402
+from report.fastsave import save_document  # noqa: E402
+from report.tables import add_dark_table  # noqa: E402
+from report.template import new_document  # noqa: E402
+
+HEADERS = ['Réservation', 'Destination', 'Voyageur', 'Départ', 'Prix']
+
+
+def bookings(n):
+    destinations = ('Paris 1889', 'Crétacé', 'Florence 1504')
+    prices = ('12 500 €', '18 900 €', '14 200 €')
+    for i in range(n):
+        k = i % 3
+        yield (f'TT-{i:07d}', destinations[k], f'Voyageur {i}', '2026-03-14', prices[k])
+
+
+def best(fn, repeat):
+    times, out = [], None
+    for _ in range(repeat):
+        buf = io.BytesIO()
+        start = time.perf_counter()
+        fn(buf)
+        times.append(time.perf_counter() - start)
+        out = buf
+    return min(times), out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    doc = render_spec(new_document(), default_spec())
+    add_dark_table(doc, HEADERS, bookings(args.rows))
+
+    variants = [
+        ('Document.save()', lambda buf: doc.save(buf)),
+        ('save_document level 6, 1 thread',
+         lambda buf: save_document(doc, buf, 6, workers=1)),
+        (f'save_document level 6, {args.workers} threads',
+         lambda buf: save_document(doc, buf, 6, workers=args.workers)),
+        (f'save_document level 1, {args.workers} threads',
+         lambda buf: save_document(doc, buf, 1, workers=args.workers)),
+        (f'save_document stored, {args.workers} threads',
+         lambda buf: save_document(doc, buf, 0, workers=args.workers)),
+    ]
+    print(f'{args.rows} rows, {os.cpu_count()} CPU')
+    print(f'{"variant":<36}  {"ms":>8}  {"KiB":>8}  {"vs save()":>9}')
+    reference = None
+    for label, fn in variants:
+        seconds, buf = best(fn, args.repeat)
+        Document(io.BytesIO(buf.getvalue()))
+        reference = reference or seconds
+        print(f'{label:<36}  {seconds * 1000:>8.0f}  {len(buf.getvalue()) / 1024:>8.0f}  '
+              f'{reference / seconds:>8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Peak memory of the streaming writer on a very long report.
+
+    python benchmarks/bench_stream.py [--paragraphs 1000000] [--ceiling-mb 16]
+
+Exits with status 1 when the tracemalloc peak exceeds the ceiling.
+tracemalloc only sees Python allocations, not lxml's or zlib's: the peak
+RSS is checked by tests/test_stream.py.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report.stream import stream_report  # noqa: E402
+from report.template import base_template  # noqa: E402
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that only counts bytes, so the output is not kept."""
+
+    def __init__(self):
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.size += len(b)
+        return len(b)
+
+
+def appendix(n):
+    for i in range(n):
+        if i % 1000 == 0:
+            yield {'type': 'heading', 'text': f'Annexe {i // 1000 + 1}', 'level': 2}
+            yield {'type': 'divider'}
+        if i % 3 == 0:
+            yield {'type': 'bullet', 'text': f'Réservation TT-{i:07d} — Paris 1889'}
+        else:
+            yield {'type': 'text', 'text': f'Transcription Chronos n°{i} : le passé n’attend que vous.'}
+
+
+def bookings(n):
+    for i in range(n):
+        yield (f'TT-{i:07d}', 'Florence 1504', f'Voyageur {i}', '14 200 €')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paragraphs', type=int, default=1_000_000)
+    parser.add_argument('--table-rows', type=int, default=100_000)
+    parser.add_argument('--ceiling-mb', type=float, default=16)
+    args = parser.parse_args(argv)
+
+    base_template()  # compile/load the theme outside the measurement
+    spec = {'sections': [
+        {'id': 'appendix', 'blocks': appendix(args.paragraphs)},
+        {'id': 'bookings', 'blocks': iter([{
+            'type': 'table', 'headers': ['Réservation', 'Destination', 'Voyageur', 'Prix'],
+            'rows': bookings(args.table_rows)}])},
+    ]}
+    sink = _Sink()
+    tracemalloc.start()
+    start = time.perf_counter()
+    stream_report(spec, sink)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+
+    print(f'{args.paragraphs:,} paragraphs + {args.table_rows:,} table rows in {elapsed:.1f}s, '
+          f'{sink.size / 2**20:.1f} MiB written, peak {peak:.1f} MiB (ceiling {args.ceiling_mb} MiB)')
+    return 0 if peak <= args.ceiling_mb else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
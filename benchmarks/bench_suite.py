@@ -0,0 +1,224 @@
+"""Benchmark suite for the document pipeline, with a JSON baseline.
+
+    python benchmarks/bench_suite.py [--sizes 100,1000,5000] [--cases add_bullet,save]
+    python benchmarks/bench_suite.py --save baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json [--threshold 0.25]
+
+Each case runs at every size and records its best wall time over
+``--repeat`` runs, the tracemalloc peak of one extra run and the size of
+the saved .docx.  tracemalloc only sees Python allocations: memory lxml
+allocates for the XML tree itself is not in ``peak_kib``.
+
+``--compare`` exits with status 1 when a metric is more than
+``--threshold`` (relative) above the baseline.  Timings depend on the
+machine: compare against a baseline saved on the same one.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx  # noqa: E402
+
+from report import helpers, theme  # noqa: E402
+from report.build import render_spec  # noqa: E402
+from report.content import default_spec  # noqa: E402
+from report.template import new_document  # noqa: E402
+
+# Bump when a case changes what it measures: baselines of another version
+# are refused by --compare.
+SUITE_VERSION = 1
+
+METRICS = ('seconds', 'peak_kib', 'output_kib')
+
+HEADERS = ['Réservation', 'Destination', 'Voyageur', 'Départ', 'Prix']
+
+
+def bookings(n):
+    destinations = ('Paris 1889', 'Crétacé', 'Florence 1504')
+    for i in range(n):
+        yield (f'TT-{i:07d}', destinations[i % 3], f'Voyageur {i}', '2026-03-14', '12 500 €')
+
+
+# Each case is (setup, run): setup(n) builds the input outside the timed
+# region and returns the argument of run(), which returns the document.
+
+def _cells(n):
+    doc = new_document()
+    table = doc.add_table(rows=max(1, n // 5), cols=5)
+    return doc, [cell for row in table.rows for cell in row.cells][:n]
+
+
+def _set_cell_bg(arg):
+    doc, cells = arg
+    bands = theme.TABLE_ROW_BG
+    for i, cell in enumerate(cells):
+        helpers.set_cell_bg(cell, bands[i % 2])
+    return doc
+
+
+def _add_body_text(n):
+    doc = new_document()
+    for i in range(n):
+        helpers.add_body_text(doc, f'Paragraphe {i} : le voyage temporel en toute sécurité.')
+    return doc
+
+
+def _add_bullet(n):
+    doc = new_document()
+    for i in range(n):
+        helpers.add_bullet(doc, f'Réservation TT-{i:07d} confirmée')
+    return doc
+
+
+def _make_dark_table(n):
+    doc = new_document()
+    helpers.make_dark_table(doc, HEADERS, list(bookings(n)))
+    return doc
+
+
+def _build(n):
+    # n / 10 sections taken in turn from the built-in report (at least all of them).
+    sections = default_spec()['sections']
+    count = max(len(sections), n // 10)
+    return render_spec(new_document(), {'sections': [sections[i % len(sections)]
+                                                     for i in range(count)]})
+
+
+def _save_setup(n):
+    doc = new_document()
+    for i in range(n):
+        helpers.add_body_text(doc, f'Paragraphe {i} : le voyage temporel en toute sécurité.')
+    return doc
+
+
+def _save(doc):
+    doc.save(io.BytesIO())
+    return doc
+
+
+CASES = {
+    'set_cell_bg': (_cells, _set_cell_bg),
+    'add_body_text': (int, _add_body_text),
+    'add_bullet': (int, _add_bullet),
+    'make_dark_table': (int, _make_dark_table),
+    'build': (int, _build),
+    'save': (_save_setup, _save),
+}
+
+
+def _output_kib(doc):
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.tell() / 1024
+
+
+def measure(case, n, repeat):
+    setup, run = CASES[case]
+    best = math.inf
+    for _ in range(repeat):
+        arg = setup(n)
+        start = time.perf_counter()
+        doc = run(arg)
+        best = min(best, time.perf_counter() - start)
+
+    arg = setup(n)
+    tracemalloc.start()
+    try:
+        doc = run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_kib': peak / 1024, 'output_kib': _output_kib(doc)}
+
+
+def run_suite(cases, sizes, repeat, log=sys.stdout):
+    results = {}
+    print(f'{"case":<16} {"n":>7} {"seconds":>9} {"us/item":>9} {"peak KiB":>10} '
+          f'{"out KiB":>9} {"slope":>6}', file=log)
+    for case in cases:
+        prev = None
+        for n in sizes:
+            r = measure(case, n, repeat)
+            results[f'{case}/{n}'] = r
+            # Scaling exponent against the previous size: 1.0 is linear.
+            slope = ''
+            if prev is not None and prev[1]['seconds'] > 0:
+                slope = f'{math.log(r["seconds"] / prev[1]["seconds"]) / math.log(n / prev[0]):.2f}'
+            print(f'{case:<16} {n:>7} {r["seconds"]:>9.4f} {r["seconds"] / n * 1e6:>9.1f} '
+                  f'{r["peak_kib"]:>10.0f} {r["output_kib"]:>9.1f} {slope:>6}', file=log)
+            prev = (n, r)
+    return results
+
+
+def compare(results, baseline, threshold, log=sys.stdout):
+    """Print the regressions against ``baseline``; return how many there are."""
+    regressions = 0
+    for key, r in results.items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        for metric in METRICS:
+            old, new = base[metric], r[metric]
+            if old > 0 and new > old * (1 + threshold):
+                regressions += 1
+                print(f'REGRESSION {key} {metric}: {old:.4g} -> {new:.4g} '
+                      f'(+{(new / old - 1) * 100:.0f}%)', file=log)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,5000')
+    parser.add_argument('--cases', default=','.join(CASES),
+                        help=f'comma-separated subset of: {", ".join(CASES)}')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', metavar='JSON', help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='JSON', help='baseline to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed relative increase per metric (default 0.25)')
+    args = parser.parse_args(argv)
+
+    cases = args.cases.split(',')
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f'unknown case(s): {", ".join(unknown)}')
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('version') != SUITE_VERSION:
+            parser.error(f'{args.compare}: baseline version {baseline.get("version")}, '
+                         f'suite version {SUITE_VERSION}')
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    results = run_suite(cases, sizes, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': SUITE_VERSION,
+                'python': platform.python_version(),
+                'python_docx': docx.__version__,
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{regressions} regression(s) above {args.threshold:.0%}')
+            return 1
+        print(f'No regression above {args.threshold:.0%}.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Rows/sec of the bulk table builder against the per-cell proxy version.
+
+    python benchmarks/bench_tables.py [--sizes 1000,10000,100000] [--legacy-max 10000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL  # noqa: E402
+from docx.oxml import parse_xml  # noqa: E402
+from docx.oxml.ns import nsdecls  # noqa: E402
+from docx.shared import Pt  # noqa: E402
+
+from report import theme  # noqa: E402
+from report.helpers import GOLD, WHITE_DIM, set_cell_bg  # noqa: E402
+from report.tables import add_dark_table  # noqa: E402
+from report.template import new_document  # noqa: E402
+
+HEADERS = ['Réservation', 'Destination', 'Voyageur', 'Départ', 'Prix']
+
+
+def legacy_make_dark_table(doc, headers, rows):
+    """The original generate_doc.py implementation: one proxy walk per cell."""
+    table = doc.add_table(rows=1, cols=len(headers))
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    for i, h_text in enumerate(headers):
+        cell = table.rows[0].cells[i]
+        set_cell_bg(cell, theme.TABLE_HEADER_BG)
+        run = cell.paragraphs[0].add_run(h_text)
+        run.font.color.rgb = GOLD
+        run.font.name = theme.HEADING_FONT
+        run.font.size = Pt(10)
+        run.bold = True
+        cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
+    for row_idx, row_data in enumerate(rows):
+        row_cells = table.add_row().cells
+        bg = theme.TABLE_ROW_BG[row_idx % 2]
+        for i, val in enumerate(row_data):
+            cell = row_cells[i]
+            set_cell_bg(cell, bg)
+            run = cell.paragraphs[0].add_run(val)
+            run.font.color.rgb = WHITE_DIM
+            run.font.name = theme.BODY_FONT
+            run.font.size = Pt(9.5)
+            cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
+    table._tbl.tblPr.append(parse_xml(
+        f'<w:tblBorders {nsdecls("w")}>'
+        f'  <w:top w:val="single" w:sz="4" w:space="0" w:color="{theme.TABLE_BORDER}"/>'
+        f'  <w:bottom w:val="single" w:sz="4" w:space="0" w:color="{theme.TABLE_BORDER}"/>'
+        f'  <w:insideH w:val="single" w:sz="2" w:space="0" w:color="{theme.TABLE_INNER_BORDER}"/>'
+        f'  <w:insideV w:val="single" w:sz="2" w:space="0" w:color="{theme.TABLE_INNER_BORDER}"/>'
+        '</w:tblBorders>'
+    ))
+    return table
+
+
+def bookings(n):
+    destinations = ('Paris 1889', 'Crétacé', 'Florence 1504')
+    prices = ('12 500 €', '18 900 €', '14 200 €')
+    for i in range(n):
+        k = i % 3
+        yield (f'TT-{i:07d}', destinations[k], f'Voyageur {i}', '2026-03-14', prices[k])
+
+
+def timed(fn, n):
+    doc = new_document()
+    start = time.perf_counter()
+    fn(doc, HEADERS, bookings(n))
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='skip the proxy version above this many rows')
+    args = parser.parse_args(argv)
+
+    print(f'{"rows":>8}  {"bulk rows/s":>12}  {"proxy rows/s":>12}  {"speedup":>7}')
+    for n in (int(s) for s in args.sizes.split(',')):
+        bulk = timed(add_dark_table, n)
+        line = f'{n:>8}  {n / bulk:>12,.0f}'
+        if n <= args.legacy_max:
+            legacy = timed(legacy_make_dark_table, n)
+            line += f'  {n / legacy:>12,.0f}  {legacy / bulk:>6.1f}x'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""TimeTravel Agency report generator.
+
+python-docx/lxml are only imported when a document is actually built, so
+``import report`` and ``python -m report --help`` stay cheap.
+"""
+from .spec import SpecError, load_spec, validate_spec
+
+__all__ = ['SpecError', 'build_incremental', 'build_report', 'default_spec', 'load_spec',
+           'validate_spec']
+
+_LAZY = {
+    'build_report': 'build',
+    'build_incremental': 'incremental',
+    'default_spec': 'content',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        return getattr(import_module(f'.{_LAZY[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,119 @@
+"""Image pipeline: downscale to print resolution, recompress, cache.
+
+prepare() turns a source image (path or bytes) into the bytes that get
+embedded: scaled down to ``dpi`` at the width it is printed at, then
+re-encoded (PNG optimized, JPEG at JPEG_QUALITY), keeping the source
+when that is not smaller.  Results are memoized in the process and kept
+in the report cache (``assets/``), keyed by the source content and the
+target size, so a rebuild does not touch Pillow again.  prefetch() runs
+prepare() for many images at once in a thread pool (Pillow releases the
+GIL while resizing and encoding).
+
+The output is deterministic, and python-docx stores one media part per
+distinct image content, so an image used several times is embedded once.
+
+Pillow is optional: without it, images are embedded as they are.
+"""
+import hashlib
+import io
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import atomic_write, cache_dir
+
+# Bump when prepare() output changes for the same input.
+PIPELINE_VERSION = 1
+
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+
+EMU_PER_INCH = 914400
+
+_memo = {}
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def read_source(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def image_key(path):
+    """What prepare() output depends on besides the width, cheaply: for cache keys."""
+    st = os.stat(path)
+    Image = _pillow()
+    return [st.st_size, st.st_mtime_ns, PIPELINE_VERSION, Image and Image.__version__]
+
+
+def target_pixels(width_emu, dpi=DEFAULT_DPI):
+    return math.ceil(width_emu / EMU_PER_INCH * dpi)
+
+
+def prepare(source, width_emu, dpi=DEFAULT_DPI):
+    """Bytes of ``source`` ready to embed at ``width_emu`` wide."""
+    data = read_source(source)
+    Image = _pillow()
+    if Image is None:
+        return data
+    pixels = target_pixels(width_emu, dpi)
+    digest = hashlib.sha256(data).hexdigest()
+    key = f'{digest[:32]}-{pixels}-{PIPELINE_VERSION}-{Image.__version__}'
+    if key in _memo:
+        return _memo[key]
+    path = os.path.join(cache_dir('assets'), key)
+    try:
+        with open(path, 'rb') as f:
+            out = f.read()
+    except FileNotFoundError:
+        out = _process(Image, data, pixels)
+        atomic_write(path, out)
+    _memo[key] = out
+    return out
+
+
+def _process(Image, data, pixels):
+    img = Image.open(io.BytesIO(data))
+    fmt = 'JPEG' if img.format in ('JPEG', 'MPO') else 'PNG'
+    if img.width > pixels:
+        img = img.resize((pixels, max(1, round(img.height * pixels / img.width))),
+                         Image.LANCZOS)
+    buf = io.BytesIO()
+    if fmt == 'JPEG':
+        img.convert('RGB').save(buf, 'JPEG', quality=JPEG_QUALITY, optimize=True,
+                                progressive=True)
+    else:
+        if img.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+            img = img.convert('RGBA')
+        img.save(buf, 'PNG', optimize=True)
+    out = buf.getvalue()
+    # Flat screenshots can grow once resampled: then the source is better.
+    return out if len(out) < len(data) else data
+
+
+def image_width(block, max_width):
+    """Printed width (EMU) of an image block: its ``width`` in cm, capped."""
+    width = block.get('width')
+    if width is None:
+        return max_width
+    return min(max_width, int(width * 360000))
+
+
+def prefetch(blocks, max_width, dpi=DEFAULT_DPI, workers=None):
+    """prepare() the images of ``blocks`` in a thread pool."""
+    # The same image twice would be prepared twice at once, into the same entry.
+    jobs = list(dict.fromkeys((b['path'], image_width(b, max_width))
+                              for b in blocks if b['type'] == 'image'))
+    if len(jobs) < 2 or _pillow() is None:
+        return
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda job: prepare(job[0], job[1], dpi), jobs))
@@ -0,0 +1,126 @@
+"""Render a report spec to a python-docx Document."""
+from docx.shared import Cm, Pt, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from . import helpers, theme
+from .trace import span
+from .spec import validate_block, validate_spec
+from .template import ACCENT_STYLE, is_accent, new_document, style_id
+
+ALIGN = {
+    'left': WD_ALIGN_PARAGRAPH.LEFT,
+    'center': WD_ALIGN_PARAGRAPH.CENTER,
+    'right': WD_ALIGN_PARAGRAPH.RIGHT,
+    'justify': WD_ALIGN_PARAGRAPH.JUSTIFY,
+}
+
+
+def _rgb(value):
+    value = theme.resolve_color(value)
+    return RGBColor.from_string(value) if value else None
+
+
+def add_paragraph(doc, runs=(), align=None, space_before=None, space_after=None):
+    p = doc.add_paragraph()
+    if align:
+        p.alignment = ALIGN[align]
+    for r in runs:
+        run = p.add_run(r['text'])
+        if 'size' in r:
+            run.font.size = Pt(r['size'])
+        if is_accent(r.get('font'), theme.resolve_color(r.get('color'))):
+            run._r.get_or_add_rPr().style = style_id(ACCENT_STYLE)
+        else:
+            if r.get('color'):
+                run.font.color.rgb = _rgb(r['color'])
+            if 'font' in r:
+                run.font.name = r['font']
+        if r.get('bold'):
+            run.bold = True
+        if r.get('italic'):
+            run.italic = True
+    if space_before is not None:
+        p.paragraph_format.space_before = Pt(space_before)
+    if space_after is not None:
+        p.paragraph_format.space_after = Pt(space_after)
+    return p
+
+
+def render_block(doc, block):
+    kind = block['type']
+    if kind == 'heading':
+        return helpers.add_styled_heading(doc, block['text'], level=block.get('level', 1))
+    if kind == 'text':
+        return helpers.add_body_text(
+            doc, block['text'], bold=block.get('bold', False), color=_rgb(block.get('color')),
+            size=Pt(block.get('size', theme.BODY_SIZE)), align=ALIGN.get(block.get('align')))
+    if kind == 'bullet':
+        return helpers.add_bullet(doc, block['text'], color=_rgb(block.get('color')))
+    if kind == 'table':
+        return helpers.make_dark_table(doc, block['headers'], block['rows'],
+                                       accent=_rgb(block.get('accent')) or helpers.GOLD)
+    if kind == 'divider':
+        return helpers.add_section_divider(doc)
+    if kind == 'paragraph':
+        return add_paragraph(doc, block.get('runs', ()), block.get('align'),
+                             block.get('space_before'), block.get('space_after'))
+    if kind == 'page_break':
+        return doc.add_page_break()
+    if kind == 'image':
+        width = block.get('width')
+        return helpers.add_image(doc, block['path'], width=Cm(width) if width else None,
+                                 caption=block.get('caption'),
+                                 align=ALIGN[block.get('align', 'center')])
+    raise ValueError(f'unknown block type {kind!r}')
+
+
+def render_section(doc, section):
+    checked = not isinstance(section['blocks'], list)
+    if not checked and any(b['type'] == 'image' for b in section['blocks']):
+        from .assets import prefetch
+        prefetch(section['blocks'], doc._block_width)
+    for block in section['blocks']:
+        if checked:
+            validate_block(block, f'section {section["id"]!r}')
+        render_block(doc, block)
+
+
+def render_spec(doc, spec):
+    for i, section in enumerate(spec['sections']):
+        with span(section['id'], 'section'):
+            if i:
+                doc.add_page_break()
+            render_section(doc, section)
+    return doc
+
+
+def save(doc, out, compresslevel=6):
+    """Save ``doc`` to a path, a binary file object, or ``'-'`` for stdout.
+
+    Parts are serialized and compressed in parallel (see fastsave.py);
+    ``compresslevel=0`` stores them, for drafts.
+    """
+    from .fastsave import save_document
+    with span('save', 'package'):
+        save_document(doc, out, compresslevel)
+
+
+def build_report(spec, out=None, stream=False, optimize=False):
+    """Build the report described by ``spec`` and save it to ``out`` if given.
+
+    Returns the python-docx Document.  With ``stream=True`` the document is
+    written to ``out`` while it is rendered (see stream.py) and nothing is
+    returned.  ``optimize=True`` runs the optimize.py pass before saving.
+    """
+    if stream:
+        from .stream import stream_report
+        stream_report(spec, out, optimize=optimize)
+        return None
+    validate_spec(spec)
+    doc = render_spec(new_document(), spec)
+    if optimize:
+        from .optimize import optimize as optimize_doc
+        optimize_doc(doc)
+    if out is not None:
+        save(doc, out)
+    return doc
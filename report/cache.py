@@ -0,0 +1,65 @@
+"""On-disk cache location shared by the report build steps."""
+import os
+import tempfile
+from contextlib import contextmanager
+
+CACHE_ENV = 'REPORT_CACHE_DIR'
+
+
+def cache_dir(*parts):
+    """Return (and create) a directory under the report cache.
+
+    Defaults to ``$XDG_CACHE_HOME/timetravel-report`` (``~/.cache/...``);
+    override with ``$REPORT_CACHE_DIR``.
+    """
+    root = os.environ.get(CACHE_ENV)
+    if not root:
+        xdg = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(xdg, 'timetravel-report')
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write(path, data):
+    """Write ``data`` to ``path`` through a temporary file and os.replace.
+
+    The temporary file is unique per call, so threads and processes may
+    write the same path at once: the last os.replace wins.
+    """
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+@contextmanager
+def atomic_open(path):
+    """Like atomic_write(), for output streamed to the binary file yielded.
+
+    ``path`` is replaced when the block exits normally; on an exception
+    the temporary file is removed and ``path`` left as it was.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f'{name}.', suffix='.tmp', dir=directory)
+    try:
+        # mkstemp creates the file 0600; give it the usual umask mode.
+        os.fchmod(fd, 0o666 & ~_umask())
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+_UMASK = None
+
+
+def _umask():
+    global _UMASK
+    if _UMASK is None:
+        _UMASK = os.umask(0)
+        os.umask(_UMASK)
+    return _UMASK
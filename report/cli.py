@@ -0,0 +1,124 @@
+"""Command line entry point: ``python -m report [SPEC] [-o OUT]...``."""
+import argparse
+import sys
+
+from .formats import format_of, render_outputs
+from .spec import SpecError, load_spec, validate_spec
+
+DEFAULT_OUTPUT = 'TimeTravel_Agency_Rendu.docx'
+
+_STATS_LABELS = {'OptimizeStats': 'Optimisation', 'BuildStats': 'Build', 'EmbedStats': 'Polices'}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m report',
+        description='Genere le rapport TimeTravel Agency (.docx).')
+    parser.add_argument('spec', nargs='?',
+                        help='spec JSON (defaut : contenu integre, voir report/content.py)')
+    parser.add_argument('-o', '--output', action='append',
+                        help='fichier de sortie, format selon l\'extension (.docx, .html, .md), '
+                             f'"-" pour stdout en .docx ; repetable (defaut : {DEFAULT_OUTPUT})')
+    parser.add_argument('-q', '--quiet', action='store_true', help='aucun message')
+    parser.add_argument('--stream', action='store_true',
+                        help='ecrit le document au fil du rendu (memoire constante)')
+    parser.add_argument('--ir', action='store_true',
+                        help='construit un modele compact du document, converti en XML '
+                             'a l\'ecriture (memoire reduite)')
+    parser.add_argument('--optimize', action='store_true',
+                        help='fusionne les runs et factorise la mise en forme avant ecriture')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='rend toutes les sections sans le cache incremental')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='processus de rendu des sections (defaut : 1)')
+    parser.add_argument('-z', '--compress-level', type=int, default=6, choices=range(10),
+                        metavar='0-9',
+                        help='niveau de compression du .docx, 0 = non compresse '
+                             '(brouillons, ecriture plus rapide) ; defaut : 6')
+    parser.add_argument('--embed-fonts', action='store_true',
+                        help='integre au .docx les polices utilisees, reduites aux caracteres '
+                             'du document (fontTools requis)')
+    parser.add_argument('--trace', metavar='JSON',
+                        help='trace Chrome (sections, helpers, ecriture) + resume JSON')
+    parser.add_argument('--watch', action='store_true',
+                        help='reconstruit a chaque modification de la spec, du theme '
+                             'ou des composants')
+    parser.add_argument('--check', action='store_true',
+                        help='valide la spec sans generer le document')
+    return parser.parse_args(argv)
+
+
+def _load(path):
+    if path:
+        return load_spec(path)
+    from .content import default_spec
+    spec = default_spec()
+    validate_spec(spec)
+    return spec
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = args.output or [DEFAULT_OUTPUT]
+    # Messages go to stderr when the document itself is streamed to stdout.
+    log = sys.stderr if '-' in paths else sys.stdout
+    try:
+        outputs = [(format_of(path), path) for path in paths]
+    except ValueError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    if paths.count('-') > 1:
+        print('error: only one output can be "-"', file=sys.stderr)
+        return 2
+    if args.ir and (args.optimize or args.stream):
+        print('error: --ir cannot be combined with --optimize or --stream', file=sys.stderr)
+        return 2
+    if args.watch and ('-' in paths or args.stream):
+        print('error: --watch needs output files, without --stream', file=sys.stderr)
+        return 2
+
+    if args.watch:
+        from .watch import Watcher
+        options = {'optimize': args.optimize, 'cache': not args.no_cache, 'jobs': args.jobs,
+                   'compresslevel': args.compress_level, 'embed_fonts': args.embed_fonts,
+                   'ir': args.ir}
+        try:
+            Watcher(lambda: _load(args.spec), args.spec, outputs, options).run()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    try:
+        spec = _load(args.spec)
+    except (OSError, SpecError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+
+    if args.check:
+        if not args.quiet:
+            print('Spec valide.', file=log)
+        return 0
+
+    tracer = None
+    if args.trace:
+        from . import trace
+        tracer = trace.enable()
+
+    results = render_outputs(spec, outputs, {
+        'optimize': args.optimize, 'stream': args.stream, 'cache': not args.no_cache,
+        'jobs': args.jobs, 'compresslevel': args.compress_level,
+        'embed_fonts': args.embed_fonts, 'ir': args.ir})
+    if tracer is not None:
+        trace.disable()
+        summary = tracer.write(args.trace)
+        if not args.quiet:
+            print(f'Trace : {args.trace}, resume : {summary}', file=log)
+    if not args.quiet:
+        for out, result in results.items():
+            if result is not None:
+                label = _STATS_LABELS.get(type(result).__name__, 'Stats')
+                print(f'{label} ({out}) : {result}' if len(results) > 1 else f'{label} : {result}',
+                      file=log)
+        print('Document genere avec succes !' if len(results) == 1
+              else f'{len(results)} documents generes avec succes !', file=log)
+    return 0
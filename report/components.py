@@ -0,0 +1,192 @@
+"""Index of the webapp's React components (src/components/*.tsx).
+
+For each component file the index records its default export, line count,
+import sources and leading description (the comment right above the
+default export, or a doc comment at the top of the file).  Files are read
+in a thread pool; the index is cached in the report cache and keyed by
+each file's mtime and size, so a warm scan only stats the tree and
+re-reads the files that changed.
+
+``python -m report.components [ROOT]`` prints the index.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import atomic_write, cache_dir
+
+COMPONENTS_DIR = os.path.join('src', 'components')
+EXTENSIONS = ('.tsx',)
+
+# Bump when the fields extracted by scan_file() change.
+INDEX_VERSION = 1
+
+# Repository root when running from a checkout (report/ sits next to src/).
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_DEFAULT_EXPORT = re.compile(
+    r'^export\s+default\s+(?:async\s+)?(?:function\*?|class)?\s*([A-Za-z_$][\w$]*)', re.M)
+_IMPORT = re.compile(r'^import\s+(?:type\s+)?(?:[^;\'"]*?\s+from\s+)?[\'"]([^\'"]+)[\'"]', re.M)
+# Section banners such as /* ───── Types ───── */ are not descriptions.
+_BANNER = re.compile(r'[─═\-=#~]{3,}')
+
+
+def _comment_text(comment):
+    lines = []
+    for line in comment.splitlines():
+        line = line.strip()
+        for prefix in ('/**', '/*', '*/', '//', '*'):
+            if line.startswith(prefix):
+                line = line[len(prefix):]
+        line = line.removesuffix('*/').strip()
+        if line:
+            lines.append(line)
+    return ' '.join(lines)
+
+
+def _comment_before(source, end):
+    """The comment that ends right before ``end`` (block or // lines), or ''."""
+    head = source[:end].rstrip()
+    if head.endswith('*/'):
+        return head[head.rfind('/*'):]
+    lines = head.split('\n')
+    start = len(lines)
+    while start and lines[start - 1].lstrip().startswith('//'):
+        start -= 1
+    return '\n'.join(lines[start:])
+
+
+def _description(source, export_at):
+    """Leading description of a component, '' if there is none."""
+    comments = []
+    if export_at is not None:
+        comments.append(_comment_before(source, export_at))
+    top = source.lstrip()
+    if top.startswith('/**'):
+        comments.append(top[:top.find('*/') + 2])
+    for comment in comments:
+        if comment and not _BANNER.search(comment):
+            return _comment_text(comment)
+    return ''
+
+
+def scan_file(path):
+    """Return the index entry of one component file."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        source = f.read()
+    export = _DEFAULT_EXPORT.search(source)
+    return {
+        'export': export.group(1) if export else None,
+        'lines': source.count('\n') + (not source.endswith('\n') and bool(source)),
+        'imports': _IMPORT.findall(source),
+        'description': _description(source, export.start() if export else None),
+    }
+
+
+def _cache_path(directory):
+    key = hashlib.sha256(os.path.abspath(directory).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir('components'), f'index-{key}.json')
+
+
+def _load_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data.get('files', {}) if data.get('version') == INDEX_VERSION else {}
+
+
+def _walk(directory):
+    """Yield (relative path, stat) of the component files under ``directory``."""
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.') and entry.name != 'node_modules':
+                        stack.append(entry.path)
+                elif entry.name.endswith(EXTENSIONS):
+                    yield os.path.relpath(entry.path, directory), entry.stat()
+
+
+def scan_components(root=REPO_ROOT, workers=None, use_cache=True):
+    """Return the component index of ``root``, sorted by file path.
+
+    Each entry is a dict with ``file`` (relative to src/components),
+    ``export``, ``lines``, ``imports`` and ``description``.  Returns an
+    empty list when ``root`` has no src/components directory.
+    """
+    directory = os.path.join(root, COMPONENTS_DIR)
+    if not os.path.isdir(directory):
+        return []
+    cache_path = _cache_path(directory) if use_cache else None
+    cached = _load_cache(cache_path) if use_cache else {}
+
+    files, todo = {}, []
+    for rel, st in _walk(directory):
+        entry = cached.get(rel)
+        if entry is not None and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            files[rel] = entry
+        else:
+            files[rel] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+            todo.append(rel)
+
+    if todo:
+        with ThreadPoolExecutor(workers) as pool:
+            paths = [os.path.join(directory, rel) for rel in todo]
+            for rel, info in zip(todo, pool.map(scan_file, paths)):
+                files[rel].update(info)
+    if use_cache and (todo or files.keys() != cached.keys()):
+        atomic_write(cache_path, json.dumps(
+            {'version': INDEX_VERSION, 'files': files}, sort_keys=True).encode('utf-8'))
+
+    index = []
+    for rel in sorted(files):
+        entry = {k: v for k, v in files[rel].items() if k not in ('mtime_ns', 'size')}
+        entry['file'] = rel.replace(os.sep, '/')
+        index.append(entry)
+    return index
+
+
+def packages(index):
+    """Set of npm packages imported by the components (relative imports excluded)."""
+    names = set()
+    for entry in index:
+        for source in entry['imports']:
+            if not source.startswith(('.', '/')):
+                parts = source.split('/')
+                names.add('/'.join(parts[:2]) if source.startswith('@') else parts[0])
+    return names
+
+
+def dependencies(root=REPO_ROOT):
+    """{package: version spec} from the dependencies of ``root``/package.json."""
+    try:
+        with open(os.path.join(root, 'package.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    deps = dict(manifest.get('devDependencies', {}))
+    deps.update(manifest.get('dependencies', {}))
+    return deps
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    root = argv[0] if argv else REPO_ROOT
+    index = scan_components(root)
+    if not index:
+        print(f'error: no {COMPONENTS_DIR} in {root}', file=sys.stderr)
+        return 2
+    for entry in index:
+        print(f'{entry["file"]:<28} {entry["export"] or "-":<22} {entry["lines"]:>5}  '
+              f'{entry["description"]}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
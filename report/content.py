@@ -0,0 +1,419 @@
+"""Contenu du rapport TimeTravel Agency, sous forme de spec (voir spec.py)."""
+import copy
+import os
+import re
+
+
+def heading(text, level=1):
+    return {'type': 'heading', 'text': text, 'level': level}
+
+
+def text(text, **fmt):
+    return dict({'type': 'text', 'text': text}, **fmt)
+
+
+def bullets(items, **fmt):
+    return [dict({'type': 'bullet', 'text': t}, **fmt) for t in items]
+
+
+def table(headers, rows, **fmt):
+    return dict({'type': 'table', 'headers': headers, 'rows': [list(r) for r in rows]}, **fmt)
+
+
+def divider():
+    return {'type': 'divider'}
+
+
+def blank():
+    return {'type': 'paragraph'}
+
+
+def para(*runs, **fmt):
+    return dict({'type': 'paragraph', 'runs': list(runs)}, **fmt)
+
+
+def image(path, **fmt):
+    return dict({'type': 'image', 'path': path}, **fmt)
+
+
+def run(text, **fmt):
+    return dict({'text': text}, **fmt)
+
+
+def section(sid, *blocks):
+    out = []
+    for b in blocks:
+        out.extend(b if isinstance(b, list) else [b])
+    return {'id': sid, 'blocks': out}
+
+
+# ============================================================
+#                      PAGE DE GARDE
+# ============================================================
+COVER = section(
+    'cover',
+    [blank() for _ in range(4)],
+    para(run('⌖', size=48), align='center'),
+    blank(),
+    para(run('TIMETRAVEL AGENCY', bold=True, size=36, color='gold', font='Georgia'), align='center'),
+    para(run('─' * 30, color='gold', size=10), align='center'),
+    para(run('Webapp Interactive', size=22, color='666666', font='Georgia'), align='center'),
+    blank(),
+    para(run('Projet Final — M1/M2 Digital & IA', size=13, font='Calibri', color='888888'),
+         align='center'),
+    blank(),
+    blank(),
+    para(run('Réalisé par', size=11, color='999999', font='Calibri'), align='center'),
+    para(run('YAHIA Rayan', size=18, bold=True, color='gold_dark', font='Georgia'), align='center'),
+    blank(),
+    para(run('→  https://timetravel-agency-ten.vercel.app', size=11, color='electric',
+             font='Calibri'), align='center'),
+    para(run('19 février 2026', size=11, color='999999', font='Calibri'), align='center'),
+)
+
+# ============================================================
+#                        SOMMAIRE
+# ============================================================
+SOMMAIRE_ENTRIES = [
+    ('1.', 'Présentation du projet'),
+    ('2.', 'Stack technique'),
+    ('3.', 'Architecture & Planning — Phase 1'),
+    ('4.', 'Génération de code & Vibe Coding — Phase 2'),
+    ('5.', 'Intelligence Artificielle & Agents — Phase 3'),
+    ('6.', 'Features implémentées'),
+    ('7.', 'Déploiement — Phase 4'),
+    ('8.', 'Outils IA utilisés'),
+    ('9.', 'Conclusion'),
+]
+
+SOMMAIRE = section(
+    'sommaire',
+    heading('⌖  Sommaire'),
+    divider(),
+    [para(run(num + '  ', color='gold', font='Georgia', size=12, bold=True),
+          run(title, color='333333', font='Calibri', size=12),
+          space_after=6)
+     for num, title in SOMMAIRE_ENTRIES],
+)
+
+# ============================================================
+#                1. PRESENTATION
+# ============================================================
+_SEP = run('   ·   ', color='CCCCCC')
+
+PRESENTATION = section(
+    'presentation',
+    heading('◈  1. Présentation du projet'),
+    divider(),
+    text('TimeTravel Agency est une webapp interactive moderne présentant une agence fictive de voyages temporels de luxe. '
+         'Le site permet aux visiteurs de découvrir trois destinations temporelles uniques, '
+         "d'interagir avec un agent conversationnel intelligent, de personnaliser leur voyage via un quiz, "
+         'et de simuler une réservation complète.'),
+    text("Le projet a été développé dans le cadre du cours Digital & IA, en combinant des techniques de vibe coding, "
+         "d'intelligence artificielle générative, et de développement front-end moderne."),
+    # Destinations highlight
+    blank(),
+    para(run('★ Paris 1889', color='gold', size=13, bold=True, font='Georgia'),
+         _SEP,
+         run('★ Crétacé', color='emerald', size=13, bold=True, font='Georgia'),
+         _SEP,
+         run('★ Florence 1504', color='C41E3A', size=13, bold=True, font='Georgia'),
+         align='center'),
+)
+
+# ============================================================
+#                2. STACK TECHNIQUE
+# ============================================================
+# Technologies, dans l'ordre du tableau : paquet npm, libellé ({} = version
+# majeure lue dans package.json), version par défaut, usage.  Une ligne
+# n'apparaît que si le paquet est importé par un composant ou déclaré dans
+# package.json.
+STACK_NOTES = [
+    ('react', 'React {}', '19', 'Framework UI — composants, state management'),
+    ('typescript', 'TypeScript', '5', 'Typage statique, fiabilité du code'),
+    ('tailwindcss', 'Tailwind CSS v{}', '4', 'Styling utility-first, design responsive'),
+    ('framer-motion', 'Framer Motion', '12', 'Animations fluides, transitions, micro-interactions'),
+    ('lucide-react', 'Lucide React', '0', 'Icônes SVG cohérentes'),
+    ('vite', 'Vite {}', '7', 'Build tool ultra-rapide, HMR'),
+]
+
+# Technologies hors npm, toujours listées.
+STACK_EXTRA = [
+    ('Web Audio API', "Son d'ambiance génératif"),
+    ('Groq API', 'Agent conversationnel IA (Llama 3.3 70B)'),
+    ('Vercel', 'Déploiement et hébergement production'),
+    ('Claude Code', 'Assistant IA (Claude Opus 4.6)'),
+]
+
+
+def stack_section(index=(), deps=None):
+    """Section 2, à partir de l'index des composants et de package.json."""
+    from .components import packages
+    deps = deps or {}
+    used = packages(index) | set(deps)
+    rows = []
+    for name, label, major, usage in STACK_NOTES:
+        if used and name not in used:
+            continue
+        found = re.search(r'\d+', deps.get(name, ''))
+        rows.append((label.format(found.group() if found else major), usage))
+    return section(
+        'stack',
+        heading('⚙  2. Stack technique'),
+        divider(),
+        table(['Technologie', 'Usage'], rows + STACK_EXTRA),
+    )
+
+
+# ============================================================
+#                3. PHASE 1
+# ============================================================
+PHASE1 = section(
+    'phase1',
+    heading('▶  3. Architecture & Planning — Phase 1'),
+    divider(),
+    heading('3.1  Définition des features', level=2),
+    text('Fonctionnalités définies pour la webapp :'),
+    bullets([
+        "▸  Hero section avec animation typewriter et particules",
+        "▸  À propos avec compteurs animés (3 époques, 2 847 voyageurs, 100% retours)",
+        "▸  3 destinations avec cards interactives et compteur de places",
+        "▸  Galerie immersive avec onglets filtres (12 cartes)",
+        "▸  Frise chronologique interactive des 3 époques",
+        "▸  Quiz de recommandation personnalisée (4 questions)",
+        "▸  Formulaire de réservation multi-étapes",
+        "▸  Chatbot IA conversationnel (Chronos)",
+        "▸  Section témoignages (6 avis de voyageurs)",
+        "▸  FAQ en accordéon animé (8 questions)",
+        "▸  Son d'ambiance piano génératif style Minecraft (Web Audio API)",
+        '▸  Easter egg clavier (taper "time") : présentation constellations',
+        "▸  Page 404 thématique",
+    ]),
+    heading('3.2  Structure de navigation', level=2),
+    text('Le site suit un flow vertical single-page responsive (mobile-first) :'),
+    bullets([
+        'Header fixe → Hero → À propos → Destinations → Galerie',
+        'Timeline → Quiz → Réservation → Témoignages → FAQ → Footer',
+        'Overlay : Chatbot (bas droite) + Son ambiance (bas gauche) + Easter egg',
+    ]),
+)
+
+# ============================================================
+#                4. PHASE 2
+# ============================================================
+PHASE2 = section(
+    'phase2',
+    heading('◆  4. Génération de code & Vibe Coding — Phase 2'),
+    divider(),
+    heading('4.1  Setup & Génération initiale', level=2),
+    text("Le projet a été initialisé avec Vite + React + TypeScript, puis développé "
+         "itérativement avec Claude Code (Opus 4.6). Chaque composant a été généré "
+         "via des prompts détaillés, testé, puis intégré dans l'application."),
+    heading('4.2  Intégration des assets', level=2),
+    text("Les visuels sont générés en CSS pur (gradients, ombres, glow effects) avec des emojis "
+         "comme éléments visuels. Chaque époque a sa palette de couleurs : "
+         "gold pour Paris, emerald pour le Crétacé, rouge renaissance pour Florence."),
+    heading('4.3  Animations (exercice optionnel — réalisé ✓)', level=2),
+    text('Animations implémentées avec Framer Motion :'),
+    bullets([
+        'Fade-in progressif au scroll (whileInView)',
+        'Typewriter animé sur le sous-titre Hero',
+        'Hover effects : scale, glow, flèche directionnelle',
+        'Transitions entre étapes (quiz, réservation)',
+        'Compteurs animés, accordéon FAQ',
+        'Particules flottantes en arrière-plan',
+        'Easter egg : constellations animées (Tour Eiffel, T-Rex, David)',
+        'Loading screen avec animation d’entrée',
+    ]),
+)
+
+# ============================================================
+#                5. PHASE 3
+# ============================================================
+PHASE3 = section(
+    'phase3',
+    heading('◈  5. Intelligence Artificielle & Agents — Phase 3'),
+    divider(),
+    heading('5.1  Agent conversationnel — Chronos', level=2),
+    text("Le chatbot Chronos est accessible via un widget flottant en bas à droite. "
+         "Il est propulsé par l'API Groq avec le modèle Llama 3.3 70B et répond "
+         "en temps réel à n'importe quelle question des visiteurs."),
+    text('Capacités de Chronos :', bold=True),
+    bullets([
+        'Réponses détaillées sur les 3 destinations',
+        'Informations tarifs (12 500 € / 18 900 € / 14 200 €)',
+        'Sécurité, garanties, bagages, durée',
+        'Recommandation selon les intérêts',
+        'Historique de conversation (contexte gardé)',
+        'Quick actions + indicateur de frappe',
+        'Fallback pattern matching si API indisponible',
+    ]),
+    text("Personnalité : professionnel, chaleureux, passionné d’histoire, "
+         "expert en voyage temporel. Ton enthousiaste sans être familier.",
+         color='666666', size=10),
+    heading('5.2  Quiz de recommandation (exercice optionnel — réalisé ✓)', level=2),
+    text("Quiz de 4 questions avec système de scoring. "
+         "Chaque réponse attribue des points aux 3 destinations. "
+         "La destination avec le meilleur score est recommandée avec une explication personnalisée."),
+    table(['Question', 'Options'], [
+        ("Type d'expérience", 'Culturelle / Aventure / Élégance'),
+        ('Période préférée', 'Moderne / Ancienne / Renaissance'),
+        ('Préférence', 'Urbain / Nature / Art'),
+        ('Activité idéale', 'Monuments / Faune / Musées'),
+    ]),
+)
+
+# ============================================================
+#                6. FEATURES
+# ============================================================
+# Libellé et description par composant (export par défaut), dans l'ordre du
+# tableau.  Les composants de src/components absents d'ici sont ajoutés à
+# la fin avec la description extraite du fichier ; ceux qui n'existent plus
+# disparaissent du tableau.
+FEATURE_NOTES = {
+    'LoadingScreen': ('Loading Screen', 'Écran de chargement animé'),
+    'ParticleBackground': ('Particules', 'Arrière-plan animé'),
+    'CustomCursor': ('Curseur', 'Curseur doré + halo au survol'),
+    'Header': ('Header', 'Nav fixe + scroll spy'),
+    'Hero': ('Hero', 'Titre animé, typewriter, CTA'),
+    'About': ('À propos', '3 compteurs animés'),
+    'Destinations': ('Destinations', '3 cards + prix + places + lien réservation'),
+    'Gallery': ('Galerie', '12 cartes, onglets par époque'),
+    'Timeline': ('Timeline', 'Frise chronologique verticale'),
+    'Quiz': ('Quiz', 'Recommandation 4 questions'),
+    'Booking': ('Réservation', 'Formulaire 4 étapes'),
+    'Testimonials': ('Témoignages', '6 avis + étoiles'),
+    'FAQ': ('FAQ', '8 questions accordéon'),
+    'Footer': ('Footer', 'Liens, réseaux sociaux, retour en haut'),
+    'Chatbot': ('Chatbot IA', 'Agent Chronos (Groq + Llama 3.3)'),
+    'AmbientSound': ('Son ambiance', 'Piano génératif style Minecraft'),
+    'EasterEgg': ('Easter egg', 'Constellations Tour Eiffel / T-Rex / David'),
+    'NotFound': ('Page 404', 'Perdu dans le temps'),
+}
+
+
+def feature_rows(index=()):
+    """Lignes (feature, description, fichier) du tableau des features."""
+    if not index:
+        return [(label, desc, f'{name}.tsx') for name, (label, desc) in FEATURE_NOTES.items()]
+    by_export = {entry['export']: entry for entry in index if entry['export']}
+    rows = [(label, desc, by_export[name]['file'])
+            for name, (label, desc) in FEATURE_NOTES.items() if name in by_export]
+    for entry in index:
+        if entry['export'] not in FEATURE_NOTES:
+            name = entry['export'] or entry['file'].rsplit('/', 1)[-1].split('.')[0]
+            label = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', name)
+            rows.append((label, entry['description'] or f'{entry["lines"]} lignes', entry['file']))
+    return rows
+
+
+# Captures d'écran des composants : docs/screenshots/<Composant>.png (ou .jpg).
+SCREENSHOTS_DIR = os.path.join('docs', 'screenshots')
+SCREENSHOT_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def screenshots(root, rows):
+    """Blocs image des captures présentes pour les features de ``rows``."""
+    folder = os.path.join(root, SCREENSHOTS_DIR)
+    if not os.path.isdir(folder):
+        return []
+    blocks = []
+    for label, _, path in rows:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for ext in SCREENSHOT_EXTENSIONS:
+            shot = os.path.join(folder, stem + ext)
+            if os.path.isfile(shot):
+                blocks.append(image(shot, caption=label))
+                break
+    return blocks
+
+
+def features_section(rows, shots=()):
+    return section(
+        'features',
+        heading('✦  6. Features implémentées'),
+        divider(),
+        table(['Feature', 'Description', 'Fichier'], rows),
+        list(shots),
+    )
+
+
+# ============================================================
+#                7. DEPLOIEMENT
+# ============================================================
+DEPLOIEMENT = section(
+    'deploiement',
+    heading('→  7. Déploiement — Phase 4'),
+    divider(),
+    text('Processus de déploiement :'),
+    bullets([
+        'Build de production : npm run build (TypeScript + Vite)',
+        'Déploiement via Vercel CLI : vercel --prod',
+        'CDN mondial pour des temps de chargement optimaux',
+        'HTTPS automatique + certificat SSL',
+    ]),
+    blank(),
+    para(run('URL de production', size=10, color='999999', font='Calibri'), align='center'),
+    para(run('https://timetravel-agency-ten.vercel.app', size=16, color='gold', font='Georgia',
+             bold=True), align='center'),
+)
+
+# ============================================================
+#                8. OUTILS IA
+# ============================================================
+OUTILS = section(
+    'outils',
+    heading('⚙  8. Outils IA utilisés'),
+    divider(),
+    text('Transparence sur les outils IA utilisés dans ce projet :'),
+    table(['Outil', 'Modèle', 'Usage'], [
+        ('Claude Code', 'Claude Opus 4.6', 'Génération du code, debugging, déploiement'),
+        ('Groq API', 'Llama 3.3 70B (Meta)', 'Agent conversationnel en production'),
+        ('Framer Motion', 'Open source', 'Animations et transitions'),
+        ('Tailwind CSS v4', 'Open source', 'Framework CSS utility-first'),
+        ('Vercel', 'Cloud', 'Hébergement et CDN'),
+        ('Web Audio API', 'Native', 'Son génératif navigateur'),
+    ]),
+)
+
+# ============================================================
+#                9. CONCLUSION
+# ============================================================
+def conclusion_section(components):
+    return section(
+        'conclusion',
+        heading('◈  9. Conclusion'),
+        divider(),
+        text("Ce projet a permis d’explorer le vibe coding et l’utilisation d’outils IA pour le développement web. "
+             "La webapp TimeTravel Agency intègre toutes les fonctionnalités demandées dans le brief : "
+             "interface immersive avec animations, agent conversationnel, quiz de recommandation, "
+             "formulaire de réservation, et de nombreux bonus."),
+        text("Le site est entièrement responsive, déployé en production sur Vercel, "
+             f"et propose une expérience utilisateur premium avec {components} composants interactifs."),
+        blank(),
+        divider(),
+        para(run('"Le passé n’attend que vous."', size=14, color='gold', font='Georgia',
+                 italic=True), align='center'),
+        blank(),
+        para(run('— TimeTravel Agency', size=11, color='999999', font='Georgia'), align='center'),
+    )
+
+
+def default_spec(root=None):
+    """Return a fresh copy of the built-in report spec.
+
+    The Stack and Features tables are generated from ``root``'s
+    src/components and package.json (the repository by default); without
+    them the tables list FEATURE_NOTES / STACK_NOTES as is.  Screenshots
+    found in ``root``/docs/screenshots follow the Features table.
+    """
+    from .components import REPO_ROOT, dependencies, scan_components
+    root = root or REPO_ROOT
+    index = scan_components(root)
+    features = feature_rows(index)
+    return copy.deepcopy({'sections': [
+        COVER, SOMMAIRE, PRESENTATION, stack_section(index, dependencies(root)),
+        PHASE1, PHASE2, PHASE3, features_section(features, screenshots(root, features)),
+        DEPLOIEMENT, OUTILS,
+        conclusion_section(len(features)),
+    ]})
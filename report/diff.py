@@ -0,0 +1,496 @@
+"""Structural diff of two .docx packages, for golden-file tests.
+
+    python -m report.diff reference.docx rapport.docx
+    python -m report.diff -q reference.docx rapport.docx && echo identiques
+
+The exit status is 0 when the documents are the same, 1 when they differ
+and 2 on error, as for diff(1).
+
+word/document.xml is read as a stream and cut into body elements by a
+byte scanner: no tree is built, so memory holds digests and the time is
+that of inflating the part and a few regex passes.  Each body paragraph is
+hashed with its formatting (pPr), along with each of its runs (rPr and
+text); each table with its properties, along with each of its rows (cell
+shading and borders included).  Elements are compared as serialized,
+without the rsid and paraId attributes Word adds on every save: the
+documents compared are expected to come from the same writer.  What lies
+outside the body elements (the XML declaration, the root element and its
+namespaces, w:background, the body tags) is hashed as a whole, and a
+change there is reported against word/document.xml.
+
+The body is cut into sections at the page breaks the generator puts
+between them (build.render_spec), each named after its first heading.
+Sections are aligned, then the elements within a changed section, then the
+runs or rows within a changed element, so a one-word change is reported
+as that word, in its paragraph, in its section.
+
+The other parts are compared by content: zip metadata (timestamps, order,
+compression, extra fields) and the save dates and revision counters of
+docProps/core.xml are ignored.
+"""
+import argparse
+import hashlib
+import io
+import re
+import sys
+import time
+import zipfile
+from difflib import SequenceMatcher
+
+from .package import DOCUMENT_PART
+
+CORE_PART = 'docProps/core.xml'
+
+# Attributes that change on every save without changing the document.
+_NOISE = re.compile(rb' (?:w:rsid\w*|w14:paraId|w14:textId)="[^"]*"')
+# docProps/core.xml elements set by the saving application.
+_CORE_NOISE = re.compile(
+    rb'<(dcterms:created|dcterms:modified|cp:lastModifiedBy|cp:lastPrinted|cp:revision)\b'
+    rb'[^>]*>[^<]*</\1>')
+# Start and end tags of the elements cut out by _body_elements() and _top_level().
+_BLOCK_TAGS = re.compile(rb'<(/?)w:(?:p|tbl|sectPr)(?=[\s/>])[^>]*>')
+_ROW_TAGS = re.compile(rb'<(/?)w:tr(?=[\s/>])[^>]*>')
+_CELL_TAGS = re.compile(rb'<(/?)w:tc(?=[\s/>])[^>]*>')
+_RUN = re.compile(rb'<w:r(?: [^>]*)?>.*?</w:r>', re.S)
+_TEXT = re.compile(rb'<w:t(?: [^>]*)?>([^<]*)</w:t>|<w:(?:tab|br|cr)(?: [^>]*)?/?>')
+_HEADING = re.compile(rb'<w:pStyle w:val="(?:Title|Heading\d)"')
+_PAGE_BREAK = re.compile(rb'<w:br w:type="page"\s*/?>')
+
+CHUNK_SIZE = 1 << 20
+LABEL_SIZE = 60
+
+# Title of the pseudo-section holding the body's final sectPr.
+LAYOUT = 'sectPr'
+
+
+def _c14n(element):
+    from lxml import etree
+    return etree.tostring(element, method='c14n', exclusive=True)
+
+
+def _digest(data):
+    return hashlib.sha1(data).digest()
+
+
+def _unescape(data):
+    return (data.decode('utf-8').replace('&lt;', '<').replace('&gt;', '>')
+            .replace('&quot;', '"').replace('&amp;', '&'))
+
+
+def _text(xml):
+    """Text of the runs in ``xml``, tabs and breaks as spaces."""
+    return ''.join(_unescape(m.group(1)) if m.group(1) is not None else ' '
+                   for m in _TEXT.finditer(xml))
+
+
+def _label(text):
+    text = ' '.join(text.split())
+    return text if len(text) <= LABEL_SIZE else text[:LABEL_SIZE - 1] + '…'
+
+
+class Block:
+    """A body element: its digest, a label and the digests of its runs or rows."""
+
+    __slots__ = ('kind', 'digest', 'label', 'items', 'labels')
+
+    def __init__(self, kind, digest, label, items, labels):
+        self.kind = kind
+        self.digest = digest
+        self.label = label
+        self.items = items
+        self.labels = labels
+
+
+class Section:
+    """Elements between two page breaks: digest, size, first heading."""
+
+    __slots__ = ('title', 'size', 'digest', 'blocks')
+
+    def __init__(self, title, size, digest):
+        self.title = title
+        self.size = size
+        self.digest = digest
+        self.blocks = None  # filled by read_blocks() for the sections that differ
+
+
+def _runs_text(xml):
+    return ''.join(_text(run) for run in _RUN.findall(xml))
+
+
+def _paragraph(xml):
+    runs = _RUN.findall(xml)
+    texts = [_text(run) for run in runs]
+    return Block('paragraph', _digest(xml), _label(''.join(texts)),
+                 [_digest(run) for run in runs], [_label(text) for text in texts])
+
+
+def _top_level(data, tags):
+    """Yield the outermost elements of ``data`` whose start/end tags match ``tags``."""
+    depth = start = 0
+    for m in tags.finditer(data):
+        if m.group(1):
+            depth -= 1
+            if not depth:
+                yield data[start:m.end()]
+        elif m.group(0).endswith(b'/>'):
+            if not depth:
+                yield m.group(0)
+        else:
+            if not depth:
+                start = m.start()
+            depth += 1
+
+
+def _table(xml):
+    rows = list(_top_level(xml, _ROW_TAGS))
+    labels = [_label(' | '.join(_text(tc) for tc in _top_level(row, _CELL_TAGS)))
+              for row in rows]
+    return Block('table', _digest(xml), labels[0] if labels else '',
+                 [_digest(row) for row in rows], labels)
+
+
+def _body_elements(stream, rest=None):
+    """Yield the body children of the document.xml read from ``stream``, as bytes.
+
+    Tags are only scanned up to the last ``<`` read, which cannot start
+    inside a tag: every tag before it is whole.  What lies between the
+    children is fed to the ``rest`` hash, if given, without the save noise
+    and the whitespace around it.
+    """
+    def skip(end):
+        if rest is not None:
+            rest.update(_NOISE.sub(b'', buf[outside:end]).strip())
+
+    buf = b''
+    pos = depth = start = outside = 0
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        buf += chunk
+        limit = len(buf) if not chunk else buf.rfind(b'<')
+        for m in _BLOCK_TAGS.finditer(buf, pos, max(limit, pos)):
+            if m.group(1):
+                depth -= 1
+                if not depth:
+                    outside = m.end()
+                    yield buf[start:m.end()]
+            elif m.group(0).endswith(b'/>'):
+                if not depth:
+                    skip(m.start())
+                    outside = m.end()
+                    yield m.group(0)
+            else:
+                if not depth:
+                    skip(m.start())
+                    start = m.start()
+                depth += 1
+        # Keep the element being read, or only what was not scanned.
+        pos = max(limit, pos)
+        if not depth:
+            skip(pos)
+            outside = pos
+        if not chunk:
+            return
+        keep = start if depth else pos
+        buf = buf[keep:]
+        pos -= keep
+        start -= keep
+        outside -= keep
+
+
+def _open(source):
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return zipfile.ZipFile(source)
+
+
+def _elements(source, rest=None):
+    """Yield (section index, element bytes) of the body of ``source``.
+
+    The page breaks between sections are left out, and the save noise
+    attributes removed.  ``rest`` hashes what is outside the elements.
+    """
+    index = 0
+    with _open(source) as zf, zf.open(DOCUMENT_PART) as stream:
+        for xml in _body_elements(stream, rest):
+            xml = _NOISE.sub(b'', xml)
+            if xml.startswith(b'<w:sectPr'):
+                # Page setup of the whole document: a section of its own.
+                yield index + 1, xml
+            elif (_PAGE_BREAK.search(xml) and xml.startswith(b'<w:p')
+                    and len(_RUN.findall(xml)) == 1 and not _runs_text(xml).strip()):
+                index += 1
+            else:
+                yield index, xml
+
+
+def read_sections(source, rest=None):
+    """Sections of the body of the .docx ``source`` (path, bytes or binary file).
+
+    Only digests are computed: see read_blocks() for the elements.  The
+    ``rest`` hash, if given, is fed what lies outside the body elements.
+    """
+    sections = []
+    h, size, title, index = hashlib.sha1(), 0, None, 0
+    for index, xml in _elements(source, rest):
+        while index > len(sections):
+            sections.append(Section(title, size, h.digest()))
+            h, size, title = hashlib.sha1(), 0, None
+        h.update(xml)
+        size += 1
+        if xml.startswith(b'<w:sectPr'):
+            title = LAYOUT
+        elif title is None and _HEADING.search(xml):
+            title = _label(_runs_text(xml)) or None
+    while len(sections) <= index:
+        sections.append(Section(title, size, h.digest()))
+        h, size, title = hashlib.sha1(), 0, None
+    return sections
+
+
+def read_blocks(source, sections):
+    """Fill the ``blocks`` of ``sections``, a {section index: Section} map, from ``source``."""
+    for section in sections.values():
+        section.blocks = []
+    last = max(sections, default=-1)
+    for index, xml in _elements(source):
+        if index > last:
+            break
+        section = sections.get(index)
+        if section is None:
+            continue
+        if xml.startswith(b'<w:p'):
+            block = _paragraph(xml)
+        elif xml.startswith(b'<w:tbl'):
+            block = _table(xml)
+        else:
+            block = Block('layout', _digest(xml), '', [], [])
+        section.blocks.append(block)
+
+
+def _part_digests(source):
+    """{part name: digest} of the parts other than word/document.xml."""
+    from lxml import etree
+    digests = {}
+    with _open(source) as zf:
+        for info in zf.infolist():
+            name = info.filename
+            if name == DOCUMENT_PART or name.endswith('/'):
+                continue
+            data = zf.read(name)
+            if name.endswith(('.xml', '.rels')):
+                if name == CORE_PART:
+                    data = _CORE_NOISE.sub(b'', data)
+                try:
+                    data = _NOISE.sub(b'', _c14n(etree.fromstring(data)))
+                except etree.XMLSyntaxError:
+                    pass
+            digests[name] = _digest(data)
+    return digests
+
+
+def _opcodes(a, b):
+    """difflib opcodes of ``a`` and ``b``, the common ends matched first.
+
+    Golden documents are mostly equal; trimming the ends keeps the matcher
+    on the changed middle.
+    """
+    n = min(len(a), len(b))
+    head = 0
+    while head < n and a[head] == b[head]:
+        head += 1
+    tail = 0
+    while tail < n - head and a[-1 - tail] == b[-1 - tail]:
+        tail += 1
+    ops = [('equal', 0, head, 0, head)] if head else []
+    matcher = SequenceMatcher(None, a[head:len(a) - tail], b[head:len(b) - tail],
+                              autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        ops.append((tag, i1 + head, i2 + head, j1 + head, j2 + head))
+    if tail:
+        ops.append(('equal', len(a) - tail, len(a), len(b) - tail, len(b)))
+    return ops
+
+
+def _name(section, index):
+    if section.title is LAYOUT:
+        return 'mise en page du document'
+    return f'section {index + 1}' + (f' "{section.title}"' if section.title else '')
+
+
+_KINDS = {'paragraph': 'paragraphe', 'table': 'tableau', 'layout': 'mise en page'}
+_ITEMS = {'paragraph': 'run', 'table': 'ligne'}
+
+
+def _block_changes(a, b, i, j):
+    """Lines describing how block ``a`` (index ``i``) became block ``b`` (``j``)."""
+    where = f'{_KINDS[a.kind]} {i + 1}' + (f' (-> {j + 1})' if i != j else '')
+    if a.kind != b.kind or a.kind == 'layout':
+        return [f'{where} modifie']
+    changes = []
+    item = _ITEMS[a.kind]
+    for tag, i1, i2, j1, j2 in _opcodes(a.items, b.items):
+        if tag == 'equal':
+            continue
+        for k in range(max(i2 - i1, j2 - j1)):
+            old = a.labels[i1 + k] if i1 + k < i2 else None
+            new = b.labels[j1 + k] if j1 + k < j2 else None
+            if old is None:
+                changes.append(f'{item} {j1 + k + 1} ajoute : "{new}"')
+            elif new is None:
+                changes.append(f'{item} {i1 + k + 1} supprime : "{old}"')
+            elif old == new:
+                changes.append(f'{item} {i1 + k + 1} : mise en forme ("{old}")')
+            else:
+                changes.append(f'{item} {i1 + k + 1} : "{old}" -> "{new}"')
+    if not changes:
+        # Same runs or rows: the paragraph or table properties changed.
+        changes.append('mise en forme')
+    return [f'{where}, {change}' for change in changes]
+
+
+class SectionDiff:
+    """One section added, removed or changed; ``changes`` are the element lines."""
+
+    def __init__(self, op, index, section, changes=()):
+        self.op = op
+        self.index = index
+        self.section = section
+        self.changes = list(changes)
+
+    def lines(self):
+        name = _name(self.section, self.index)
+        if self.op == 'added':
+            return [f'+ {name} ({self.section.size} elements)']
+        if self.op == 'removed':
+            return [f'- {name} ({self.section.size} elements)']
+        return [f'~ {name}'] + [f'    {change}' for change in self.changes]
+
+
+class DiffReport:
+    """Differences between two documents; false when they are the same."""
+
+    def __init__(self):
+        self.sections = []
+        self.parts = []
+        self.compared = 0
+        self.blocks = 0
+        self.seconds = 0.0
+
+    def __bool__(self):
+        return bool(self.sections or self.parts)
+
+    def lines(self, limit=None):
+        lines = []
+        for op, name in self.parts:
+            lines.append({'added': '+ ', 'removed': '- ', 'changed': '~ '}[op] + name)
+        for section in self.sections:
+            lines += section.lines()
+        if limit is not None and len(lines) > limit:
+            lines = lines[:limit] + [f'... {len(lines) - limit} lignes de plus']
+        return lines
+
+    def summary(self):
+        if not self:
+            return (f'identiques : {self.compared} sections, {self.blocks} elements '
+                    f'en {self.seconds * 1000:.0f} ms')
+        return (f'{len(self.sections)} sections et {len(self.parts)} parties differentes '
+                f'sur {self.compared} sections, {self.blocks} elements '
+                f'en {self.seconds * 1000:.0f} ms')
+
+    def __str__(self):
+        return '\n'.join(self.lines() + [self.summary()])
+
+
+def diff_documents(a, b):
+    """Compare the .docx ``a`` and ``b`` (paths, bytes or binary files); returns a DiffReport."""
+    start = time.perf_counter()
+    report = DiffReport()
+    parts_a, parts_b = _part_digests(a), _part_digests(b)
+    for name in sorted(parts_a.keys() | parts_b.keys()):
+        if name not in parts_b:
+            report.parts.append(('removed', name))
+        elif name not in parts_a:
+            report.parts.append(('added', name))
+        elif parts_a[name] != parts_b[name]:
+            report.parts.append(('changed', name))
+
+    rest_a, rest_b = hashlib.sha1(), hashlib.sha1()
+    old, new = read_sections(a, rest_a), read_sections(b, rest_b)
+    if rest_a.digest() != rest_b.digest():
+        # Root element, namespaces, w:background...: outside any section.
+        report.parts.append(('changed', f'{DOCUMENT_PART} (hors du corps)'))
+    report.compared = max(len(old), len(new))
+    report.blocks = sum(s.size for s in new)
+    pairs = []
+    for tag, i1, i2, j1, j2 in _opcodes([s.digest for s in old], [s.digest for s in new]):
+        if tag == 'equal':
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+        for k in range(paired):
+            pairs.append((i1 + k, j1 + k))
+            report.sections.append(SectionDiff('changed', j1 + k, new[j1 + k]))
+        for k in range(i1 + paired, i2):
+            report.sections.append(SectionDiff('removed', k, old[k]))
+        for k in range(j1 + paired, j2):
+            report.sections.append(SectionDiff('added', k, new[k]))
+    if pairs:
+        # Second pass, over the changed sections only.
+        read_blocks(a, {i: old[i] for i, _ in pairs})
+        read_blocks(b, {j: new[j] for _, j in pairs})
+        changed = iter(pairs)
+        for diff in report.sections:
+            if diff.op == 'changed':
+                i, j = next(changed)
+                diff.changes = _section_changes(old[i], new[j])
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _section_changes(a, b):
+    changes = []
+    if a.title != b.title:
+        changes.append(f'titre : "{a.title or ""}" -> "{b.title or ""}"')
+    ops = _opcodes([block.digest for block in a.blocks], [block.digest for block in b.blocks])
+    for tag, i1, i2, j1, j2 in ops:
+        if tag == 'equal':
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+        for k in range(paired):
+            changes += _block_changes(a.blocks[i1 + k], b.blocks[j1 + k], i1 + k, j1 + k)
+        for k in range(i1 + paired, i2):
+            block = a.blocks[k]
+            changes.append(f'{_KINDS[block.kind]} {k + 1} supprime : "{block.label}"')
+        for k in range(j1 + paired, j2):
+            block = b.blocks[k]
+            changes.append(f'{_KINDS[block.kind]} {k + 1} ajoute : "{block.label}"')
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m report.diff',
+        description='Compare deux .docx par structure (sections, paragraphes, runs, '
+                    'lignes de tableau), sans tenir compte des metadonnees du zip.')
+    parser.add_argument('reference', help='.docx de reference')
+    parser.add_argument('document', help='.docx a comparer')
+    parser.add_argument('-n', '--max-lines', type=int, default=200,
+                        help='lignes de differences affichees au plus (defaut : 200)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='aucun message, seulement le code de sortie')
+    args = parser.parse_args(argv)
+
+    from lxml import etree
+    try:
+        report = diff_documents(args.reference, args.document)
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    if not args.quiet:
+        for line in report.lines(args.max_lines):
+            print(line)
+        print(report.summary(), file=sys.stderr)
+    return 1 if report else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
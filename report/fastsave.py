@@ -0,0 +1,203 @@
+"""Save a python-docx Document with its parts serialized in parallel.
+
+Document.save() serializes and deflates every part one after the other.
+save_document() does both for each part in a thread pool (lxml and zlib
+release the GIL while they work); word/document.xml, by far the largest,
+is itself cut into runs of body elements and table rows that are
+serialized and deflated apart (document_pieces()).  Entries are written
+in the usual part order as they complete, straight to the output: no zip
+is built in memory first, so a path, a file object (seekable or not) or a
+BytesIO receive the bytes once.
+
+Each part gets its own compression level (part_level()): media are stored,
+being compressed already, and ``compresslevel=0`` stores everything, for
+drafts.  Entries carry the fixed ZIP_EPOCH timestamp, so the same document
+saves to the same bytes.
+"""
+import io
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import atomic_write
+from .package import DOCUMENT_PART, ZIP_EPOCH, part_level
+
+_LOCAL = struct.Struct('<4s2B4HL2L2H')
+_CENTRAL = struct.Struct('<4s4B4HL2L5H2L')
+_END = struct.Struct('<4s4H2LH')
+
+_DOS_TIME = (ZIP_EPOCH[3] << 11) | (ZIP_EPOCH[4] << 5) | (ZIP_EPOCH[5] // 2)
+_DOS_DATE = ((ZIP_EPOCH[0] - 1980) << 9) | (ZIP_EPOCH[1] << 5) | ZIP_EPOCH[2]
+
+_STORED, _DEFLATED = 0, 8
+_LIMIT = 0xFFFFFFFF
+
+# Pieces (body children or table rows) of word/document.xml per thread job.
+PIECE_SIZE = 512
+
+
+def iter_parts(doc):
+    """Yield (name, get_blob) for every entry of ``doc``'s package, in save order."""
+    from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+    from docx.opc.pkgwriter import _ContentTypesItem
+    package = doc.part.package
+    parts = list(package.iter_parts())
+    for part in parts:
+        part.before_marshal()
+    yield CONTENT_TYPES_URI.membername, lambda: _ContentTypesItem.from_parts(parts).blob
+    yield PACKAGE_URI.rels_uri.membername, lambda: package.rels.xml
+    for part in parts:
+        yield part.partname.membername, lambda part=part: part.blob
+        if len(part.rels):
+            yield part.partname.rels_uri.membername, lambda part=part: part.rels.xml
+
+
+def _pack(pieces, level, last):
+    """Serialize and compress one run of entry pieces.
+
+    Every run is deflated on its own and ends on a byte boundary (sync
+    flush), so the runs of an entry concatenate into one deflate stream.
+    """
+    data = b''.join(piece() for piece in pieces)
+    if not level:
+        return data, data
+    c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return data, c.compress(data) + c.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _strip_nsdecls(data, decls):
+    # Namespaces are declared on the root; lxml repeats the ones in scope
+    # on the start tag of an element serialized on its own.
+    end = data.index(b'>')
+    tag = data[:end]
+    for decl in decls:
+        if decl in tag:
+            tag = tag.replace(decl, b'', 1)
+    return tag + data[end:]
+
+
+def document_pieces(root):
+    """word/document.xml as a list of pieces (callables returning bytes), in order.
+
+    The pieces are the body's children, and the rows of its long tables,
+    so one big table is spread over the threads too.  Joined, they give
+    the bytes of serialize_part_xml(root).
+    """
+    from copy import deepcopy
+    from docx.oxml.ns import qn
+    from lxml import etree
+    decls = [f' xmlns:{prefix}="{uri}"'.encode() for prefix, uri in root.nsmap.items()]
+
+    def element(el):
+        return lambda: _strip_nsdecls(etree.tostring(el, encoding='UTF-8'), decls)
+
+    def shell(el, keep, nsmap=None):
+        # A copy of ``el`` with copies of its ``keep`` children only (moving
+        # ``el`` itself out of the tree would cost a walk of its subtree).
+        copy = etree.Element(el.tag, dict(el.attrib), nsmap=nsmap or root.nsmap)
+        for child in keep:
+            copy.append(deepcopy(child))
+        return copy
+
+    body = root.find(qn('w:body'))
+    top = shell(root, [c for c in root if c is not body])
+    top.insert(root.index(body), etree.Element(body.tag))
+    head, tail = etree.tostring(top, encoding='UTF-8', standalone=True).split(b'<w:body/>')
+    pieces = [lambda: head + b'<w:body>']
+    tr = qn('w:tr')
+    for child in body:
+        rows = child.findall(tr) if child.tag == qn('w:tbl') else ()
+        if len(rows) < PIECE_SIZE:
+            pieces.append(element(child))
+            continue
+        # Rows come last in a table: the table without them, then each row.
+        start = element(shell(child, [c for c in child if c.tag != tr]))()[:-len(b'</w:tbl>')]
+        pieces.append(lambda start=start: start)
+        pieces.extend(element(row) for row in rows)
+        pieces.append(lambda: b'</w:tbl>')
+    pieces.append(lambda: b'</w:body>' + tail)
+    return pieces
+
+
+class _ZipWriter:
+    """Minimal zip writer for entries compressed beforehand; needs no seek()."""
+
+    def __init__(self, out):
+        self._out = out
+        self._offset = 0
+        self._central = []
+
+    def _emit(self, data):
+        self._out.write(data)
+        self._offset += len(data)
+
+    def add(self, name, method, crc, size, chunks):
+        """Add an entry whose (compressed) data is the concatenation of ``chunks``."""
+        packed = sum(len(chunk) for chunk in chunks)
+        if self._offset > _LIMIT or size > _LIMIT or packed > _LIMIT:
+            raise ValueError('package too large for a zip without ZIP64')
+        raw = name.encode('utf-8')
+        flags = 0 if raw.isascii() else 0x800
+        self._central.append(_CENTRAL.pack(
+            b'PK\x01\x02', 20, 3, 20, 0, flags, method, _DOS_TIME, _DOS_DATE,
+            crc, packed, size, len(raw), 0, 0, 0, 0, 0o600 << 16, self._offset) + raw)
+        self._emit(_LOCAL.pack(b'PK\x03\x04', 20, 0, flags, method, _DOS_TIME, _DOS_DATE,
+                               crc, packed, size, len(raw), 0) + raw)
+        for chunk in chunks:
+            self._emit(chunk)
+
+    def close(self):
+        start = self._offset
+        for entry in self._central:
+            self._emit(entry)
+        self._emit(_END.pack(b'PK\x05\x06', 0, 0, len(self._central), len(self._central),
+                             self._offset - start, start, 0))
+
+
+def save_document(doc, out, compresslevel=6, workers=None):
+    """Save ``doc`` to a path, a binary file object or ``'-'`` for stdout.
+
+    ``compresslevel`` is the deflate level of the XML parts (0: stored);
+    ``workers`` the number of serializing threads (default: one per CPU).
+    """
+    workers = workers or os.cpu_count() or 1
+    if out == '-':
+        _save(doc, sys.stdout.buffer, compresslevel, workers)
+        sys.stdout.buffer.flush()
+    elif hasattr(out, 'write'):
+        _save(doc, out, compresslevel, workers)
+    else:
+        # Written beside the target and renamed: readers never see half a file.
+        buf = io.BytesIO()
+        _save(doc, buf, compresslevel, workers)
+        atomic_write(out, buf.getvalue())
+
+
+def _save(doc, f, compresslevel, workers):
+    writer = _ZipWriter(f)
+    with ThreadPoolExecutor(workers) as pool:
+        entries = []
+        for name, get_blob in iter_parts(doc):
+            level = part_level(name, compresslevel)
+            if name == DOCUMENT_PART and workers > 1:
+                # Serializing piece by piece costs more than in one go: only
+                # worth it when the pieces do run in parallel.
+                pieces = document_pieces(doc.element)
+                runs = [pieces[i:i + PIECE_SIZE] for i in range(0, len(pieces), PIECE_SIZE)]
+            else:
+                runs = [[get_blob]]
+            jobs = [pool.submit(_pack, run, level, i == len(runs) - 1)
+                    for i, run in enumerate(runs)]
+            entries.append((name, level, jobs))
+        # Entries are written in package order as their jobs complete.
+        for name, level, jobs in entries:
+            crc, size, chunks = 0, 0, []
+            for job in jobs:
+                data, packed = job.result()
+                crc = zlib.crc32(data, crc)
+                size += len(data)
+                chunks.append(packed)
+            writer.add(name, _DEFLATED if level else _STORED, crc, size, chunks)
+    writer.close()
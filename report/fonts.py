@@ -0,0 +1,421 @@
+"""Font embedding: subsets of the report fonts, obfuscated, in the package.
+
+Without Georgia and Calibri installed, Word and LibreOffice substitute
+other fonts and the layout moves.  With embedding, the package carries,
+for every face the document sets (family, bold, italic), a subset of the
+font holding only the characters set in that face, symbols such as ⌖, ◈
+and ★ included, so it adds kilobytes rather than megabytes.  Font files
+are looked up as in metrics.py: the family, or its metric-compatible
+equivalent (Carlito for Calibri...); an equivalent is renamed, in its
+name table, to the family it stands for, as Word matches embedded fonts
+by name.  A face without a file of its own (italic, say) goes into the
+regular one of its weight, which Word slants.
+
+Fonts are stored as ECMA-376 requires: obfuscated .odttf parts (the first
+32 bytes XORed with the w:fontKey GUID) related to word/fontTable.xml,
+with w:embedTrueTypeFonts and w:saveSubsetFonts set in settings.xml.
+Fonts whose licence forbids embedding (OS/2 fsType) are left out.
+
+Subsets are kept in the report cache (``fonts/``), keyed by a hash of the
+font file and of the code points, so batch runs subset each font once;
+the font key is derived from the same hash, and a document embeds to the
+same bytes every time.
+
+fontTools is optional: without it, or without the font files, nothing is
+embedded and EmbedStats says so.
+"""
+import hashlib
+import io
+import logging
+import os
+import uuid
+import zipfile
+
+from .cache import atomic_write, cache_dir
+from .metrics import find_font
+
+# Bump when subset_font() output changes for the same input.
+SUBSET_VERSION = 2
+
+FONT_TABLE_PART = 'word/fontTable.xml'
+FONT_TABLE_RELS_PART = 'word/_rels/fontTable.xml.rels'
+SETTINGS_PART = 'word/settings.xml'
+THEME_PART = 'word/theme/theme1.xml'
+FONTS_DIR = 'word/fonts/'
+
+FONT_RELTYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/font'
+OBFUSCATED_FONT_TYPE = 'application/vnd.openxmlformats-officedocument.obfuscatedFont'
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+_OFF = {'0', 'false', 'off'}
+
+KINDS = ('Regular', 'Bold', 'Italic', 'BoldItalic')
+
+# Name IDs that carry the family: family, full name, PostScript name,
+# typographic family.
+FAMILY_NAME_IDS = (1, 4, 6, 16)
+
+# Children of w:settings that come before w:embedTrueTypeFonts (CT_Settings).
+_SETTINGS_BEFORE = {f'{_W}{tag}' for tag in (
+    'writeProtection', 'view', 'zoom', 'removePersonalInformation', 'removeDateAndTime',
+    'doNotDisplayPageBoundaries', 'displayBackgroundShape', 'printPostScriptOverText',
+    'printFractionalCharacterWidth', 'printFormsData')}
+# Children of w:font that come before the embed elements (CT_Font).
+_FONT_BEFORE = {f'{_W}{tag}' for tag in (
+    'altName', 'panose1', 'charset', 'family', 'notTrueType', 'pitch', 'sig')}
+
+_memo = {}
+
+
+class EmbedStats:
+
+    def __init__(self):
+        self.fonts = 0
+        self.glyphs = 0
+        self.bytes = 0
+        self.cached = 0
+        self.missing = []     # families without a font file
+        self.restricted = []  # fonts whose licence forbids embedding
+        self.disabled = None  # why nothing could be embedded
+
+    def __str__(self):
+        if self.disabled:
+            return f'polices non integrees ({self.disabled})'
+        text = (f'{self.fonts} polices integrees, {self.glyphs} caracteres, '
+                f'{self.bytes / 1024:.0f} Kio ({self.cached} depuis le cache)')
+        if self.missing:
+            text += f', introuvables : {", ".join(sorted(set(self.missing)))}'
+        if self.restricted:
+            text += f', licence restreinte : {", ".join(sorted(set(self.restricted)))}'
+        return text
+
+
+class EmbeddedFont:
+    """One obfuscated font part: ``data`` for face ``kind`` of ``family``."""
+
+    def __init__(self, family, kind, key, data):
+        self.family = family
+        self.kind = kind
+        self.key = key
+        self.data = data
+
+    @property
+    def name(self):
+        return f'{FONTS_DIR}{self.key[1:9].lower()}{self.key[10:14].lower()}.odttf'
+
+
+def _toggle(rpr, tag):
+    el = rpr.find(f'{_W}{tag}')
+    if el is None:
+        return None
+    return el.get(f'{_W}val', 'true') not in _OFF
+
+
+class FontUsage:
+    """Characters set in each face (family, bold, italic) of a document.
+
+    Faces are resolved like Word does: direct run formatting, then the
+    character style, the paragraph style and the document defaults, each
+    style through its basedOn chain; theme fonts come from the theme.
+    """
+
+    def __init__(self, styles, theme=None):
+        from lxml import etree
+        self.faces = {}
+        self._styles = {s.get(f'{_W}styleId'): s for s in styles.iterfind(f'{_W}style')}
+        self._defaults = {}
+        self._theme = {}
+        if theme is not None:
+            root = etree.fromstring(theme)
+            for slot in ('major', 'minor'):
+                latin = root.find(f'.//{_A}{slot}Font/{_A}latin')
+                if latin is not None:
+                    self._theme[slot] = latin.get('typeface')
+        self._defaults = self._props(styles.find(f'{_W}docDefaults/{_W}rPrDefault/{_W}rPr'))
+        self._default_para = next((sid for sid, s in self._styles.items()
+                                   if s.get(f'{_W}type') == 'paragraph'
+                                   and s.get(f'{_W}default') in ('1', 'true')), None)
+        self._resolved = {}
+
+    @classmethod
+    def from_package(cls, blob):
+        """FontUsage with the styles and theme of the .docx ``blob``."""
+        from lxml import etree
+        with zipfile.ZipFile(io.BytesIO(blob)) as src:
+            styles = etree.fromstring(src.read('word/styles.xml'))
+            names = set(src.namelist())
+            theme = src.read(THEME_PART) if THEME_PART in names else None
+        return cls(styles, theme)
+
+    def _props(self, rpr):
+        props = {}
+        if rpr is None:
+            return props
+        fonts = rpr.find(f'{_W}rFonts')
+        if fonts is not None:
+            theme = fonts.get(f'{_W}asciiTheme') or fonts.get(f'{_W}hAnsiTheme')
+            name = self._theme.get(theme[:5]) if theme else None
+            name = name or fonts.get(f'{_W}ascii') or fonts.get(f'{_W}hAnsi')
+            if name:
+                props['font'] = name
+        for tag, key in (('b', 'bold'), ('i', 'italic')):
+            value = _toggle(rpr, tag)
+            if value is not None:
+                props[key] = value
+        return props
+
+    def _style(self, sid, seen=()):
+        if sid not in self._resolved:
+            style = self._styles.get(sid)
+            props = {}
+            if style is not None and sid not in seen:
+                based = style.find(f'{_W}basedOn')
+                if based is not None:
+                    props.update(self._style(based.get(f'{_W}val'), seen + (sid,)))
+                props.update(self._props(style.find(f'{_W}rPr')))
+            self._resolved[sid] = props
+        return self._resolved[sid]
+
+    def add(self, element):
+        """Count the characters of the runs in ``element`` (body, block or row)."""
+        for p in element.iter(f'{_W}p'):
+            pstyle = p.find(f'{_W}pPr/{_W}pStyle')
+            pstyle = pstyle.get(f'{_W}val') if pstyle is not None else None
+            for r in p.iter(f'{_W}r'):
+                text = ''.join(t.text or '' for t in r.iter(f'{_W}t'))
+                if text:
+                    self.add_run(pstyle, r.find(f'{_W}rPr'), text)
+
+    def add_run(self, pstyle, rpr, text):
+        """Count ``text``, set with run properties ``rpr`` in a ``pstyle`` paragraph."""
+        props = dict(self._defaults, **self._style(pstyle or self._default_para))
+        if rpr is not None:
+            rstyle = rpr.find(f'{_W}rStyle')
+            if rstyle is not None:
+                props.update(self._style(rstyle.get(f'{_W}val')))
+            props.update(self._props(rpr))
+        face = (props.get('font') or self._theme.get('minor', 'Calibri'),
+                props.get('bold', False), props.get('italic', False))
+        self.faces.setdefault(face, set()).update(text)
+
+
+def obfuscate(data, key):
+    """``data`` with its first 32 bytes XORed with GUID ``key`` (ECMA-376 17.8.1)."""
+    mask = bytes.fromhex(key.strip('{}').replace('-', ''))[::-1]
+    return bytes(b ^ mask[i % 16] for i, b in enumerate(data[:32])) + data[32:]
+
+
+def subset_font(path, chars, family=None, kind='Regular'):
+    """(hash, bytes, cached) of the subset of font ``path`` to ``chars``.
+
+    With ``family``, the subset is named as face ``kind`` of that family.
+    Returns None when the font licence forbids embedding.  The whole font
+    is kept when it forbids subsetting.
+    """
+    import fontTools
+    st = os.stat(path)
+    text = ''.join(sorted(chars))
+    key = hashlib.sha256(f'{SUBSET_VERSION}:{fontTools.version}:{path}:{st.st_size}:'
+                         f'{st.st_mtime_ns}:{family}:{kind}\0{text}'.encode()).hexdigest()[:32]
+    if key in _memo:
+        return key, _memo[key], True
+    cached = os.path.join(cache_dir('fonts'), key + '.ttf')
+    try:
+        with open(cached, 'rb') as f:
+            data = f.read()
+        hit = True
+    except FileNotFoundError:
+        data = _subset(path, text, family, kind)
+        if data is None:
+            return None
+        atomic_write(cached, data)
+        hit = False
+    _memo[key] = data
+    return key, data, hit
+
+
+def _subset(path, text, family=None, kind='Regular'):
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    # Tables it does not know (FFTM...) are dropped with a warning each time.
+    logging.getLogger('fontTools.subset').setLevel(logging.ERROR)
+    options = subset.Options()
+    options.name_IDs = ['*']          # the font keeps its names
+    options.name_languages = ['*']
+    options.notdef_outline = True
+    with TTFont(path, recalcTimestamp=False) as font:
+        fs_type = font['OS/2'].fsType if 'OS/2' in font else 0
+        if fs_type & 0x000F == 0x0002 or fs_type & 0x0200:
+            return None  # restricted licence, or bitmap embedding only
+        if not fs_type & 0x0100:
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(unicodes=[ord(ch) for ch in text])
+            subsetter.subset(font)
+        if family is not None:
+            rename(font, family, kind)
+        buf = io.BytesIO()
+        font.save(buf)
+    return buf.getvalue()
+
+
+def rename(font, family, kind='Regular'):
+    """Name TTFont ``font`` as face ``kind`` of ``family``, if it is another family."""
+    name = font['name']
+    if (name.getDebugName(16) or name.getDebugName(1)) == family:
+        return
+    style = {'Regular': 'Regular', 'Bold': 'Bold', 'Italic': 'Italic',
+             'BoldItalic': 'Bold Italic'}[kind]
+    names = {1: family, 16: family,
+             4: family if kind == 'Regular' else f'{family} {style}',
+             6: f'{family}-{kind}'.replace(' ', '')}
+    for record in name.names:
+        if record.nameID in FAMILY_NAME_IDS:
+            record.string = names[record.nameID]
+
+
+def _has_fonttools():
+    try:
+        import fontTools.subset  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def embed_fonts(usage, stats=None):
+    """EmbeddedFont list for the faces of FontUsage ``usage``, in a stable order."""
+    stats = stats if stats is not None else EmbedStats()
+    if not _has_fonttools():
+        stats.disabled = 'fontTools non installe'
+        return []
+    # A face without a file of its own joins the nearest one of its family.
+    groups = {}
+    for (family, bold, italic), chars in sorted(usage.faces.items()):
+        for b, i in dict.fromkeys([(bold, italic), (bold, False), (False, False)]):
+            path = find_font(family, b, i)
+            if path is not None:
+                groups.setdefault((family, KINDS[b + 2 * i], path), set()).update(chars)
+                break
+        else:
+            stats.missing.append(family)
+    fonts = []
+    for (family, kind, path), chars in sorted(groups.items()):
+        result = subset_font(path, chars, family, kind)
+        if result is None:
+            stats.restricted.append(os.path.basename(path))
+            continue
+        key, data, hit = result
+        guid = '{%s}' % str(uuid.UUID(hex=key)).upper()
+        fonts.append(EmbeddedFont(family, kind, guid, obfuscate(data, guid)))
+        stats.fonts += 1
+        stats.glyphs += len(chars)
+        stats.bytes += len(data)
+        stats.cached += hit
+    return fonts
+
+
+def font_table_xml(blob, fonts, rids):
+    """word/fontTable.xml ``blob`` with w:embed* entries for ``fonts`` (ids ``rids``)."""
+    from lxml import etree
+    root = etree.fromstring(blob)
+    entries = {font.get(f'{_W}name'): font for font in root.iterfind(f'{_W}font')}
+    for font, rid in sorted(zip(fonts, rids), key=lambda item: KINDS.index(item[0].kind)):
+        entry = entries.get(font.family)
+        if entry is None:
+            entry = entries[font.family] = etree.SubElement(root, f'{_W}font')
+            entry.set(f'{_W}name', font.family)
+        for old in entry.findall(f'{_W}embed{font.kind}'):
+            entry.remove(old)
+        embed = etree.Element(f'{_W}embed{font.kind}')
+        embed.set(f'{_R}id', rid)
+        embed.set(f'{_W}fontKey', font.key)
+        embed.set(f'{_W}subsetted', '1')
+        entry.append(embed)
+    # embedRegular, embedBold... come last, in that order.
+    for entry in entries.values():
+        embeds = [c for c in entry if c.tag.startswith(f'{_W}embed')]
+        embeds.sort(key=lambda c: KINDS.index(c.tag[len(f'{_W}embed'):]))
+        for child in embeds:
+            entry.append(child)
+    return etree.tostring(root, encoding='UTF-8', standalone=True)
+
+
+def enable_embedding(settings):
+    """Set w:embedTrueTypeFonts and w:saveSubsetFonts on the w:settings element."""
+    from lxml import etree
+    index = 0
+    for i, child in enumerate(settings):
+        if child.tag in _SETTINGS_BEFORE:
+            index = i + 1
+    for tag in ('saveSubsetFonts', 'embedTrueTypeFonts'):
+        if settings.find(f'{_W}{tag}') is None:
+            settings.insert(index, etree.Element(f'{_W}{tag}'))
+
+
+def _font_rels(fonts, rels=None):
+    rids = [f'rIdFont{i}' for i in range(1, len(fonts) + 1)]
+    entries = ''.join(f'<Relationship Id="{rid}" Type="{FONT_RELTYPE}" '
+                      f'Target="{font.name[len("word/"):]}"/>'
+                      for font, rid in zip(fonts, rids)).encode()
+    if rels is None:
+        rels = (b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+                b'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+                b'relationships"></Relationships>')
+    return rids, rels.replace(b'</Relationships>', entries + b'</Relationships>')
+
+
+def embed_base(base, usage, stats=None):
+    """The package ``base`` (bytes) with the fonts of ``usage`` embedded.
+
+    Only fontTable.xml, its relationships, settings.xml, the content types
+    and the font parts change; everything else is copied as is.
+    """
+    from lxml import etree
+    from .package import CONTENT_TYPES_PART, ZIP_EPOCH
+    fonts = embed_fonts(usage, stats)
+    if not fonts:
+        return base
+    with zipfile.ZipFile(io.BytesIO(base)) as src:
+        parts = {name: src.read(name) for name in src.namelist()}
+    rids, parts[FONT_TABLE_RELS_PART] = _font_rels(fonts, parts.get(FONT_TABLE_RELS_PART))
+    parts[FONT_TABLE_PART] = font_table_xml(parts[FONT_TABLE_PART], fonts, rids)
+    settings = etree.fromstring(parts[SETTINGS_PART])
+    enable_embedding(settings)
+    parts[SETTINGS_PART] = etree.tostring(settings, encoding='UTF-8', standalone=True)
+    types = parts[CONTENT_TYPES_PART]
+    if b'Extension="odttf"' not in types:
+        parts[CONTENT_TYPES_PART] = types.replace(
+            b'</Types>', f'<Default Extension="odttf" ContentType="{OBFUSCATED_FONT_TYPE}"/>'
+                         f'</Types>'.encode())
+    for font in fonts:
+        parts[font.name] = font.data
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as out:
+        for name, data in parts.items():
+            info = zipfile.ZipInfo(name, ZIP_EPOCH)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            out.writestr(info, data)
+    return buf.getvalue()
+
+
+def embed_document(doc):
+    """Embed the fonts of python-docx Document ``doc`` in its package; returns EmbedStats."""
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+    from docx.opc.packuri import PackURI
+    from docx.opc.part import Part
+    stats = EmbedStats()
+    theme = doc.part.part_related_by(RT.THEME).blob
+    usage = FontUsage(doc.styles.element, theme)
+    usage.add(doc.element.body)
+    fonts = embed_fonts(usage, stats)
+    if not fonts:
+        return stats
+    table = doc.part.part_related_by(RT.FONT_TABLE)
+    rids = [f'rIdFont{i}' for i in range(1, len(fonts) + 1)]
+    for font, rid in zip(fonts, rids):
+        part = Part(PackURI('/' + font.name), OBFUSCATED_FONT_TYPE, font.data, table.package)
+        table.rels.add_relationship(RT.FONT, part, rid)
+    table._blob = font_table_xml(table.blob, fonts, rids)
+    enable_embedding(doc.settings.element)
+    return stats
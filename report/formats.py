@@ -0,0 +1,125 @@
+"""Output formats and multi-output rendering.
+
+A backend is ``render(spec, out, **options)``; ``out`` is a path, a
+binary file object or ``'-'`` for stdout.  The format of an output path is
+taken from its extension (FORMATS).  render_outputs() renders one spec to
+several outputs at once, one thread per output: the HTML and Markdown
+backends are pure Python string building, so they finish long before the
+.docx and can be used on their own as a quick preview (they import neither
+python-docx nor lxml).
+"""
+import os
+import sys
+
+
+def render_docx(spec, out, optimize=False, stream=False, cache=True, jobs=1, compresslevel=6,
+                embed_fonts=False, ir=False):
+    """Word backend; returns OptimizeStats, BuildStats, EmbedStats or None."""
+    if ir:
+        if optimize:
+            raise ValueError('the compact model (ir) does not support optimize')
+        from .ir import ir_report
+        return ir_report(spec, out, compresslevel=compresslevel, embed_fonts=embed_fonts)
+    if stream:
+        from .stream import stream_report
+        return stream_report(spec, out, optimize=optimize, compresslevel=compresslevel,
+                             embed_fonts=embed_fonts)
+    if not optimize:
+        # The optimizer needs the whole document; it bypasses the fragments.
+        from .incremental import build_incremental
+        return build_incremental(spec, out, cache=None if cache else False, jobs=jobs,
+                                 compresslevel=compresslevel, embed_fonts=embed_fonts)
+    from .build import build_report, save
+    doc = build_report(spec)
+    stats = None
+    if optimize:
+        from .optimize import optimize as optimize_doc
+        stats = optimize_doc(doc)
+    if embed_fonts:
+        from .fonts import embed_document
+        font_stats = embed_document(doc)
+        if stats is None:
+            stats = font_stats
+        else:
+            stats.fonts = font_stats
+    save(doc, out, compresslevel)
+    return stats
+
+
+def _text_backend(chunks):
+    def render(spec, out, **options):
+        if out == '-':
+            for chunk in chunks(spec):
+                sys.stdout.write(chunk)
+            sys.stdout.flush()
+        elif isinstance(out, (str, os.PathLike)):
+            # Written beside the target and renamed, like the .docx outputs.
+            from .cache import atomic_write
+            atomic_write(out, ''.join(chunks(spec)).encode('utf-8'))
+        else:
+            for chunk in chunks(spec):
+                out.write(chunk.encode('utf-8'))
+        return None
+    return render
+
+
+def _html(spec):
+    from .html import iter_html
+    return iter_html(spec)
+
+
+def _markdown(spec):
+    from .markdown import iter_markdown
+    return iter_markdown(spec)
+
+
+FORMATS = {
+    'docx': render_docx,
+    'html': _text_backend(_html),
+    'md': _text_backend(_markdown),
+}
+
+EXTENSIONS = {'.docx': 'docx', '.html': 'html', '.htm': 'html', '.md': 'md',
+              '.markdown': 'md'}
+
+
+def format_of(path, default='docx'):
+    """Format name for output ``path`` ('-' gives ``default``)."""
+    if path == '-':
+        return default
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f'{path}: unknown output format {ext or "(no extension)"!r} '
+                         f'(expected one of {", ".join(sorted(EXTENSIONS))})')
+    return EXTENSIONS[ext]
+
+
+def materialize(spec):
+    """Copy of ``spec`` with generator sections turned into lists.
+
+    Needed as soon as several backends read the same spec.
+    """
+    return dict(spec, sections=[
+        s if isinstance(s['blocks'], list) else dict(s, blocks=list(s['blocks']))
+        for s in spec['sections']])
+
+
+def render_outputs(spec, outputs, docx_options=None):
+    """Render ``spec`` to every ``(format, out)`` of ``outputs`` concurrently.
+
+    Returns {out: backend result}, in the order of ``outputs``.
+    """
+    docx_options = docx_options or {}
+    if len(outputs) > 1:
+        spec = materialize(spec)
+
+    def run(item):
+        fmt, out = item
+        options = docx_options if fmt == 'docx' else {}
+        return FORMATS[fmt](spec, out, **options)
+
+    if len(outputs) == 1:
+        return {outputs[0][1]: run(outputs[0])}
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(len(outputs)) as pool:
+        return dict(zip((out for _, out in outputs), pool.map(run, outputs)))
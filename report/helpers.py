@@ -0,0 +1,97 @@
+import io
+
+from docx.shared import Pt, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import nsdecls
+from docx.oxml import parse_xml
+
+from . import theme
+from .template import BODY_STYLE, BULLET_STYLE, CAPTION_STYLE, DIVIDER_STYLE, style_id
+
+# --- COULEURS DU SITE ---
+GOLD = RGBColor.from_string(theme.PALETTE['gold'])
+GOLD_DARK = RGBColor.from_string(theme.PALETTE['gold_dark'])
+DARK_BG = RGBColor.from_string(theme.PALETTE['dark_bg'])
+DARK_CARD = RGBColor.from_string(theme.PALETTE['dark_card'])
+WHITE = RGBColor.from_string(theme.PALETTE['white'])
+WHITE_DIM = RGBColor.from_string(theme.PALETTE['white_dim'])
+ELECTRIC = RGBColor.from_string(theme.PALETTE['electric'])
+EMERALD = RGBColor.from_string(theme.PALETTE['emerald'])
+COSMIC = RGBColor.from_string(theme.PALETTE['cosmic'])
+
+
+# --- PAGE BACKGROUND ---
+def set_page_bg(doc, color_hex):
+    """Set page background color"""
+    bg = parse_xml(f'<w:background {nsdecls("w")} w:color="{color_hex}"/>')
+    doc.element.insert(0, bg)
+
+
+def set_cell_bg(cell, color_hex):
+    """Set table cell background"""
+    shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="{color_hex}" w:val="clear"/>')
+    cell._tc.get_or_add_tcPr().append(shading)
+
+
+# Font, size, colour and spacing come from the compiled styles (see
+# template.py); runs only carry what differs from their style.
+
+def _styled_paragraph(doc, style, text=''):
+    # Set by id: python-docx's lookup by name costs more than the paragraph.
+    p = doc.add_paragraph(text)
+    p._p.get_or_add_pPr().style = style_id(style)
+    return p
+
+
+def add_styled_heading(doc, text, level=1):
+    return doc.add_heading(text, level=level)
+
+
+def add_body_text(doc, text, bold=False, color=None, size=Pt(theme.BODY_SIZE), align=None):
+    p = _styled_paragraph(doc, BODY_STYLE)
+    if align:
+        p.alignment = align
+    run = p.add_run(text)
+    if size != Pt(theme.BODY_SIZE):
+        run.font.size = size
+    if color:
+        run.font.color.rgb = color
+    if bold:
+        run.bold = True
+    return p
+
+
+def add_bullet(doc, text, color=None):
+    p = _styled_paragraph(doc, BULLET_STYLE)
+    run = p.add_run(text)
+    if color:
+        run.font.color.rgb = color
+    return p
+
+
+def make_dark_table(doc, headers, rows, accent=GOLD):
+    """Dark table with banded rows; ``accent`` colours the header text and outer borders."""
+    from .tables import add_dark_table
+    return add_dark_table(doc, headers, rows, accent=accent)
+
+
+def add_section_divider(doc):
+    return _styled_paragraph(doc, DIVIDER_STYLE, theme.DIVIDER)
+
+
+def add_image(doc, source, width=None, caption=None, align=WD_ALIGN_PARAGRAPH.CENTER):
+    """Picture (path or bytes) in its own paragraph, with an optional caption.
+
+    ``width`` (a Length) defaults to, and is capped at, the text width.  The
+    image is downscaled and recompressed for that width (see assets.py).
+    """
+    from .assets import prepare
+    width = min(width or doc._block_width, doc._block_width)
+    p = doc.add_paragraph()
+    p.alignment = align
+    p.add_run().add_picture(io.BytesIO(prepare(source, width)), width=width)
+    if caption:
+        p.paragraph_format.space_after = Pt(2)
+        c = _styled_paragraph(doc, CAPTION_STYLE, caption)
+        c.alignment = align
+    return p
@@ -0,0 +1,135 @@
+"""HTML backend: the report spec as one standalone, dark/gold HTML page.
+
+Needs neither python-docx nor lxml, so it doubles as a quick preview.
+Blocks are written one by one, generator sections included.
+"""
+from html import escape
+
+from . import theme
+
+_P = theme.PALETTE
+
+CSS = f"""
+body {{ background: #{_P['dark_bg']}; color: #{_P['white_dim']}; margin: 0;
+       font: 11pt/1.55 {theme.BODY_FONT}, Carlito, sans-serif; }}
+main {{ max-width: 52rem; margin: 0 auto; padding: 3rem 1.5rem; }}
+h1, h2, h3, h4, h5, h6 {{ font-family: {theme.HEADING_FONT}, Gelasio, serif;
+                         color: #{_P['gold']}; font-weight: normal; }}
+p {{ margin: 0 0 6pt; }}
+ul {{ margin: 0 0 6pt; padding-left: 1.5rem; }}
+li {{ font-size: 10.5pt; }}
+.divider {{ color: #{_P['gold']}; font-size: 8pt; text-align: center; margin: 12pt 0;
+           overflow: hidden; white-space: nowrap; }}
+table {{ border-collapse: collapse; margin: 0 auto 12pt; border-top: 1px solid #{theme.TABLE_BORDER};
+        border-bottom: 1px solid #{theme.TABLE_BORDER}; }}
+th, td {{ border: 1px solid #{theme.TABLE_INNER_BORDER}; padding: 4pt 8pt; vertical-align: middle; }}
+th {{ background: #{theme.TABLE_HEADER_BG}; color: #{_P['gold']}; font: bold 10pt {theme.HEADING_FONT}, serif;
+     text-align: center; }}
+td {{ font-size: 9.5pt; color: #{_P['white_dim']}; }}
+tr:nth-child(odd) td {{ background: #{theme.TABLE_ROW_BG[0]}; }}
+tr:nth-child(even) td {{ background: #{theme.TABLE_ROW_BG[1]}; }}
+.page-break {{ break-after: page; }}
+figure {{ margin: 0 auto 10pt; max-width: 100%; text-align: center; }}
+figure img {{ width: 100%; }}
+figcaption {{ font-size: 9pt; font-style: italic; color: #{_P['white_dim']}; margin-top: 2pt; }}
+@media print {{ body {{ -webkit-print-color-adjust: exact; print-color-adjust: exact; }} }}
+"""
+
+
+def _style(**props):
+    css = '; '.join(f'{k.replace("_", "-")}: {v}' for k, v in props.items() if v is not None)
+    return f' style="{css}"' if css else ''
+
+
+def _color(value):
+    value = theme.resolve_color(value)
+    return f'#{value}' if value else None
+
+
+def _run(r):
+    html = escape(r['text'])
+    html = html.replace('\n', '<br>')
+    if r.get('bold'):
+        html = f'<strong>{html}</strong>'
+    if r.get('italic'):
+        html = f'<em>{html}</em>'
+    style = _style(font_family=r.get('font'),
+                   font_size=f'{r["size"]}pt' if 'size' in r else None,
+                   color=_color(r.get('color')))
+    return f'<span{style}>{html}</span>' if style else html
+
+
+def iter_blocks(blocks):
+    """Yield the HTML of ``blocks``; consecutive bullets share one <ul>."""
+    in_list = False
+    for block in blocks:
+        kind = block['type']
+        if kind != 'bullet' and in_list:
+            yield '</ul>\n'
+            in_list = False
+        if kind == 'heading':
+            level = min(6, block.get('level', 1))
+            yield f'<h{level}>{escape(block["text"])}</h{level}>\n'
+        elif kind == 'text':
+            style = _style(color=_color(block.get('color')),
+                           font_size=f'{block["size"]}pt' if 'size' in block else None,
+                           text_align=block.get('align'))
+            text = escape(block['text'])
+            if block.get('bold'):
+                text = f'<strong>{text}</strong>'
+            yield f'<p{style}>{text}</p>\n'
+        elif kind == 'bullet':
+            if not in_list:
+                yield '<ul>\n'
+                in_list = True
+            yield f'<li{_style(color=_color(block.get("color")))}>{escape(block["text"])}</li>\n'
+        elif kind == 'table':
+            accent = _color(block.get('accent'))
+            th = f'<th{_style(color=accent)}>'
+            head = ''.join(f'{th}{escape(h)}</th>' for h in block['headers'])
+            table = _style(border_top_color=accent, border_bottom_color=accent)
+            yield f'<table{table}>\n<thead><tr>{head}</tr></thead>\n<tbody>\n'
+            for row in block['rows']:
+                cells = ''.join(f'<td>{escape("" if v is None else str(v))}</td>' for v in row)
+                yield f'<tr>{cells}</tr>\n'
+            yield '</tbody>\n</table>\n'
+        elif kind == 'divider':
+            yield f'<div class="divider">{"─" * 40}</div>\n'
+        elif kind == 'paragraph':
+            runs = block.get('runs', ())
+            style = _style(text_align=block.get('align'),
+                           margin_top=_pt(block.get('space_before')),
+                           margin_bottom=_pt(block.get('space_after')))
+            yield f'<p{style}>{"".join(_run(r) for r in runs) or "&nbsp;"}</p>\n'
+        elif kind == 'page_break':
+            yield '<div class="page-break"></div>\n'
+        elif kind == 'image':
+            caption = block.get('caption')
+            style = _style(width=f'{block["width"]}cm' if 'width' in block else None,
+                           text_align=block.get('align'))
+            yield (f'<figure{style}><img src="{escape(block["path"])}" '
+                   f'alt="{escape(caption or "")}">')
+            yield f'<figcaption>{escape(caption)}</figcaption></figure>\n' if caption else '</figure>\n'
+    if in_list:
+        yield '</ul>\n'
+
+
+def _pt(value):
+    return None if value is None else f'{value}pt'
+
+
+def iter_html(spec, title='TimeTravel Agency'):
+    """Yield the page as chunks of text."""
+    yield ('<!DOCTYPE html>\n<html lang="fr">\n<head>\n<meta charset="utf-8">\n'
+           '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+           f'<title>{escape(title)}</title>\n<style>{CSS}</style>\n</head>\n<body>\n<main>\n')
+    for i, section in enumerate(spec['sections']):
+        cls = ' class="page-break"' if i < len(spec['sections']) - 1 else ''
+        yield f'<section id="{escape(section["id"])}"{cls}>\n'
+        yield from iter_blocks(section['blocks'])
+        yield '</section>\n'
+    yield '</main>\n</body>\n</html>\n'
+
+
+def render_html(spec, **options):
+    return ''.join(iter_html(spec, **options))
@@ -0,0 +1,381 @@
+"""Incremental build: sections rendered once, cached as XML fragments.
+
+Each section is keyed by a hash of its content, the compiled theme
+(theme_hash()) and the rendering code.  Its word/document.xml fragment is
+kept in the report cache (``sections/<key>.xml``); an unchanged section is
+stitched back in without python-docx touching it.  The package is written
+with fixed zip timestamps and a fixed part order, so an unchanged spec
+gives a byte-identical file and the write is skipped.
+
+Sections whose ``blocks`` are generators are rendered every time: their
+content cannot be hashed without consuming them.
+
+Images are the only relationships a section may add.  They are renamed
+after their content (``rIdImg<hash>``) so that fragments rendered apart
+agree on them, and the image bytes are cached next to the fragments.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+
+from .cache import atomic_write, cache_dir
+from .package import (CONTENT_TYPES_PART, DOCUMENT_PART, DOCUMENT_RELS_PART, IMAGE_RELTYPE,
+                      PackageWriter)
+from .spec import validate_spec
+from .template import base_template, theme_hash
+from .trace import span
+
+# Bump when the fragment format changes.
+FRAGMENT_VERSION = 1
+
+# The fragment cache is trimmed (least recently used first) above this size.
+CACHE_MAX_BYTES = 64 << 20
+
+# Modules whose code decides what a section renders to.
+_RENDERERS = ('assets.py', 'build.py', 'helpers.py', 'metrics.py', 'tables.py', 'template.py')
+
+_IMAGE_RID = re.compile(rb'r:embed="rIdImg([0-9a-f]{16})"')
+_DOC_PR_ID = re.compile(rb'(<wp:docPr id=")\d+')
+
+_renderer_hash = None
+
+
+class BuildStats:
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.written = False
+        self.seconds = 0.0
+        self.fonts = None
+
+    def __str__(self):
+        sections = self.hits + self.misses + self.uncached
+        state = 'ecrit' if self.written else 'inchange, ecriture evitee'
+        text = (f'{sections} sections, {self.hits} en cache, '
+                f'{self.misses + self.uncached} rendues en {self.seconds * 1000:.0f} ms ; '
+                f'document {state}')
+        if self.fonts is not None:
+            text += f' ; {self.fonts}'
+        return text
+
+
+def renderer_hash():
+    """Hash of the rendering modules' source, so code changes invalidate fragments."""
+    global _renderer_hash
+    if _renderer_hash is None:
+        import docx
+        h = hashlib.sha256(f'{FRAGMENT_VERSION}:{docx.__version__}'.encode())
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in _RENDERERS:
+            with open(os.path.join(here, name), 'rb') as f:
+                h.update(f.read())
+        # Table column widths depend on the font files found, if any.
+        from . import metrics, theme
+        h.update(repr(metrics.signature([theme.BODY_FONT, theme.HEADING_FONT])).encode())
+        _renderer_hash = h.hexdigest()[:16]
+    return _renderer_hash
+
+
+def listed_rows(section):
+    """``section`` with the rows of its tables as lists (copies only what changes).
+
+    Table rows may be any iterable; a generator would be consumed by
+    section_key() and then render as an empty table.
+    """
+    blocks = section['blocks']
+    if not isinstance(blocks, list) or all(
+            b['type'] != 'table' or isinstance(b['rows'], (list, tuple)) for b in blocks):
+        return section
+    return dict(section, blocks=[
+        dict(b, rows=list(b['rows'])) if b['type'] == 'table'
+        and not isinstance(b['rows'], (list, tuple)) else b
+        for b in blocks])
+
+
+def section_key(section):
+    """Cache key of ``section``, or None if its blocks cannot be hashed."""
+    if not isinstance(section['blocks'], list):
+        return None
+    images = [b['path'] for b in section['blocks'] if b['type'] == 'image']
+    if images:
+        from .assets import image_key
+        try:
+            images = [image_key(path) for path in images]
+        except OSError:
+            return None  # rendering reports it
+    payload = json.dumps([theme_hash(), renderer_hash(), section, images],
+                         sort_keys=True, ensure_ascii=False, default=list)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class FragmentCache:
+    """Section fragments on disk, evicted by size (oldest mtime first)."""
+
+    def __init__(self, path=None, max_bytes=CACHE_MAX_BYTES):
+        self.path = path or cache_dir('sections')
+        self.max_bytes = max_bytes
+
+    def _file(self, key, ext):
+        return os.path.join(self.path, f'{key}{ext}')
+
+    def get(self, key, ext='.xml'):
+        path = self._file(key, ext)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mark as recently used
+        return data
+
+    def put(self, key, data, ext='.xml'):
+        atomic_write(self._file(key, ext), data)
+
+    def get_section(self, key):
+        """(fragment, images) of a cached section, or None if anything is missing."""
+        fragment = self.get(key)
+        if fragment is None:
+            return None
+        images = {}
+        for digest in set(_IMAGE_RID.findall(fragment)):
+            blob = self.get(digest.decode(), '.img')
+            if blob is None:
+                return None
+            images[f'rIdImg{digest.decode()}'] = blob
+        return fragment, images
+
+    def put_section(self, key, fragment, images):
+        for rid, blob in images.items():
+            self.put(rid[len('rIdImg'):], blob, '.img')
+        self.put(key, fragment)
+
+    def evict(self):
+        """Remove the least recently used entries above ``max_bytes``."""
+        entries = []
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if entry.name.endswith(('.xml', '.img')):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+class _Assembler:
+    """Renders sections to fragments against the compiled base package."""
+
+    def __init__(self, base):
+        from docx import Document
+        from docx.oxml.ns import qn
+        from lxml import etree
+        self._tostring = etree.tostring
+        template = Document(io.BytesIO(base))
+        root = template.element
+        self._nsdecls = [f' xmlns:{prefix}="{uri}"'.encode() for prefix, uri in root.nsmap.items()]
+        with zipfile.ZipFile(io.BytesIO(base)) as src:
+            head = src.read(DOCUMENT_PART)
+        self.head = head[:head.index(b'<w:body')] + b'<w:body>'
+        sect_pr = root.find(qn('w:body')).find(qn('w:sectPr'))
+        self.tail = (self._serialize(sect_pr) if sect_pr is not None else b'') + b'</w:body></w:document>'
+        doc = Document(io.BytesIO(base))
+        self.page_break = self._serialize(doc.add_page_break()._p)
+        self._rels = set(template.part.rels)
+        self._embed = qn('r:embed')
+        self._blip = qn('a:blip')
+
+    def _serialize(self, element):
+        # Same as StreamingDocument: namespaces are declared on <w:document>.
+        data = self._tostring(element, encoding='UTF-8')
+        end = data.index(b'>')
+        tag = data[:end]
+        for decl in self._nsdecls:
+            if decl in tag:
+                tag = tag.replace(decl, b'', 1)
+        return tag + data[end:]
+
+    def render(self, section):
+        """Return the (fragment, images) of ``section``; images maps rIds to bytes."""
+        from .build import render_section
+        from .template import new_document
+        doc = new_document()
+        render_section(doc, section)
+        rels = doc.part.rels
+        renamed = {}
+        for rid in set(rels) - self._rels:
+            rel = rels[rid]
+            if rel.reltype != IMAGE_RELTYPE:
+                # The fragment would point at parts the assembled package lacks.
+                raise ValueError(f'section {section["id"]!r} adds relationships, '
+                                 'which fragment rendering does not support')
+            blob = rel.target_part.blob
+            renamed[rid] = (f'rIdImg{hashlib.sha256(blob).hexdigest()[:16]}', blob)
+        body = doc.element.body
+        if renamed:
+            for blip in body.iter(self._blip):
+                blip.set(self._embed, renamed[blip.get(self._embed)][0])
+        sect_pr = body.sectPr
+        fragment = b''.join(self._serialize(el) for el in body if el is not sect_pr)
+        return fragment, dict(renamed.values())
+
+    def render_rows(self, headers, sample, rows, start):
+        """``<w:tr>`` elements of a dark table's data rows ``start``, ``start + 1``...
+
+        The columns are sized on ``sample``, the table's first rows, as
+        add_dark_table() does, so the rows fit the table they continue.
+        """
+        from .tables import column_widths, new_dark_table
+        from .template import new_document
+        doc = new_document()
+        widths = column_widths(headers, sample, doc._block_width // 635)
+        _, protos = new_dark_table(doc, headers, widths)
+        return b''.join(self._serialize(tr) for batch in protos.iter_batches(rows, start=start)
+                        for tr in batch)
+
+
+class _NoCache:
+    """Stand-in for FragmentCache when caching is off."""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, data):
+        pass
+
+    def get_section(self, key):
+        return None
+
+    def put_section(self, key, fragment, images):
+        pass
+
+    def evict(self):
+        pass
+
+
+def build_incremental(spec, out, cache=None, jobs=1, compresslevel=6, embed_fonts=False):
+    """Build ``spec`` into ``out`` (path, file object or '-'), reusing cached sections.
+
+    Returns a BuildStats.  When ``out`` is a path whose content is already
+    identical to the result, the file is left untouched.  ``cache=False``
+    renders every section.  With ``jobs`` > 1 the sections to render are
+    rendered in that many processes (see parallel.py).  ``compresslevel``
+    is the deflate level of the XML parts (0: stored).  ``embed_fonts``
+    embeds subsets of the fonts used (see fonts.py).
+    """
+    validate_spec(spec)
+    stats = BuildStats()
+    start = time.perf_counter()
+    if cache is False:
+        cache = _NoCache()
+    cache = cache or FragmentCache()
+    base = base_template()
+    assembler = None
+
+    sections = [listed_rows(section) for section in spec['sections']]
+    keys = [section_key(section) for section in sections]
+    parts = [cache.get_section(key) if key else None for key in keys]
+    stats.hits = sum(part is not None for part in parts)
+    todo = [i for i, part in enumerate(parts) if part is None]
+    # Generator sections cannot be sent to a worker: they render here.
+    remote = [i for i in todo if keys[i]] if jobs > 1 else []
+    if remote:
+        from .parallel import render_sections
+        with span('parallel', 'section', sections=len(remote), jobs=jobs):
+            for i, part in zip(remote, render_sections([sections[i] for i in remote],
+                                                       base, jobs)):
+                parts[i] = part
+    for i in todo:
+        with span(sections[i]['id'], 'section'):
+            if parts[i] is None:
+                assembler = assembler or _Assembler(base)
+                parts[i] = assembler.render(sections[i])
+            if keys[i]:
+                cache.put_section(keys[i], *parts[i])
+                stats.misses += 1
+            else:
+                stats.uncached += 1
+    if stats.misses:
+        cache.evict()
+
+    frame_key = 'frame-' + hashlib.sha256(base + renderer_hash().encode()).hexdigest()[:16]
+    frame = cache.get(frame_key)
+    if frame is None:
+        assembler = assembler or _Assembler(base)
+        frame = b'\0'.join((assembler.head, assembler.page_break, assembler.tail))
+        cache.put(frame_key, frame)
+    head, page_break, tail = frame.split(b'\0')
+    document = b''.join((head, page_break.join(fragment for fragment, _ in parts), tail))
+    images = {}
+    for _, section_images in parts:
+        images.update(section_images)
+    if images:
+        document = renumber_drawings(document)
+    if embed_fonts:
+        from lxml import etree
+        from .fonts import EmbedStats, FontUsage, embed_base
+        with span('fonts', 'package'):
+            usage = FontUsage.from_package(base)
+            usage.add(etree.fromstring(document))
+            stats.fonts = EmbedStats()
+            base = embed_base(base, usage, stats.fonts)
+    with span('package', 'package'):
+        data = package(base, document, images, compresslevel)
+    stats.seconds = time.perf_counter() - start
+    with span('write', 'package'):
+        stats.written = _write(out, data)
+    return stats
+
+
+def renumber_drawings(document):
+    """Number the drawings' <wp:docPr> ids 1, 2, ... (sections number theirs alone)."""
+    counter = iter(range(1, 1 << 31))
+    return _DOC_PR_ID.sub(lambda m: m.group(1) + str(next(counter)).encode(), document)
+
+
+def package(base, document, images=None, compresslevel=6):
+    """Return the .docx bytes of ``base`` with ``document`` as document.xml.
+
+    ``images`` maps the relationship ids ``document`` embeds to image bytes.
+    """
+    buf = io.BytesIO()
+    with PackageWriter(buf, compresslevel) as writer:
+        if images:
+            writer.write_images(base, images)
+            writer.copy_parts(base, skip=(DOCUMENT_PART, CONTENT_TYPES_PART, DOCUMENT_RELS_PART))
+        else:
+            writer.copy_parts(base, skip=(DOCUMENT_PART,))
+        writer.write(DOCUMENT_PART, document)
+    return buf.getvalue()
+
+
+def _write(out, data):
+    """Write ``data`` to ``out``; return False if a path already held it."""
+    if out == '-':
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        return True
+    if not isinstance(out, (str, os.PathLike)):
+        out.write(data)
+        return True
+    try:
+        if os.path.getsize(out) == len(data):
+            with open(out, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    atomic_write(out, data)
+    return True
@@ -0,0 +1,358 @@
+"""Compact intermediate document model, lowered to OOXML at save time.
+
+Building through python-docx keeps an lxml element per paragraph, run,
+property and text node, plus the proxies the helpers hand back.  An
+IRDocument keeps a paragraph as one __slots__ node instead:
+
+- its text goes to a UTF-8 buffer shared by the whole document, and its
+  runs to an array of (run style, text end offset) pairs, both read in
+  document order when lowering;
+- run formatting (font, size, colour, bold, italic) and paragraph
+  formatting (style, alignment, spacing) are interned in style tables;
+- the node itself only holds its paragraph style and number of runs.
+
+save() lowers the nodes through a StreamingDocument: every interned style
+is rendered once through python-docx, to the exact rPr/pPr the helpers
+produce, and each paragraph is then written as bytes.  Tables and images
+are kept as their arguments and rendered by the regular helpers at that
+point.  The .docx is the one ``--stream`` writes for the same spec.
+
+    doc = IRDocument()
+    doc.add_body_text('Bonjour', bold=True)
+    doc.save('out.docx')
+
+The add_* methods return nothing: there is no proxy to keep alive.
+"""
+import re
+from array import array
+
+from . import theme
+from .spec import validate_block, validate_spec
+from .template import ACCENT_STYLE, BODY_STYLE, BULLET_STYLE, DIVIDER_STYLE, is_accent, style_id
+from .trace import span
+
+# Paragraph styles by the names the helpers use.
+STYLE_IDS = {'Title': 'Title', 'List Bullet': 'ListBullet',
+             **{f'Heading {i}': f'Heading{i}' for i in range(1, 10)},
+             **{name: style_id(name) for name in (BODY_STYLE, BULLET_STYLE, DIVIDER_STYLE)}}
+
+EMU_PER_PT = 12700
+
+PAGE_BREAK = b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff￾￿]')
+_BREAKS = re.compile('([\t\r\n])')
+
+
+def _pt(value):
+    """EMU of ``value`` points; None stays None."""
+    return None if value is None else int(value * EMU_PER_PT)
+
+
+def _hex(color):
+    return theme.resolve_color(color) if color else None
+
+
+class StyleTable:
+    """Interned formatting tuples: each distinct tuple gets one small int."""
+
+    __slots__ = ('keys', '_index')
+
+    def __init__(self):
+        self.keys = []
+        self._index = {}
+
+    def intern(self, key):
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.keys)
+            self.keys.append(key)
+        return index
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class Paragraph:
+    """Interned paragraph style and number of runs; the runs follow in IRDocument.runs."""
+
+    __slots__ = ('style', 'count')
+
+    def __init__(self, style, count):
+        self.style = style
+        self.count = count
+
+
+class Table:
+    __slots__ = ('headers', 'rows', 'accent')
+
+    def __init__(self, headers, rows, accent):
+        self.headers = headers
+        self.rows = rows
+        self.accent = accent
+
+
+class Image:
+    __slots__ = ('path', 'width', 'caption', 'align')
+
+    def __init__(self, path, width, caption, align):
+        self.path = path
+        self.width = width
+        self.caption = caption
+        self.align = align
+
+
+class _PageBreak:
+    __slots__ = ()
+
+
+BREAK = _PageBreak()
+
+
+class IRDocument:
+    """Write-only document: add_* calls record nodes, save() writes the .docx."""
+
+    def __init__(self):
+        self.nodes = []
+        self.text = bytearray()
+        self.runs = array('Q')
+        # (font, size EMU, colour hex, bold, italic); None leaves it unset.
+        self.run_styles = StyleTable()
+        # (style id, alignment, space before EMU, space after EMU)
+        self.para_styles = StyleTable()
+
+    # -- building --
+
+    def add_paragraph(self, runs=(), style=None, align=None, space_before=None,
+                      space_after=None):
+        """Add a paragraph of ``runs``: (text, font, size, color, bold, italic) tuples.
+
+        Sizes and spacings are in points, colours palette names or hex.
+        """
+        count = 0
+        for text, font, size, color, bold, italic in runs:
+            if _INVALID.search(text):
+                raise ValueError('All strings must be XML compatible: Unicode or ASCII, '
+                                 'no NULL bytes or control characters')
+            self.text += text.encode('utf-8')
+            self.runs.append(self.run_styles.intern((font, _pt(size), _hex(color), bold, italic)))
+            self.runs.append(len(self.text))
+            count += 1
+        key = (STYLE_IDS.get(style, style), align, _pt(space_before), _pt(space_after))
+        self.nodes.append(Paragraph(self.para_styles.intern(key), count))
+
+    # As in helpers.py, the styles give the formatting; runs only carry
+    # what differs from them.
+
+    def add_heading(self, text, level=1):
+        if not 0 <= level <= 9:
+            raise ValueError('level must be in range 0-9, got %d' % level)
+        self.add_paragraph([(text, None, None, None, None, None)],
+                           'Title' if level == 0 else f'Heading {level}')
+
+    def add_body_text(self, text, bold=False, color=None, size=theme.BODY_SIZE, align=None):
+        size = None if size == theme.BODY_SIZE else size
+        self.add_paragraph([(text, None, size, color, True if bold else None, None)],
+                           BODY_STYLE, align=align)
+
+    def add_bullet(self, text, color=None):
+        self.add_paragraph([(text, None, None, color, None, None)], BULLET_STYLE)
+
+    def add_divider(self):
+        self.add_paragraph([(theme.DIVIDER, None, None, None, None, None)], DIVIDER_STYLE)
+
+    def add_page_break(self):
+        self.nodes.append(BREAK)
+
+    def add_table(self, headers, rows, accent=None):
+        self.nodes.append(Table(headers, rows, _hex(accent)))
+
+    def add_image(self, path, width=None, caption=None, align='center'):
+        """``width`` in cm (default: the text width)."""
+        self.nodes.append(Image(path, width, caption, align))
+
+    def add_block(self, block):
+        """Add a spec block (see spec.py)."""
+        kind = block['type']
+        if kind == 'heading':
+            self.add_heading(block['text'], block.get('level', 1))
+        elif kind == 'text':
+            self.add_body_text(block['text'], block.get('bold', False), block.get('color'),
+                               block.get('size', theme.BODY_SIZE), block.get('align'))
+        elif kind == 'bullet':
+            self.add_bullet(block['text'], block.get('color'))
+        elif kind == 'table':
+            self.add_table(block['headers'], block['rows'], block.get('accent'))
+        elif kind == 'divider':
+            self.add_divider()
+        elif kind == 'paragraph':
+            self.add_paragraph(
+                [(r['text'], r.get('font'), r.get('size'), r.get('color'),
+                  True if r.get('bold') else None, True if r.get('italic') else None)
+                 for r in block.get('runs', ())],
+                align=block.get('align'), space_before=block.get('space_before'),
+                space_after=block.get('space_after'))
+        elif kind == 'page_break':
+            self.add_page_break()
+        elif kind == 'image':
+            self.add_image(block['path'], block.get('width'), block.get('caption'),
+                           block.get('align', 'center'))
+        else:
+            raise ValueError(f'unknown block type {kind!r}')
+
+    def add_spec(self, spec):
+        """Add every section of ``spec``, a page break between sections."""
+        for i, section in enumerate(spec['sections']):
+            if i:
+                self.add_page_break()
+            checked = not isinstance(section['blocks'], list)
+            for block in section['blocks']:
+                if checked:
+                    validate_block(block, f'section {section["id"]!r}')
+                self.add_block(block)
+        return self
+
+    # -- lowering --
+
+    def save(self, out, compresslevel=6, embed_fonts=False):
+        """Write the .docx to ``out`` (path, binary file object or '-').
+
+        Returns the EmbedStats when ``embed_fonts`` is set.
+        """
+        from .stream import StreamingDocument
+        with span('lower', 'package'):
+            with StreamingDocument(out, compresslevel=compresslevel,
+                                   embed_fonts=embed_fonts) as doc:
+                _Lowering(self, doc).run()
+        return doc.font_stats
+
+
+class _Lowering:
+
+    def __init__(self, ir, doc):
+        from .build import ALIGN
+        self.ir = ir
+        self.doc = doc
+        self.align = ALIGN
+        self.rpr = [self._run_props(key) for key in ir.run_styles.keys]
+        self.ppr = [self._para_props(key) for key in ir.para_styles.keys]
+
+    def _run_props(self, key):
+        """(rPr bytes, rPr element) of run style ``key``, as python-docx writes it."""
+        from docx.oxml import OxmlElement
+        from docx.shared import Emu, RGBColor
+        from docx.text.run import Run
+        font, size, color, bold, italic = key
+        run = Run(OxmlElement('w:r'), None)
+        if is_accent(font, color):
+            run._r.get_or_add_rPr().style = style_id(ACCENT_STYLE)
+            font = color = None
+        if font is not None:
+            run.font.name = font
+        if size is not None:
+            run.font.size = Emu(size)
+        if color is not None:
+            run.font.color.rgb = RGBColor.from_string(color)
+        if bold is not None:
+            run.bold = bold
+        if italic is not None:
+            run.italic = italic
+        rpr = run._r.rPr
+        return (b'' if rpr is None else self._bytes(rpr)), rpr
+
+    def _para_props(self, key):
+        from docx.oxml import OxmlElement
+        from docx.shared import Emu
+        from docx.text.paragraph import Paragraph as DocxParagraph
+        style, align, before, after = key
+        para = DocxParagraph(OxmlElement('w:p'), None)
+        if style is not None:
+            para._p.get_or_add_pPr().style = style
+        if align is not None:
+            para.alignment = self.align[align]
+        if before is not None:
+            para.paragraph_format.space_before = Emu(before)
+        if after is not None:
+            para.paragraph_format.space_after = Emu(after)
+        ppr = para._p.pPr
+        return (b'' if ppr is None else self._bytes(ppr)), style
+
+    def _bytes(self, element):
+        from lxml import etree
+        data = etree.tostring(element, encoding='UTF-8')
+        end = data.index(b'>')
+        return re.sub(rb' xmlns:\w+="[^"]*"', b'', data[:end]) + data[end:]
+
+    def run(self):
+        from . import assets, helpers
+        doc, text, runs, fonts = self.doc, self.ir.text, self.ir.runs, self.doc.fonts
+        images = [{'type': 'image', 'path': n.path, 'width': n.width}
+                  for n in self.ir.nodes if isinstance(n, Image)]
+        assets.prefetch(images, doc._block_width)
+        start = cursor = 0
+        for node in self.ir.nodes:
+            if isinstance(node, Paragraph):
+                ppr, style = self.ppr[node.style]
+                parts = [b'<w:p>', ppr]
+                for _ in range(node.count):
+                    rpr, element = self.rpr[runs[cursor]]
+                    end = runs[cursor + 1]
+                    cursor += 2
+                    value = text[start:end].decode('utf-8')
+                    start = end
+                    if fonts is not None and value.strip('\t\r\n'):
+                        fonts.add_run(style, element, _BREAKS.sub('', value))
+                    content = _content(value)
+                    parts.append(b'<w:r>' + rpr + content + b'</w:r>' if rpr or content
+                                 else b'<w:r/>')
+                doc.add_xml(b''.join(parts) + b'</w:p>' if len(parts) > 2 or ppr else b'<w:p/>')
+            elif node is BREAK:
+                doc.add_xml(PAGE_BREAK)
+            elif isinstance(node, Table):
+                from docx.shared import RGBColor
+                accent = RGBColor.from_string(node.accent) if node.accent else helpers.GOLD
+                helpers.make_dark_table(doc, node.headers, node.rows, accent=accent)
+            else:
+                from docx.shared import Cm
+                helpers.add_image(doc, node.path, width=Cm(node.width) if node.width else None,
+                                  caption=node.caption, align=self.align[node.align])
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').encode('utf-8')
+
+
+def _t(text):
+    if len(text.strip()) < len(text):
+        return b'<w:t xml:space="preserve">' + _escape(text) + b'</w:t>'
+    return b'<w:t>' + _escape(text) + b'</w:t>'
+
+
+def _content(text):
+    """Run content of ``text``, as python-docx's add_run() makes it."""
+    if not text:
+        return b''
+    if '\t' not in text and '\n' not in text and '\r' not in text:
+        return _t(text)
+    out = []
+    for piece in _BREAKS.split(text):
+        if piece == '\t':
+            out.append(b'<w:tab/>')
+        elif piece in ('\r', '\n'):
+            out.append(b'<w:br/>')
+        elif piece:
+            out.append(_t(piece))
+    return b''.join(out)
+
+
+def build_ir(spec):
+    """IRDocument of ``spec`` (validated; generator sections are consumed)."""
+    validate_spec(spec)
+    return IRDocument().add_spec(spec)
+
+
+def ir_report(spec, out, compresslevel=6, embed_fonts=False):
+    """Build ``spec`` through the IR and save it to ``out``; returns the EmbedStats or None."""
+    with span('ir', 'build'):
+        doc = build_ir(spec)
+    return doc.save(out, compresslevel, embed_fonts)
@@ -0,0 +1,370 @@
+"""Mail merge: one booking confirmation .docx per traveller.
+
+    python -m report.mailmerge bookings.csv -o confirmations/ [--jobs 8]
+    python -m report.mailmerge bookings.jsonl -o confirmations.zip
+
+Bookings are read as a stream from CSV (header row) or JSONL, with the
+fields of the Booking.tsx form: destination, departureDate, duration,
+travelers, firstName, lastName, email, phone, and an optional ``id``.
+
+The confirmation layout (confirmation_spec()) is rendered once, with
+``{{field}}`` placeholders, through the regular helpers; each record then
+only costs a substitution in that word/document.xml and a zip write.
+Records are spread over a process pool in chunks.  Every document is
+written atomically under its final name, so an interrupted run resumes
+where it stopped: existing outputs are skipped.  For a .zip output the
+documents are staged in ``<out>.parts/`` and packed at the end.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from xml.sax.saxutils import escape
+
+from .package import ZIP_EPOCH
+
+FIELDS = ('destination', 'departureDate', 'duration', 'travelers',
+          'firstName', 'lastName', 'email', 'phone')
+
+# Same destinations and prices as src/components/Booking.tsx.
+DESTINATIONS = {
+    'paris-1889': ('Paris 1889', 12_500),
+    'cretace': ('Crétacé', 18_900),
+    'florence-1504': ('Florence 1504', 14_200),
+}
+
+MONTHS = ('janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet', 'août',
+          'septembre', 'octobre', 'novembre', 'décembre')
+
+CHUNK_SIZE = 256
+
+_PLACEHOLDER = re.compile(rb'\{\{(\w+)\}\}')
+_UNSAFE = re.compile(r'[^\w.-]+')
+# Characters outside the XML 1.0 Char production.
+_NOT_XML = re.compile('[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]')
+
+
+class MergeError(ValueError):
+    """Raised for a record that cannot be merged."""
+
+
+class BadRecord:
+    """An input line that is not a record: reported as failed, the run goes on."""
+
+    def __init__(self, line, error):
+        self.line = line
+        self.error = error
+
+
+# -- layout --
+
+def confirmation_spec():
+    """Confirmation layout, with ``{{field}}`` placeholders (see merge_fields())."""
+    from .content import blank, divider, para, run, table, text
+    return {'sections': [{'id': 'confirmation', 'blocks': [
+        para(run('TIMETRAVEL AGENCY', bold=True, size=24, color='gold', font='Georgia'),
+             align='center'),
+        para(run('Confirmation de réservation', size=14, color='666666', font='Georgia'),
+             align='center'),
+        divider(),
+        text('Bonjour {{firstName}} {{lastName}},'),
+        text('Votre voyage temporel est confirmé. Voici le récapitulatif de votre réservation :'),
+        table(['Détail', 'Valeur'], [
+            ('Référence', '{{id}}'),
+            ('Destination', '{{destination}}'),
+            ('Date de départ', '{{departureDate}}'),
+            ('Durée', '{{duration}}'),
+            ('Voyageurs', '{{travelers}}'),
+            ('Prix unitaire', '{{unitPrice}}'),
+            ('Prix total', '{{totalPrice}}'),
+            ('Email', '{{email}}'),
+            ('Téléphone', '{{phone}}'),
+        ]),
+        blank(),
+        text('Préparez vos bagages pour un voyage extraordinaire !'),
+        divider(),
+        para(run('— TimeTravel Agency', size=11, color='999999', font='Georgia'), align='center'),
+    ]}]}
+
+
+class Prototype:
+    """The rendered layout, split around its placeholders."""
+
+    def __init__(self, base, document):
+        self.base = base
+        self.document = document
+        self.parts = _PLACEHOLDER.split(document)
+        self.fields = set(p.decode() for p in self.parts[1::2])
+
+    @classmethod
+    def build(cls):
+        from .build import build_report
+        from .template import base_template
+        doc = build_report(confirmation_spec())
+        return cls(base_template(), doc.part.blob)
+
+    def fill(self, values):
+        """document.xml bytes with every placeholder replaced by ``values``."""
+        parts = self.parts[:]
+        for i in range(1, len(parts), 2):
+            parts[i] = values[parts[i].decode()]
+        return b''.join(parts)
+
+    def render(self, values):
+        from .incremental import package
+        return package(self.base, self.fill(values))
+
+
+def format_price(value):
+    """12500 -> '12 500 €', as Booking.tsx (fr-FR, narrow no-break spaces)."""
+    return f'{value:,}'.replace(',', ' ') + ' €'
+
+
+def merge_fields(record):
+    """Display values (XML-escaped bytes) of a booking record."""
+    missing = [f for f in FIELDS if str(record.get(f) or '').strip() == '']
+    if missing:
+        raise MergeError(f'missing field(s): {", ".join(missing)}')
+    dest = str(record['destination']).strip()
+    label, price = DESTINATIONS.get(dest) or next(
+        ((lbl, p) for lbl, p in DESTINATIONS.values() if lbl.lower() == dest.lower()),
+        (dest, None))
+    try:
+        travelers = int(record['travelers'])
+        duration = int(record['duration'])
+        day = date.fromisoformat(str(record['departureDate']).strip())
+    except (TypeError, ValueError) as e:
+        raise MergeError(str(e)) from None
+    values = {
+        'id': str(record.get('id') or ''),
+        'destination': label,
+        'departureDate': f'{day.day} {MONTHS[day.month - 1]} {day.year}',
+        'duration': f'{duration} jours',
+        'travelers': str(travelers),
+        'unitPrice': format_price(price) if price is not None else '—',
+        'totalPrice': format_price(price * travelers) if price is not None else '—',
+    }
+    for f in ('firstName', 'lastName', 'email', 'phone'):
+        values[f] = str(record[f]).strip()
+    for k, v in values.items():
+        bad = _NOT_XML.search(v)
+        if bad:
+            raise MergeError(f'{k}: invalid character U+{ord(bad.group()):04X}')
+    return {k: escape(v).encode('utf-8') for k, v in values.items()}
+
+
+# -- input --
+
+def read_records(path, fmt=None):
+    """Yield booking dicts from a CSV or JSONL file (``'-'``: stdin).
+
+    A JSONL line that is not a JSON object is yielded as a BadRecord.
+    """
+    if fmt is None:
+        fmt = 'jsonl' if str(path).endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+    f = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+    try:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield BadRecord(number, f'invalid JSON: {e}')
+                    continue
+                if isinstance(record, dict):
+                    yield record
+                else:
+                    yield BadRecord(number, f'not an object: {type(record).__name__}')
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def output_name(record, index):
+    ident = _UNSAFE.sub('-', str(record.get('id') or '')).strip('-.')
+    return f'confirmation-{ident or f"{index:07d}"}.docx'
+
+
+# -- worker processes --
+
+_proto = None
+_outdir = None
+
+
+def _init_worker(base, document, outdir):
+    global _proto, _outdir
+    _proto = Prototype(base, document)
+    _outdir = outdir
+
+
+def _render_chunk(items):
+    """Render ``(name, record)`` items into the output directory.
+
+    Returns (written, [(name, error)]).
+    """
+    from .cache import atomic_write
+    written, errors = 0, []
+    for name, record in items:
+        try:
+            data = _proto.render(merge_fields(record))
+        except MergeError as e:
+            errors.append((name, str(e)))
+            continue
+        atomic_write(os.path.join(_outdir, name), data)
+        written += 1
+    return written, errors
+
+
+# -- driver --
+
+class Progress:
+
+    def __init__(self, out=sys.stderr, every=1.0):
+        self.out = out
+        self.every = every
+        self.start = self.last = time.perf_counter()
+        self.written = self.skipped = self.failed = 0
+
+    def update(self, force=False):
+        now = time.perf_counter()
+        if self.out is None or not (force or now - self.last >= self.every):
+            return
+        self.last = now
+        rate = self.written / (now - self.start) if now > self.start else 0.0
+        print(f'\r{self.written} documents, {self.skipped} deja faits, {self.failed} erreurs '
+              f'({rate:,.0f} doc/s, {rate * 3600:,.0f} doc/h)', end='', file=self.out, flush=True)
+
+    def done(self):
+        self.update(force=True)
+        if self.out is not None:
+            print(file=self.out)
+
+
+def mail_merge(records, out, jobs=None, chunk_size=CHUNK_SIZE, progress=None):
+    """Write one confirmation per record to directory or zip ``out``.
+
+    Returns the Progress counters.  Failed records are reported on stderr
+    and do not stop the run: records that cannot be merged, BadRecord lines,
+    and records whose output name (their id) was already used in this run,
+    which would overwrite each other.
+    """
+    zipped = str(out).endswith('.zip')
+    outdir = f'{out}.parts' if zipped else out
+    os.makedirs(outdir, exist_ok=True)
+    done = set()
+    for name in os.listdir(outdir):
+        if name.endswith('.docx'):
+            done.add(name)
+        elif name.endswith('.tmp'):
+            os.remove(os.path.join(outdir, name))  # left by an interrupted run
+    progress = progress or Progress(None)
+
+    proto = Prototype.build()
+    jobs = jobs or os.cpu_count() or 1
+
+    def fail(name, error):
+        progress.failed += 1
+        print(f'\n{name}: {error}', file=sys.stderr)
+
+    def chunks():
+        chunk = []
+        seen = set()
+        for index, record in enumerate(records, 1):
+            if isinstance(record, BadRecord):
+                fail(f'ligne {record.line}', record.error)
+                continue
+            name = output_name(record, index)
+            if name in seen:
+                fail(name, f'duplicate id (record {index})')
+                continue
+            seen.add(name)
+            if name in done:
+                progress.skipped += 1
+                continue
+            if not record.get('id'):
+                record = dict(record, id=name[len('confirmation-'):-len('.docx')])
+            chunk.append((name, record))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                             initargs=(proto.base, proto.document, outdir)) as pool:
+        pending = set()
+        for chunk in chunks():
+            # At most two chunks per worker in flight: the input stays a stream.
+            if len(pending) >= 2 * jobs:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _collect(finished, progress)
+            pending.add(pool.submit(_render_chunk, chunk))
+        _collect(wait(pending).done, progress)
+    progress.done()
+
+    if zipped:
+        _pack(outdir, out)
+    return progress
+
+
+def _collect(futures, progress):
+    for future in futures:
+        written, errors = future.result()
+        progress.written += written
+        progress.failed += len(errors)
+        for name, error in errors:
+            print(f'\n{name}: {error}', file=sys.stderr)
+    progress.update()
+
+
+def _pack(parts, out):
+    """Pack the staged documents into ``out`` (stored: .docx are compressed already)."""
+    from .cache import atomic_open
+    with atomic_open(out) as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as zf:
+        for name in sorted(os.listdir(parts)):
+            if name.endswith('.docx'):
+                info = zipfile.ZipInfo(name, ZIP_EPOCH)
+                info.external_attr = 0o644 << 16
+                with open(os.path.join(parts, name), 'rb') as part:
+                    zf.writestr(info, part.read())
+    shutil.rmtree(parts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m report.mailmerge',
+        description='Genere une confirmation de reservation (.docx) par voyageur.')
+    parser.add_argument('input', help='reservations CSV ou JSONL ("-" : stdin)')
+    parser.add_argument('-o', '--output', required=True,
+                        help='dossier de sortie, ou archive .zip')
+    parser.add_argument('--format', choices=('csv', 'jsonl'),
+                        help="format d'entree (defaut : selon l'extension)")
+    parser.add_argument('--jobs', type=int, help='processus (defaut : nombre de CPU)')
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE,
+                        help=f'reservations par lot (defaut : {CHUNK_SIZE})')
+    parser.add_argument('-q', '--quiet', action='store_true', help='aucun message')
+    args = parser.parse_args(argv)
+
+    progress = Progress(None if args.quiet else sys.stderr)
+    try:
+        mail_merge(read_records(args.input, args.format), args.output, args.jobs,
+                   args.chunk, progress)
+    except (OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    return 1 if progress.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Markdown backend: the report spec as README-style Markdown.
+
+Colours, fonts and sizes have no Markdown equivalent and are dropped; bold
+and italic runs are kept.  Like html.py it needs neither python-docx nor
+lxml.
+"""
+import html
+import re
+
+_SPECIAL = re.compile(r'([\\`*_\[\]<>|])')
+_LINE_START = re.compile(r'^(\s*)([#>+\-]|\d+\.)(?=\s)', re.M)
+
+
+def escape(text):
+    """Escape Markdown syntax in ``text``."""
+    return _line_starts(_SPECIAL.sub(r'\\\1', text))
+
+
+def _line_starts(text):
+    # Only at the start of a line: '1.' or '-' in the middle of a sentence is fine.
+    return _LINE_START.sub(r'\1\\\2', text)
+
+
+def _cell(value):
+    text = '' if value is None else str(value)
+    return escape(text).replace('\n', '<br>')
+
+
+def _run(r):
+    text = _SPECIAL.sub(r'\\\1', r['text']).replace('\n', '  \n')
+    core = text.strip()
+    if not core or not (r.get('bold') or r.get('italic')):
+        return text
+    # Emphasis markers must touch the text: keep the outer spaces outside.
+    if r.get('bold'):
+        core = f'**{core}**'
+    if r.get('italic'):
+        core = f'*{core}*'
+    lead = text[:len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()):]
+    return f'{lead}{core}{trail}'
+
+
+def iter_blocks(blocks):
+    """Yield the Markdown of ``blocks``, one chunk per block."""
+    prev = None
+    for block in blocks:
+        kind = block['type']
+        # Lists stay tight; every other block is its own paragraph.
+        sep = '' if kind == prev == 'bullet' else '\n'
+        if kind == 'heading':
+            level = min(6, block.get('level', 1))
+            yield f'{sep}{"#" * level} {escape(block["text"])}\n'
+        elif kind == 'text':
+            text = escape(block['text'])
+            yield f'{sep}{f"**{text}**" if block.get("bold") else text}\n'
+        elif kind == 'bullet':
+            yield f'{sep}- {escape(block["text"])}\n'
+        elif kind == 'table':
+            headers = block['headers']
+            lines = ['| ' + ' | '.join(_cell(h) for h in headers) + ' |',
+                     '|' + '---|' * len(headers)]
+            yield sep + '\n'.join(lines) + '\n'
+            for row in block['rows']:
+                yield '| ' + ' | '.join(_cell(v) for v in row) + ' |\n'
+        elif kind == 'divider':
+            yield f'{sep}---\n'
+        elif kind == 'paragraph':
+            text = _line_starts(''.join(_run(r) for r in block.get('runs', ())).strip())
+            if not text:
+                continue
+            yield f'{sep}{text}\n'
+        elif kind == 'page_break':
+            continue
+        elif kind == 'image':
+            caption = block.get('caption')
+            path = block['path'].replace('\\', '/')
+            if re.search(r'[\s()]', path):
+                path = f'<{path}>'
+            yield f'{sep}![{escape(caption or "")}]({path})\n'
+            if caption:
+                yield f'\n*{escape(caption)}*\n'
+        prev = kind
+
+
+def iter_markdown(spec):
+    """Yield the document as chunks of text."""
+    for i, section in enumerate(spec['sections']):
+        if i:
+            yield '\n'
+        yield f'<a id="{html.escape(section["id"], quote=True)}"></a>\n'
+        yield from iter_blocks(section['blocks'])
+
+
+def render_markdown(spec):
+    return ''.join(iter_markdown(spec))
@@ -0,0 +1,519 @@
+"""Merge generated reports into one volume.
+
+    python -m report.merge rapport-*.docx -o volume.docx
+    python -m report.merge confirmations/ -o volume.docx      # every .docx, sorted
+    python -m report.merge confirmations.zip -o volume.docx   # mailmerge archive
+
+The bodies of the inputs are streamed one after the other into the
+word/document.xml of the volume, with a page break between reports; only
+one input is in memory at a time, and each costs one regex pass over its
+body, so the run is linear in the total size of the inputs.  The rest of
+the package (settings, theme, page background, final section properties)
+comes from the first input.
+
+What the bodies refer to is deduplicated through hash maps:
+
+- styles by styleId and content: a style already in the volume is
+  reused, one with the same id but another definition is renamed
+  (``Heading1-2``), along with the references to it;
+- numbering definitions (abstractNum, then num) by content, the numIds of
+  the bodies and styles being remapped;
+- media by content (media_name()), hyperlinks by target: an image used by
+  every report, a logo say, is stored once.
+
+Relationships other than images and hyperlinks (headers, footnotes,
+comments...) are not supported in the bodies: the generator does not
+produce them, and such an input is rejected with a MergeError.
+"""
+import argparse
+import hashlib
+import io
+import os
+import posixpath
+import re
+import sys
+import time
+import zipfile
+from copy import deepcopy
+
+from .cache import atomic_open
+from .package import (CONTENT_TYPES_PART, DOCUMENT_PART, DOCUMENT_RELS_PART, IMAGE_RELTYPE,
+                      STYLES_PART, PackageWriter, image_type, media_name)
+
+NUMBERING_PART = 'word/numbering.xml'
+
+_RELS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+HYPERLINK_RELTYPE = f'{_RELS}/hyperlink'
+NUMBERING_RELTYPE = f'{_RELS}/numbering'
+NUMBERING_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml'
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_PR = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_W_URI = _W[1:-1].encode()
+_R_URI = _RELS.encode()
+
+PAGE_BREAK = b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+# Everything in a body that names a style, a list, a relationship or a drawing.
+_REFS = re.compile(
+    rb'(?P<style><w:(?:pStyle|rStyle|tblStyle) w:val=")(?P<sid>[^"]*)'
+    rb'|(?P<num><w:numId w:val=")(?P<nid>\d+)'
+    rb'|(?P<rel> r:(?:embed|id|link|pict)=")(?P<rid>[^"]*)'
+    rb'|(?P<drawing><wp:docPr id=")\d+')
+_NSDECL = re.compile(rb'xmlns:(\w+)="([^"]*)"')
+# Top-level body elements that can come before the final sectPr.
+_BLOCK_ENDS = (b'</w:p>', b'<w:p/>', b'</w:tbl>', b'</w:sdt>', b'</w:customXml>')
+_STYLE_REFS = ('basedOn', 'next', 'link')
+_PLACEHOLDER = '-?'
+
+
+class MergeError(ValueError):
+    """Raised for an input that cannot be merged."""
+
+
+class MergeStats:
+
+    def __init__(self):
+        self.documents = 0
+        self.bytes_in = 0
+        self.styles = 0
+        self.styles_renamed = 0
+        self.lists = 0
+        self.media = 0
+        self.media_refs = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        return (f'{self.documents} documents ({self.bytes_in / 1024 ** 2:.1f} Mio) en '
+                f'{self.seconds:.1f} s : {self.styles} styles ({self.styles_renamed} renommes), '
+                f'{self.lists} listes, {self.media} images pour {self.media_refs} references')
+
+
+def _digest(el, drop):
+    """Hash of ``el``'s XML without its attribute ``drop`` (its id)."""
+    from lxml import etree
+    value = el.attrib.pop(drop, None)
+    digest = hashlib.sha1(etree.tostring(el, method='c14n', exclusive=True)).digest()
+    if value is not None:
+        el.set(drop, value)
+    return digest
+
+
+def _parse(blob):
+    from lxml import etree
+    return etree.fromstring(blob, etree.XMLParser(remove_blank_text=False, resolve_entities=False))
+
+
+class _Numbering:
+    """numbering.xml of the volume, abstractNum and num deduplicated by content."""
+
+    def __init__(self):
+        self.root = None
+        self.pictures = []
+        self.abstracts, self.nums = [], []
+        self._abstract_ids, self._num_ids = {}, {}
+        self._parts = {}     # digest of a numbering.xml -> its numId map
+
+    def add(self, blob):
+        """Merge an input's numbering.xml; returns its {numId: volume numId}."""
+        part = hashlib.sha1(blob).digest()
+        if part not in self._parts:
+            self._parts[part] = self._add(blob)
+        return self._parts[part]
+
+    def _add(self, blob):
+        root = _parse(blob)
+        if self.root is None:
+            self.root = root.makeelement(root.tag, dict(root.attrib), nsmap=root.nsmap)
+            # Picture bullets are numbered on their own: kept from the first input only.
+            self.pictures = root.findall(f'{_W}numPicBullet')
+        abstract_map = {}
+        for abstract in root.iterfind(f'{_W}abstractNum'):
+            key = _digest(abstract, f'{_W}abstractNumId')
+            old = abstract.get(f'{_W}abstractNumId')
+            if key not in self._abstract_ids:
+                self._abstract_ids[key] = str(len(self.abstracts))
+                abstract.set(f'{_W}abstractNumId', self._abstract_ids[key])
+                self.abstracts.append(abstract)
+            abstract_map[old] = self._abstract_ids[key]
+        num_map = {}
+        for num in root.iterfind(f'{_W}num'):
+            ref = num.find(f'{_W}abstractNumId')
+            if ref is not None:
+                ref.set(f'{_W}val', abstract_map.get(ref.get(f'{_W}val'), ref.get(f'{_W}val')))
+            key = _digest(num, f'{_W}numId')
+            old = num.get(f'{_W}numId')
+            if key not in self._num_ids:
+                self._num_ids[key] = str(len(self.nums) + 1)
+                num.set(f'{_W}numId', self._num_ids[key])
+                self.nums.append(num)
+            num_map[old] = self._num_ids[key]
+        return num_map
+
+    def blob(self):
+        from lxml import etree
+        root = deepcopy(self.root)
+        root.extend(self.pictures + self.abstracts + self.nums)
+        return etree.tostring(root, encoding='UTF-8', standalone=True)
+
+
+class _Styles:
+    """styles.xml of the volume, styles deduplicated by id and content."""
+
+    def __init__(self):
+        self.root = None
+        self._ids = {}       # styleId -> digest of the style in the volume
+        self._aliases = {}   # (styleId, digest) -> the id it was renamed to
+        self.renamed = 0
+        self._parts = {}     # (digest of a styles.xml, numId map) -> its renames
+
+    def add(self, blob, num_map):
+        """Merge an input's styles.xml; returns its {styleId: volume styleId} renames."""
+        part = hashlib.sha1(blob).digest(), tuple(sorted(num_map.items()))
+        if part not in self._parts:
+            self._parts[part] = self._add(blob, num_map)
+        return self._parts[part]
+
+    def _add(self, blob, num_map):
+        root = _parse(blob)
+        styles = root.findall(f'{_W}style')
+        if self.root is None:
+            # docDefaults and latentStyles come from the first input.
+            self.root = root
+            for style in styles:
+                root.remove(style)
+        for style in styles:
+            for num_id in style.iterfind(f'{_W}pPr/{_W}numPr/{_W}numId'):
+                num_id.set(f'{_W}val', num_map.get(num_id.get(f'{_W}val'), num_id.get(f'{_W}val')))
+        ids = {style.get(f'{_W}styleId') for style in styles}
+        # A style identical to the volume's is the same style only if the
+        # styles it refers to are too: mark until nothing changes, the
+        # references pointing to a placeholder name meanwhile.
+        marked = set()
+        while True:
+            new = {style.get(f'{_W}styleId') for style in styles
+                   if self._differs(style)} - marked
+            if not new:
+                break
+            marked |= new
+            self._retarget(styles, {sid: sid + _PLACEHOLDER for sid in new})
+        # A style renamed for an earlier input, with the same content, gets
+        # the same name.
+        renames = {sid: self._rename(sid, _digest(style, f'{_W}styleId'), ids)
+                   for style in styles for sid in [style.get(f'{_W}styleId')] if sid in marked}
+        self._retarget(styles, {sid + _PLACEHOLDER: new for sid, new in renames.items()})
+        for style in styles:
+            sid = style.get(f'{_W}styleId')
+            if sid in renames:
+                sid = renames[sid]
+                style.set(f'{_W}styleId', sid)
+                style.attrib.pop(f'{_W}default', None)
+                name = style.find(f'{_W}name')
+                if name is not None:
+                    name.set(f'{_W}val', f'{name.get(f"{_W}val")} ({sid.rsplit("-", 1)[1]})')
+            if sid not in self._ids:
+                self._ids[sid] = _digest(style, f'{_W}styleId')
+                self.root.append(style)
+        return renames
+
+    def _differs(self, style):
+        digest = self._ids.get(style.get(f'{_W}styleId'))
+        return digest is not None and digest != _digest(style, f'{_W}styleId')
+
+    @staticmethod
+    def _retarget(styles, names):
+        for style in styles:
+            for ref in _STYLE_REFS:
+                for el in style.iterfind(f'{_W}{ref}'):
+                    if el.get(f'{_W}val') in names:
+                        el.set(f'{_W}val', names[el.get(f'{_W}val')])
+
+    def _rename(self, sid, digest, taken):
+        key = (sid, digest)
+        if key not in self._aliases:
+            self.renamed += 1
+            n = 2
+            while f'{sid}-{n}' in self._ids or f'{sid}-{n}' in taken:
+                n += 1
+            self._aliases[key] = f'{sid}-{n}'
+        return self._aliases[key]
+
+    def blob(self):
+        from lxml import etree
+        return etree.tostring(self.root, encoding='UTF-8', standalone=True)
+
+
+def _part_name(target):
+    """Part name of a document relationship target."""
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join('word', target))
+
+
+def _root_decls(zf):
+    """{prefix: uri} declared on the root of the input's document.xml."""
+    head = b''
+    with zf.open(DOCUMENT_PART) as f:
+        while True:
+            chunk = f.read(4096)
+            head += chunk
+            start = head.find(b'<w:document')
+            if start >= 0 and head.find(b'>', start) >= 0 or not chunk:
+                break
+    start = head.find(b'<w:document')
+    if start < 0:
+        raise MergeError('word/document.xml has no <w:document> root')
+    return dict(_NSDECL.findall(head[start:head.index(b'>', start)]))
+
+
+def _body(document):
+    """(body content without the final sectPr, final sectPr) of a document.xml."""
+    start = document.find(b'<w:body')
+    if start < 0:
+        raise MergeError('word/document.xml has no <w:body>')
+    start = document.index(b'>', start) + 1
+    if document[start - 2:start] == b'/>':
+        return b'', b''
+    end = document.rindex(b'</w:body>')
+    ends = [document.rfind(tag, start, end) + len(tag) for tag in _BLOCK_ENDS]
+    sect = document.find(b'<w:sectPr', max([start] + ends), end)
+    if sect < 0:
+        return document[start:end], b''
+    return document[start:sect], document[sect:end]
+
+
+def iter_inputs(paths):
+    """Yield (label, open zipfile) for the .docx in ``paths``.
+
+    A directory gives its .docx files in name order; a .zip that is not a
+    .docx (a mailmerge archive) the .docx it contains.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            yield from iter_inputs(os.path.join(path, name) for name in sorted(os.listdir(path))
+                                   if name.endswith('.docx'))
+        elif path.endswith('.zip'):
+            with zipfile.ZipFile(path) as archive:
+                for name in sorted(archive.namelist()):
+                    if name.endswith('.docx'):
+                        with zipfile.ZipFile(io.BytesIO(archive.read(name))) as zf:
+                            yield f'{path}:{name}', zf
+        else:
+            with zipfile.ZipFile(path) as zf:
+                yield path, zf
+
+
+class _Merger:
+
+    def __init__(self, package, stats):
+        self.package = package
+        self.stats = stats
+        self.styles = _Styles()
+        self.numbering = _Numbering()
+        self.media = {}      # part name -> (label, source part) read again on close
+        self.links = {}      # hyperlink target -> rId
+        self.drawings = 0
+        self.base = None     # (content types, relationships) of the first input
+        self.has_numbering = False
+
+    def start(self, zf, decls):
+        """Copy the first input's package, and write the head of document.xml."""
+        skip = {DOCUMENT_PART, STYLES_PART, NUMBERING_PART, CONTENT_TYPES_PART, DOCUMENT_RELS_PART}
+        for name in zf.namelist():
+            if name not in skip and not name.startswith('word/media/'):
+                self.package.write(name, zf.read(name))
+        self.base = zf.read(CONTENT_TYPES_PART), zf.read(DOCUMENT_RELS_PART)
+        self.has_numbering = NUMBERING_PART in zf.namelist()
+        document = zf.read(DOCUMENT_PART)
+        head = document[:document.index(b'<w:body')]
+        # The root carries the namespaces of every input.
+        root = head.index(b'<w:document')
+        end = head.index(b'>', root)
+        known = dict(_NSDECL.findall(head[root:end]))
+        extra = b''.join(b' xmlns:%s="%s"' % (prefix, uri) for prefix, uri in decls.items()
+                         if prefix not in known)
+        self.stream = self.package.open(DOCUMENT_PART)
+        # The page background (set_page_bg()) is in the head: written once.
+        self.stream.write(head[:end] + extra + head[end:] + b'<w:body>')
+        self.sect_pr = _body(document)[1]
+
+    def add(self, label, zf):
+        names = set(zf.namelist())
+        num_map = self.numbering.add(zf.read(NUMBERING_PART)) if NUMBERING_PART in names else {}
+        style_map = self.styles.add(zf.read(STYLES_PART), num_map) if STYLES_PART in names else {}
+        rel_map = self._relationships(label, zf)
+        body, _ = _body(zf.read(DOCUMENT_PART))
+
+        def sub(m):
+            if m.group('style'):
+                sid = m.group('sid').decode()
+                return m.group('style') + style_map.get(sid, sid).encode()
+            if m.group('num'):
+                nid = m.group('nid').decode()
+                return m.group('num') + num_map.get(nid, nid).encode()
+            if m.group('rel'):
+                rid = m.group('rid').decode()
+                if rid in rel_map and rel_map[rid] is None:
+                    raise MergeError(f'{label}: relationship {rid} not supported in a merge')
+                return m.group('rel') + rel_map.get(rid, rid).encode()
+            self.drawings += 1
+            return m.group('drawing') + str(self.drawings).encode()
+
+        if self.stats.documents:
+            self.stream.write(PAGE_BREAK)
+        self.stream.write(_REFS.sub(sub, body))
+        self.stats.documents += 1
+        self.stats.bytes_in += len(body)
+
+    def _relationships(self, label, zf):
+        """{rId: volume rId} of the input's images and hyperlinks; None for the rest."""
+        rels = {}
+        for rel in _parse(zf.read(DOCUMENT_RELS_PART)).iterfind(f'{_PR}Relationship'):
+            rid, reltype, target = rel.get('Id'), rel.get('Type'), rel.get('Target')
+            if reltype == IMAGE_RELTYPE and rel.get('TargetMode') != 'External':
+                source = _part_name(target)
+                try:
+                    name = media_name(zf.read(source))
+                except (KeyError, ValueError) as e:
+                    raise MergeError(f'{label}: image {target}: {e}') from None
+                self.media.setdefault(name, (label, source))
+                self.stats.media_refs += 1
+                rels[rid] = f'rIdImg{name[len("word/media/img-"):].split(".")[0]}'
+            elif reltype == HYPERLINK_RELTYPE:
+                rels[rid] = self.links.setdefault(target, f'rIdLink{len(self.links) + 1}')
+            else:
+                rels[rid] = None
+        return rels
+
+    def finish(self, media):
+        self.stream.write(self.sect_pr + b'</w:body></w:document>')
+        self.stream.close()
+        self.package.write(STYLES_PART, self.styles.blob())
+        types, rels = self.base
+        extra_types, extra_rels = [], []
+        if self.numbering.root is not None:
+            self.package.write(NUMBERING_PART, self.numbering.blob())
+            if not self.has_numbering:
+                extra_types.append(f'<Override PartName="/{NUMBERING_PART}" '
+                                   f'ContentType="{NUMBERING_TYPE}"/>'.encode())
+                extra_rels.append(f'<Relationship Id="rIdNumbering" Type="{NUMBERING_RELTYPE}" '
+                                  f'Target="numbering.xml"/>'.encode())
+        # The first input's relationships, without its images and links.
+        kept = [rel for rel in re.findall(rb'<Relationship [^>]*/>', rels)
+                if IMAGE_RELTYPE.encode() + b'"' not in rel and HYPERLINK_RELTYPE.encode() not in rel]
+        for target, rid in self.links.items():
+            target = target.replace('&', '&amp;').replace('"', '&quot;').replace('<', '&lt;')
+            extra_rels.append(f'<Relationship Id="{rid}" Type="{HYPERLINK_RELTYPE}" '
+                              f'Target="{target}" TargetMode="External"/>'.encode())
+        for name, blob in media:
+            ext, content_type = image_type(blob)
+            if f'Extension="{ext}"'.encode() not in types + b''.join(extra_types):
+                extra_types.append(f'<Default Extension="{ext}" ContentType="{content_type}"/>'.encode())
+            rid = f'rIdImg{name[len("word/media/img-"):].split(".")[0]}'
+            extra_rels.append(f'<Relationship Id="{rid}" Type="{IMAGE_RELTYPE}" '
+                              f'Target="{name[len("word/"):]}"/>'.encode())
+            self.package.write(name, blob)
+        self.package.write(CONTENT_TYPES_PART,
+                           types.replace(b'</Types>', b''.join(extra_types) + b'</Types>'))
+        head = rels[:rels.index(b'<Relationship ')] if kept else rels[:rels.rindex(b'</Relationships>')]
+        self.package.write(DOCUMENT_RELS_PART,
+                           head + b''.join(kept + extra_rels) + b'</Relationships>')
+        self.stats.styles = len(self.styles._ids)
+        self.stats.styles_renamed = self.styles.renamed
+        self.stats.lists = len(self.numbering.nums)
+        self.stats.media = len(self.media)
+
+
+def merge_documents(paths, out, compresslevel=6, progress=None):
+    """Merge the .docx in ``paths`` (files, directories, mailmerge .zip) into ``out``.
+
+    ``out`` is a path (written atomically), a binary file object or
+    ``'-'``.  ``progress`` is called with the MergeStats after each input.
+    Returns the MergeStats.
+    """
+    paths = list(paths)
+    stats = MergeStats()
+    start = time.perf_counter()
+    # First pass, over the root tags only: the volume's root has to declare
+    # every namespace the bodies use, and the prefixes have to agree.
+    decls = {}
+    for label, zf in iter_inputs(paths):
+        for prefix, uri in _root_decls(zf).items():
+            if decls.setdefault(prefix, uri) != uri:
+                raise MergeError(f'{label}: prefix {prefix.decode()} bound to {uri.decode()}, '
+                                 f'not {decls[prefix].decode()} as in the other inputs')
+    if not decls:
+        raise MergeError('no input document')
+    if decls.get(b'w') != _W_URI or decls.get(b'r', _R_URI) != _R_URI:
+        raise MergeError('inputs must use the w: and r: prefixes of WordprocessingML')
+
+    if out == '-' or hasattr(out, 'write'):
+        _merge(paths, out, compresslevel, decls, stats, progress)
+    else:
+        # Streamed, not buffered: the volume can be much larger than an input.
+        with atomic_open(out) as f:
+            _merge(paths, f, compresslevel, decls, stats, progress)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _merge(paths, out, compresslevel, decls, stats, progress):
+    with PackageWriter(out, compresslevel) as package:
+        merger = _Merger(package, stats)
+        for label, zf in iter_inputs(paths):
+            if merger.base is None:
+                merger.start(zf, decls)
+            merger.add(label, zf)
+            if progress is not None:
+                progress(stats)
+        merger.finish(_media(paths, merger.media))
+
+
+def _media(paths, media):
+    """Yield (part name, bytes) of ``media``, read again from the inputs.
+
+    Only the name and source of each distinct image are kept during the
+    merge, so memory does not grow with the images.
+    """
+    wanted = {}
+    for name, (label, source) in sorted(media.items()):
+        wanted.setdefault(label, []).append((name, source))
+    if not wanted:
+        return
+    for label, zf in iter_inputs(paths):
+        for name, source in wanted.pop(label, ()):
+            yield name, zf.read(source)
+        if not wanted:
+            break
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m report.merge',
+        description='Reunit des rapports .docx generes en un seul volume.')
+    parser.add_argument('inputs', nargs='+',
+                        help='fichiers .docx, dossiers (leurs .docx, par ordre de nom) '
+                             'ou archives .zip de report.mailmerge')
+    parser.add_argument('-o', '--output', required=True, help='volume .docx ("-" : stdout)')
+    parser.add_argument('-z', '--compress-level', type=int, default=6, choices=range(10),
+                        metavar='0-9', help='niveau de compression (0 : stocke, defaut : 6)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='aucun message')
+    args = parser.parse_args(argv)
+
+    def progress(stats):
+        if stats.documents % 100 == 0:
+            print(f'\r{stats.documents} documents', end='', file=sys.stderr, flush=True)
+
+    try:
+        stats = merge_documents(args.inputs, args.output, args.compress_level,
+                                None if args.quiet else progress)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    if not args.quiet:
+        print(f'\r{stats}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
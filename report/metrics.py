@@ -0,0 +1,182 @@
+"""Text widths from font metrics, for precomputed table column widths.
+
+Widths come from the glyph advances of the report fonts or of their
+metric-compatible free equivalents (Carlito for Calibri, Gelasio for
+Georgia, Caladea for Cambria), read with fontTools when it is installed
+and a font file is found.  The advances of a font are read once and kept
+in the report cache (``metrics/``), keyed by the font file; otherwise an
+approximate per-character table is used (FALLBACK).
+
+text_width() is memoized: table cells repeat the same strings a lot.
+"""
+import functools
+import hashlib
+import json
+import os
+
+from .cache import atomic_write, cache_dir
+
+# Bump when the cached metrics format changes.
+METRICS_VERSION = 1
+
+# Free fonts with the same advance widths as the Office ones.
+METRIC_COMPATIBLE = {'Calibri': 'Carlito', 'Georgia': 'Gelasio', 'Cambria': 'Caladea'}
+
+FONT_DIRS = [
+    '/usr/share/fonts', '/usr/local/share/fonts',
+    os.path.expanduser('~/.fonts'), os.path.expanduser('~/.local/share/fonts'),
+    os.path.expanduser('~/Library/Fonts'), '/Library/Fonts', '/System/Library/Fonts',
+    os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Fonts'),
+]
+FONT_ENV = 'REPORT_FONT_DIR'
+
+# Approximate advances (1/1000 em) of Calibri and Georgia, regular weight,
+# per character class; bold is scaled by BOLD_FACTOR.
+FALLBACK = {
+    'Calibri': [
+        (' ', 226), ('ijl|!.,:;\'', 229), ('f', 305), ('t', 335), ('r', 349), ('s', 391),
+        ('zxc', 420), ('kvy', 453), ('ag', 475), ('e', 498), ('bdhnopqu', 525), ('w', 715),
+        ('m', 799), ('0123456789$€#', 507), ('-()[]{}/\\', 306), ('"*', 400),
+        ('IJ', 280), ('FLTZ', 460), ('EKPSXY', 510), ('ABCR', 560), ('DGHNOQUV', 620),
+        ('M', 855), ('W', 890), ('%&@', 720), ('+<=>~^_', 498), ('—', 1000), ('–', 500),
+    ],
+    'Georgia': [
+        (' ', 241), ('ijl|!.,:;\'', 270), ('f', 316), ('t', 340), ('r', 410), ('s', 430),
+        ('zxc', 460), ('kvy', 490), ('ag', 500), ('e', 485), ('bdhnopqu', 560), ('w', 750),
+        ('m', 855), ('0123456789$€#', 580), ('-()[]{}/\\', 370), ('"*', 420),
+        ('IJ', 380), ('FLTZ', 620), ('EKPSXY', 660), ('ABCR', 690), ('DGHNOQUV', 760),
+        ('M', 900), ('W', 1000), ('%&@', 820), ('+<=>~^_', 620), ('—', 1000), ('–', 500),
+    ],
+}
+FALLBACK_DEFAULT = 'Calibri'
+BOLD_FACTOR = {'Calibri': 1.03, 'Georgia': 1.10}
+
+_WIDE = 0x2E80  # CJK and beyond: about one em
+
+_fonts = {}
+
+
+class FontMetrics:
+    """Advance widths (1/1000 em) of one font face."""
+
+    def __init__(self, advances, default, source):
+        self.advances = advances
+        self.default = default
+        self.source = source
+
+    def char_width(self, ch):
+        width = self.advances.get(ch)
+        if width is None:
+            return 1000 if ord(ch) >= _WIDE else self.default
+        return width
+
+
+def _font_index():
+    """{lowercase file name: path} of the font files found on this machine."""
+    index = {}
+    dirs = [os.environ[FONT_ENV]] if os.environ.get(FONT_ENV) else []
+    for root in dirs + FONT_DIRS:
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                if name.lower().endswith(('.ttf', '.otf')):
+                    index.setdefault(name.lower(), os.path.join(dirpath, name))
+    return index
+
+
+_index = None
+
+
+def find_font(family, bold=False, italic=False):
+    """Path of ``family`` (or its metric-compatible equivalent), or None."""
+    global _index
+    if _index is None:
+        _index = _font_index()
+    candidates = []
+    for name in (family, METRIC_COMPATIBLE.get(family)):
+        if not name:
+            continue
+        base = name.lower().replace(' ', '')
+        if bold and italic:
+            candidates += [f'{base}-bolditalic.ttf', f'{base}z.ttf', f'{base}bi.ttf']
+        elif italic:
+            candidates += [f'{base}-italic.ttf', f'{base}i.ttf']
+        elif bold:
+            candidates += [f'{base}-bold.ttf', f'{base}b.ttf', f'{base}bd.ttf']
+        else:
+            candidates += [f'{base}-regular.ttf', f'{base}.ttf']
+    for candidate in candidates:
+        if candidate in _index:
+            return _index[candidate]
+    return None
+
+
+def _read_font(path):
+    """Advances of the font file ``path``, through the disk cache."""
+    st = os.stat(path)
+    key = hashlib.sha256(f'{METRICS_VERSION}:{path}:{st.st_size}:{st.st_mtime_ns}'.encode())
+    key = key.hexdigest()[:24]
+    cached = os.path.join(cache_dir('metrics'), key + '.json')
+    try:
+        with open(cached, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        from fontTools.ttLib import TTFont
+        with TTFont(path, lazy=True) as font:
+            scale = 1000 / font['head'].unitsPerEm
+            hmtx = font['hmtx']
+            advances = {chr(code): round(hmtx[glyph][0] * scale)
+                        for code, glyph in font.getBestCmap().items()}
+        data = {'advances': advances,
+                'default': advances.get('n', 500)}
+        atomic_write(cached, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+    return FontMetrics(data['advances'], data['default'], f'{os.path.basename(path)}:{key}')
+
+
+def _fallback(family, bold):
+    if family not in FALLBACK:
+        family = FALLBACK_DEFAULT
+    factor = BOLD_FACTOR[family] if bold else 1
+    advances = {ch: round(width * factor) for chars, width in FALLBACK[family] for ch in chars}
+    return FontMetrics(advances, round(500 * factor), 'fallback')
+
+
+def font_metrics(family, bold=False):
+    """FontMetrics of ``family``: from the font file when possible, else FALLBACK."""
+    key = (family, bold)
+    if key not in _fonts:
+        metrics = None
+        if _has_fonttools():
+            path = find_font(family, bold)
+            if path is not None:
+                try:
+                    metrics = _read_font(path)
+                except Exception:  # unreadable font: the heuristic will do
+                    metrics = None
+        _fonts[key] = metrics or _fallback(family, bold)
+    return _fonts[key]
+
+
+def _has_fonttools():
+    try:
+        import fontTools  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def signature(families):
+    """Where the metrics of ``families`` come from, for cache keys."""
+    return [font_metrics(family, bold).source for family in families for bold in (False, True)]
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def text_width(text, family, size, bold=False):
+    """Width of ``text`` in points, set in ``family`` at ``size`` points."""
+    char_width = font_metrics(family, bold).char_width
+    return sum(map(char_width, text)) * size / 1000
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def longest_word(text, family, size, bold=False):
+    """Width in points of the widest word of ``text``: the narrowest it can wrap to."""
+    return max((text_width(word, family, size, bold) for word in text.split()), default=0.0)
@@ -0,0 +1,303 @@
+"""Run-coalescing and redundant-formatting pass, applied before save.
+
+The helpers format through the compiled theme styles, but ``paragraph``
+blocks and overrides (colour, size...) set font, size and colour directly
+on their runs.  This pass:
+
+- drops run/paragraph properties the paragraph style chain already gives
+  (and explicit "off" toggles such as ``<w:b w:val="0"/>`` nothing turns on),
+- merges adjacent runs of a paragraph whose formatting is identical,
+- hoists run formatting that repeats into shared character styles, reusing
+  the compiled theme styles (TT Table Cell, ...) when they match.
+
+optimize(doc) works on a whole Document; Optimizer.process() is the
+per-block entry point the streaming writer uses.
+"""
+import time
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+
+# A formatting signature becomes a character style once seen this often.
+HOIST_MIN_COUNT = 2
+# ... if it has at least this many properties (a style for a lone colour
+# does not pay for itself) ...
+HOIST_MIN_PROPS = 2
+# ... and at most this many styles are added to one document.
+MAX_HOISTED_STYLES = 256
+
+HOISTED_STYLE_NAME = 'TT Run {}'
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_P, _R, _T, _RPR, _PPR = qn('w:p'), qn('w:r'), qn('w:t'), qn('w:rPr'), qn('w:pPr')
+_TBL, _TBL_PR, _TBL_STYLE = qn('w:tbl'), qn('w:tblPr'), qn('w:tblStyle')
+_PSTYLE, _RSTYLE, _VAL = qn('w:pStyle'), qn('w:rStyle'), qn('w:val')
+_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+_RFONTS, _CSTHEME = qn('w:rFonts'), qn('w:cstheme')
+_MERGEABLE = {_T, qn('w:tab'), qn('w:br')}
+# Paragraph properties that are not simple overrides of the style's.
+_PPR_KEEP = {_PSTYLE, qn('w:numPr'), _RPR, qn('w:sectPr'), qn('w:pPrChange')}
+_TOGGLES = {qn(f'w:{t}') for t in (
+    'b', 'bCs', 'i', 'iCs', 'caps', 'smallCaps', 'strike', 'dstrike',
+    'outline', 'shadow', 'emboss', 'imprint', 'vanish')}
+_OFF = {'0', 'false', 'off'}
+
+
+class OptimizeStats:
+
+    def __init__(self):
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.seconds = 0.0
+        self.runs_merged = 0
+        self.props_dropped = 0
+        self.runs_hoisted = 0
+        self.styles_added = 0
+        self.fonts = None
+
+    @property
+    def ratio(self):
+        return self.bytes_before / self.bytes_after if self.bytes_after else 0.0
+
+    def __str__(self):
+        text = (f'document.xml {self.bytes_before / 1024:.1f} KiB -> '
+                f'{self.bytes_after / 1024:.1f} KiB ({self.ratio:.1f}x) in '
+                f'{self.seconds * 1000:.0f} ms: {self.runs_merged} runs merged, '
+                f'{self.props_dropped} properties dropped, {self.runs_hoisted} runs '
+                f'restyled, {self.styles_added} styles added')
+        if self.fonts is not None:
+            text += f'; {self.fonts}'
+        return text
+
+
+def _props(parent):
+    """{tag: attributes} for the leaf children of a pPr/rPr, or None."""
+    props = {}
+    for child in parent:
+        if len(child):
+            return None
+        props[child.tag] = dict(child.attrib)
+    return props
+
+
+def _signature(rPr):
+    if rPr is None:
+        return ()
+    if any(len(child) for child in rPr):
+        return None
+    return tuple(sorted((child.tag, tuple(sorted(child.attrib.items()))) for child in rPr))
+
+
+class Optimizer:
+    """Optimizes body elements against the styles of one document."""
+
+    def __init__(self, doc, hoist=True):
+        self.styles = doc.styles
+        self.hoist = hoist
+        self.stats = OptimizeStats()
+        root = self.styles.element
+        self._by_id = {s.get(qn('w:styleId')): s for s in root.iterchildren(qn('w:style'))}
+        self._default_pstyle = next(
+            (sid for sid, s in self._by_id.items()
+             if s.get(qn('w:type')) == 'paragraph' and s.get(qn('w:default')) in ('1', 'true')),
+            None)
+        defaults = root.find(qn('w:docDefaults'))
+        self._doc_rpr = {}
+        if defaults is not None:
+            rpr = defaults.find(f'{_W}rPrDefault/{_RPR}')
+            self._doc_rpr = _props(rpr) if rpr is not None else {}
+        self._inherited = {}
+        self._counts = {}
+        self._hoisted = {}
+        # Compiled theme character styles are reused as hoisting targets.
+        for sid, style in self._by_id.items():
+            if style.get(qn('w:type')) == 'character':
+                sig = _signature(style.find(_RPR))
+                if sig:
+                    self._hoisted.setdefault(sig, sid)
+
+    # -- style resolution --
+
+    def _style_props(self, sid, kind, seen=()):
+        """Merged {tag: attrs} of ``kind`` ('pPr'/'rPr') along the basedOn chain."""
+        style = self._by_id.get(sid)
+        if style is None or sid in seen:
+            return {}
+        based = style.find(qn('w:basedOn'))
+        props = self._style_props(based.get(_VAL), kind, seen + (sid,)) if based is not None else {}
+        props = {tag: dict(attrs) for tag, attrs in props.items()}
+        own = style.find(qn(f'w:{kind}'))
+        if own is not None:
+            for tag, attrs in (_props(own) or {}).items():
+                props.setdefault(tag, {}).update(attrs)
+        return props
+
+    def _inherited_for(self, sid):
+        """(pPr props, rPr props) a paragraph of style ``sid`` inherits."""
+        sid = sid or self._default_pstyle
+        if sid not in self._inherited:
+            rpr = {tag: dict(attrs) for tag, attrs in self._doc_rpr.items()}
+            for tag, attrs in self._style_props(sid, 'rPr').items():
+                rpr.setdefault(tag, {}).update(attrs)
+            self._inherited[sid] = (self._style_props(sid, 'pPr'), rpr)
+        return self._inherited[sid]
+
+    # -- passes --
+
+    def process(self, element):
+        """Drop, merge and hoist in one pass (used when streaming)."""
+        for p in self._paragraphs(element):
+            self._simplify(p, count=True)
+            if self.hoist:
+                self._hoist(p)
+
+    def _paragraphs(self, element):
+        if element.tag == _P:
+            return [element]
+        # Table styles add a level to the formatting chain; leave those alone.
+        styled = set()
+        for tbl in element.iter(_TBL):
+            tblPr = tbl.find(_TBL_PR)
+            if tblPr is not None and tblPr.find(_TBL_STYLE) is not None:
+                styled.update(tbl.iter(_P))
+        return [p for p in element.iter(_P) if p not in styled]
+
+    def _simplify(self, p, count):
+        stats = self.stats
+        pPr = p.find(_PPR)
+        pstyle = None
+        if pPr is not None:
+            ps = pPr.find(_PSTYLE)
+            pstyle = ps.get(_VAL) if ps is not None else None
+        inherited_ppr, inherited_rpr = self._inherited_for(pstyle)
+
+        if pPr is not None:
+            for child in list(pPr):
+                if child.tag not in _PPR_KEEP and self._redundant(child, inherited_ppr):
+                    pPr.remove(child)
+                    stats.props_dropped += 1
+            if not len(pPr) and not pPr.attrib:
+                p.remove(pPr)
+
+        prev = prev_sig = None
+        for r in list(p.iterchildren(_R)):
+            rPr = r.find(_RPR)
+            if rPr is not None and rPr.find(_RSTYLE) is None:
+                for child in list(rPr):
+                    if self._redundant(child, inherited_rpr):
+                        rPr.remove(child)
+                        stats.props_dropped += 1
+                if not len(rPr) and not rPr.attrib:
+                    r.remove(rPr)
+                    rPr = None
+            sig = _signature(rPr)
+            mergeable = sig is not None and not r.attrib and all(
+                c.tag in _MERGEABLE for c in r if c is not rPr)
+            if mergeable and prev is not None and sig == prev_sig and r.getprevious() is prev:
+                _merge_into(prev, r)
+                stats.runs_merged += 1
+                continue
+            prev, prev_sig = (r, sig) if mergeable else (None, None)
+            if count and sig and rPr is not None and rPr.find(_RSTYLE) is None:
+                self._counts[sig] = self._counts.get(sig, 0) + 1
+
+    @staticmethod
+    def _redundant(child, inherited):
+        if len(child):
+            return False
+        attrs = dict(child.attrib)
+        if child.tag in _TOGGLES:
+            on = attrs.get(_VAL, 'true') not in _OFF
+            base = inherited.get(child.tag)
+            base_on = base is not None and base.get(_VAL, 'true') not in _OFF
+            return on == base_on and set(attrs) <= {_VAL}
+        base = inherited.get(child.tag)
+        if base is None:
+            return False
+        if child.tag == _RFONTS and any(k.endswith('Theme') or k == _CSTHEME for k in base):
+            # Theme font attributes win over explicit names.
+            return False
+        return all(base.get(k) == v for k, v in attrs.items())
+
+    def _hoist(self, p):
+        _, inherited_rpr = self._inherited_for(_pstyle(p))
+        for r in p.iterchildren(_R):
+            rPr = r.find(_RPR)
+            if rPr is None or rPr.find(_RSTYLE) is not None:
+                continue
+            sig = _signature(rPr)
+            if not sig or len(sig) < HOIST_MIN_PROPS:
+                continue
+            # A toggle in a character style flips the paragraph style's value
+            # instead of setting it, so those runs keep direct formatting.
+            if any(tag in _TOGGLES and tag in inherited_rpr for tag, _ in sig):
+                continue
+            sid = self._hoisted.get(sig)
+            if sid is None:
+                if (self._counts.get(sig, 0) < HOIST_MIN_COUNT
+                        or self.stats.styles_added >= MAX_HOISTED_STYLES):
+                    continue
+                sid = self._add_style(rPr)
+                self._hoisted[sig] = sid
+            for child in list(rPr):
+                rPr.remove(child)
+            rPr.append(rPr.makeelement(_RSTYLE, {_VAL: sid}))
+            self.stats.runs_hoisted += 1
+
+    def _add_style(self, rPr):
+        import copy
+        self.stats.styles_added += 1
+        name = HOISTED_STYLE_NAME.format(self.stats.styles_added)
+        while name in self.styles:
+            self.stats.styles_added += 1
+            name = HOISTED_STYLE_NAME.format(self.stats.styles_added)
+        style = self.styles.add_style(name, WD_STYLE_TYPE.CHARACTER)
+        style.element.append(copy.deepcopy(rPr))
+        self._by_id[style.style_id] = style.element
+        return style.style_id
+
+    def optimize_body(self, body):
+        """Two passes over a whole body: simplify and count, then hoist."""
+        paragraphs = self._paragraphs(body)
+        for p in paragraphs:
+            self._simplify(p, count=True)
+        if self.hoist:
+            for p in paragraphs:
+                self._hoist(p)
+
+
+def _pstyle(p):
+    pPr = p.find(_PPR)
+    if pPr is None:
+        return None
+    ps = pPr.find(_PSTYLE)
+    return ps.get(_VAL) if ps is not None else None
+
+
+def _merge_into(first, second):
+    """Move the content of run ``second`` into ``first`` and drop ``second``."""
+    for child in list(second):
+        if child.tag == _RPR:
+            continue
+        last = first[-1] if len(first) else None
+        if child.tag == _T and last is not None and last.tag == _T:
+            last.text = (last.text or '') + (child.text or '')
+            if last.text != last.text.strip():
+                last.set(_SPACE, 'preserve')
+        else:
+            first.append(child)
+    second.getparent().remove(second)
+
+
+def optimize(doc, hoist=True):
+    """Optimize ``doc`` in place; return an OptimizeStats."""
+    from lxml import etree
+    body = doc.element.body
+    optimizer = Optimizer(doc, hoist=hoist)
+    stats = optimizer.stats
+    stats.bytes_before = len(etree.tostring(doc.element, encoding='UTF-8'))
+    start = time.perf_counter()
+    optimizer.optimize_body(body)
+    stats.seconds = time.perf_counter() - start
+    stats.bytes_after = len(etree.tostring(doc.element, encoding='UTF-8'))
+    return stats
@@ -0,0 +1,155 @@
+"""Writing .docx packages (zip) without going through python-docx."""
+import hashlib
+import io
+import os
+import sys
+import zipfile
+
+DOCUMENT_PART = 'word/document.xml'
+STYLES_PART = 'word/styles.xml'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+DOCUMENT_RELS_PART = 'word/_rels/document.xml.rels'
+
+IMAGE_RELTYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+
+# Magic bytes -> (extension, content type) of the image formats Word reads.
+_IMAGE_TYPES = (
+    (b'\x89PNG\r\n\x1a\n', 'png', 'image/png'),
+    (b'\xff\xd8\xff', 'jpeg', 'image/jpeg'),
+    (b'GIF8', 'gif', 'image/gif'),
+    (b'BM', 'bmp', 'image/bmp'),
+    (b'II*\x00', 'tiff', 'image/tiff'),
+    (b'MM\x00*', 'tiff', 'image/tiff'),
+)
+
+def image_type(blob):
+    """(extension, content type) of image ``blob``."""
+    for magic, ext, content_type in _IMAGE_TYPES:
+        if blob.startswith(magic):
+            return ext, content_type
+    raise ValueError('unsupported image format')
+
+
+def media_name(blob):
+    """Part name of image ``blob``: named after its content, so identical images share it."""
+    digest = hashlib.sha1(blob).hexdigest()[:16]
+    return f'word/media/img-{digest}.{image_type(blob)[0]}'
+
+
+# Fixed entry timestamp: identical content gives an identical file.
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Parts that are compressed already; deflating them again only costs time.
+STORED_PREFIXES = ('word/media/',)
+
+
+def part_level(name, compresslevel):
+    """Deflate level of part ``name`` (0: stored)."""
+    return 0 if name.startswith(STORED_PREFIXES) else compresslevel
+
+
+class PackageWriter:
+    """Zip writer for a .docx package.
+
+    ``out`` is a path, a binary file object or ``'-'`` for stdout.  File
+    objects do not need to be seekable.  ``compresslevel`` 0 stores the
+    parts (drafts); media parts are always stored (see part_level()).
+    abort() gives up without completing the zip.
+    """
+
+    def __init__(self, out, compresslevel=6):
+        self._stdout = out == '-'
+        self._path = None if self._stdout or hasattr(out, 'write') else out
+        self._streams = []
+        target = sys.stdout.buffer if self._stdout else out
+        self._zf = zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self._compresslevel = compresslevel
+
+    def _info(self, name):
+        info = zipfile.ZipInfo(name, ZIP_EPOCH)
+        level = part_level(name, self._compresslevel)
+        info.compress_type = zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED
+        # ZipFile.open() takes the level from the ZipInfo (an alias
+        # property of ``compress_level`` since Python 3.13).
+        info._compresslevel = level or None
+        info.external_attr = 0o600 << 16
+        return info
+
+    def write(self, name, data):
+        info = self._info(name)
+        self._zf.writestr(info, data, compresslevel=info._compresslevel)
+
+    def open(self, name):
+        """Return a writable binary stream for part ``name``."""
+        stream = self._zf.open(self._info(name), 'w', force_zip64=True)
+        self._streams.append(stream)
+        return stream
+
+    def copy_parts(self, blob, skip=()):
+        """Copy every part of the package ``blob`` except those in ``skip``."""
+        with zipfile.ZipFile(io.BytesIO(blob)) as src:
+            for name in src.namelist():
+                if name not in skip:
+                    self.write(name, src.read(name))
+
+    def write_images(self, base, images):
+        """Write ``base``'s document relationships and content types with ``images`` added.
+
+        ``images`` maps relationship ids to image bytes; each distinct image
+        is written once under word/media/.  The caller copies the other
+        parts of ``base`` itself, without these two.
+        """
+        with zipfile.ZipFile(io.BytesIO(base)) as src:
+            types = src.read(CONTENT_TYPES_PART)
+            rels = src.read(DOCUMENT_RELS_PART)
+        extra_types, extra_rels, media = [], [], {}
+        for rid, blob in sorted(images.items()):
+            name = media_name(blob)
+            ext, content_type = image_type(blob)
+            if f'Extension="{ext}"'.encode() not in types + b''.join(extra_types):
+                extra_types.append(f'<Default Extension="{ext}" ContentType="{content_type}"/>'.encode())
+            extra_rels.append(f'<Relationship Id="{rid}" Type="{IMAGE_RELTYPE}" '
+                              f'Target="{name[len("word/"):]}"/>'.encode())
+            media[name] = blob
+        types = types.replace(b'</Types>', b''.join(extra_types) + b'</Types>')
+        rels = rels.replace(b'</Relationships>', b''.join(extra_rels) + b'</Relationships>')
+        self.write(CONTENT_TYPES_PART, types)
+        self.write(DOCUMENT_RELS_PART, rels)
+        for name, blob in sorted(media.items()):
+            self.write(name, blob)
+
+    def close(self):
+        self._zf.close()
+        if self._stdout:
+            sys.stdout.buffer.flush()
+
+    def abort(self):
+        """Stop writing without the zip directory; a path output is removed.
+
+        What was already written to a file object or stdout stays, but is
+        not a readable package.
+        """
+        zf = self._zf
+        if zf.fp is None:
+            return  # closed already
+        for stream in self._streams:
+            # Mark it closed without ZipFile's bookkeeping, which would write
+            # the entry's header (and later the directory).
+            io.BufferedIOBase.close(stream)
+        zf._writing = False
+        fp, zf.fp = zf.fp, None  # ZipFile.close() is now a no-op
+        if self._path is not None:
+            fp.close()
+            try:
+                os.remove(self._path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,112 @@
+"""Render sections to word/document.xml fragments in worker processes.
+
+Blocks render independently of each other (each helper only appends to
+the body), so a section can be cut into slices of consecutive blocks and
+the slices rendered in parallel; concatenated in order, their fragments
+are exactly the section's fragment.  Slices are sized by an estimate of
+their cost (table rows are much cheaper than paragraphs) so that one huge
+appendix is spread over all the workers too.
+
+A table too large for one slice is split as well: the first slice renders
+the table with its first rows (at least the SAMPLE_ROWS its columns are
+sized on), the next ones only the following rows, against the same
+sample; the rows are spliced into the first slice's ``<w:tbl>``.
+
+Every worker starts from the same compiled base package, so the styles,
+the numbering used by ``List Bullet`` and the relationships are those of
+the base in every fragment.  Images are the only relationships blocks
+add; they are named after their content (see incremental.py), so every
+worker names them alike and they merge as they are.  _Assembler.render()
+refuses any other relationship rather than leave a dangling rId.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from .incremental import listed_rows
+from .tables import SAMPLE_ROWS
+
+# Estimated cost of a block, in paragraph-equivalents.
+ROWS_PER_UNIT = 20
+# Slices per worker: more than one evens out uneven slices.
+SLICES_PER_JOB = 4
+MIN_SLICE = 32
+
+_TBL_END = b'</w:tbl>'
+
+_assembler = None
+
+
+def _init_worker(base):
+    global _assembler
+    from .incremental import _Assembler
+    _assembler = _Assembler(base)
+
+
+def _render_slice(work):
+    kind, args = work
+    if kind == 'rows':
+        return _assembler.render_rows(*args), {}
+    return _assembler.render({'id': 'slice', 'blocks': args})
+
+
+def weight(block):
+    if block['type'] == 'table':
+        return 1 + len(block['rows']) / ROWS_PER_UNIT
+    return 1
+
+
+def _split_table(block, target):
+    """Work items of a table ``block``: the table with its first rows, then row ranges."""
+    rows = block['rows']
+    size = max(SAMPLE_ROWS, int(target * ROWS_PER_UNIT))
+    yield 'blocks', [dict(block, rows=rows[:size])]
+    sample = rows[:SAMPLE_ROWS]
+    for start in range(size, len(rows), size):
+        yield 'rows', (block['headers'], sample, rows[start:start + size], start)
+
+
+def slices(sections, jobs):
+    """Yield (section index, work) items of ``sections``, in order.
+
+    ``work`` is ``('blocks', blocks)`` or, for the continuation of a split
+    table, ``('rows', (headers, sample, rows, start))``.  Blocks and table
+    rows may be any iterables: they are made lists before being weighed.
+    """
+    sections = [listed_rows(dict(s, blocks=list(s['blocks']))) for s in sections]
+    total = sum(weight(b) for s in sections for b in s['blocks'])
+    target = max(MIN_SLICE, total / (jobs * SLICES_PER_JOB))
+    for i, section in enumerate(sections):
+        chunk, size = [], 0
+        for block in section['blocks']:
+            if block['type'] == 'table' and weight(block) > 2 * target:
+                if chunk:
+                    yield i, ('blocks', chunk)
+                    chunk, size = [], 0
+                for work in _split_table(block, target):
+                    yield i, work
+                continue
+            chunk.append(block)
+            size += weight(block)
+            if size >= target:
+                yield i, ('blocks', chunk)
+                chunk, size = [], 0
+        if chunk or not section['blocks']:
+            yield i, ('blocks', chunk)
+
+
+def render_sections(sections, base, jobs):
+    """Return the (fragment, images) of ``sections`` (block lists), rendered on ``jobs`` processes."""
+    work = list(slices(sections, jobs))
+    fragments = [[] for _ in sections]
+    images = [{} for _ in sections]
+    with ProcessPoolExecutor(min(jobs, len(work)), initializer=_init_worker,
+                             initargs=(base,)) as pool:
+        results = pool.map(_render_slice, [w for _, w in work])
+        for (i, (kind, _)), (fragment, media) in zip(work, results):
+            if kind == 'rows':
+                # Into the table the previous slice of the section ends with.
+                last = fragments[i].pop()
+                fragments[i] += [last[:-len(_TBL_END)], fragment, _TBL_END]
+            else:
+                fragments[i].append(fragment)
+            images[i].update(media)
+    return [(b''.join(f), m) for f, m in zip(fragments, images)]
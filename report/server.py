@@ -0,0 +1,354 @@
+"""Local render daemon: keeps python-docx and the theme loaded between jobs.
+
+    python -m report.server [--port 8765 | --socket /tmp/report.sock] [--jobs 2]
+                            [--output-dir rendus/] [--asset-dir images/]
+
+Plain HTTP/1.1 on localhost or on a Unix socket, one request per
+connection:
+
+- ``POST /render``: body is a JSON spec (empty body: built-in content).
+  Answers with the .docx bytes, or, with ``?out=NAME``, writes the file on
+  the server side and answers ``{"path": ..., "bytes": ...}``.  ``out`` is
+  only accepted when the server was started with ``--output-dir``, and
+  must be a relative path inside that directory (403 otherwise) whose
+  directory exists (404 otherwise).  Image paths in the spec are read
+  from ``--asset-dir``, as relative paths inside it; without it, a spec
+  with images is refused (403).  ``?optimize=1`` runs the optimizer pass.
+- ``GET /health``: ``{"status": "ok", ...}``.
+- ``GET /metrics``: job counters, queue depth and latencies (JSON).
+
+Specs are validated in the event loop; the rendering runs in a process
+pool whose workers load python-docx and the compiled theme once; a pool
+broken by a crashed worker is replaced.  At most
+``--queue`` jobs wait for a worker; past that the server answers 503 with
+a Retry-After header instead of queueing more.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from .spec import SpecError, validate_spec
+
+DEFAULT_PORT = 8765
+MAX_BODY = 16 << 20
+LATENCY_WINDOW = 1024
+
+DOCX_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found',
+            405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error',
+            503: 'Service Unavailable'}
+
+
+# -- worker process side --
+
+def _warm():
+    """Pool initializer: import the renderer and load the compiled theme."""
+    from .build import build_report  # noqa: F401
+    from .template import base_template
+    base_template()
+
+
+def render_job(spec, optimize=False, out=None):
+    """Render ``spec``; return the .docx bytes, or its size once written to ``out``."""
+    if spec is None:
+        from .content import default_spec
+        spec = default_spec()
+    if optimize:
+        from .build import build_report, save
+        from .optimize import optimize as optimize_doc
+        doc = build_report(spec)
+        optimize_doc(doc)
+        buf = io.BytesIO()
+        save(doc, buf)
+        data = buf.getvalue()
+    else:
+        from .incremental import build_incremental
+        buf = io.BytesIO()
+        build_incremental(spec, buf)
+        data = buf.getvalue()
+    if out is None:
+        return data
+    from .cache import atomic_write
+    atomic_write(out, data)
+    return len(data)
+
+
+# -- event loop side --
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+class Metrics:
+
+    def __init__(self):
+        self.started = time.time()
+        self.accepted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latencies = []
+
+    def record(self, seconds):
+        self.latencies.append(seconds)
+        if len(self.latencies) > LATENCY_WINDOW:
+            del self.latencies[:len(self.latencies) - LATENCY_WINDOW]
+
+    def as_dict(self, server):
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1) if lat else None
+
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'jobs': {'accepted': self.accepted, 'completed': self.completed,
+                     'failed': self.failed, 'rejected': self.rejected},
+            'queue': {'depth': server.queue.qsize(), 'max': server.queue.maxsize,
+                      'in_flight': server.in_flight, 'workers': server.jobs},
+            'latency_ms': {'p50': pct(0.5), 'p95': pct(0.95), 'max': pct(1.0),
+                           'window': len(lat)},
+        }
+
+
+class RenderServer:
+    """Accepts render jobs over HTTP and runs them in a process pool."""
+
+    def __init__(self, jobs=None, queue_size=16, output_dir=None, asset_dir=None):
+        self.jobs = jobs or max(1, (os.cpu_count() or 2) - 1)
+        self.output_dir = os.path.realpath(output_dir) if output_dir else None
+        self.asset_dir = os.path.realpath(asset_dir) if asset_dir else None
+        self.queue = asyncio.Queue(queue_size)
+        self.in_flight = 0
+        self.metrics = Metrics()
+        self.pool = None
+        self._workers = []
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(self.jobs, initializer=_warm)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.jobs)]
+
+    async def close(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            args, future = await self.queue.get()
+            self.in_flight += 1
+            pool = self.pool
+            try:
+                result = await loop.run_in_executor(pool, render_job, *args)
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool) and self.pool is pool:
+                    # A worker died: every later job would fail on this pool.
+                    self.pool = ProcessPoolExecutor(self.jobs, initializer=_warm)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    async def submit(self, *args):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((args, future))
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            raise HTTPError(503, 'render queue full', (('Retry-After', '1'),)) from None
+        self.metrics.accepted += 1
+        start = time.perf_counter()
+        try:
+            result = await future
+        except Exception:
+            self.metrics.failed += 1
+            raise
+        self.metrics.completed += 1
+        self.metrics.record(time.perf_counter() - start)
+        return result
+
+    # -- HTTP --
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                status, headers, body = await self._dispatch(reader)
+            except HTTPError as e:
+                status, headers, body = e.status, list(e.headers), _json({'error': str(e)})
+            except Exception as e:  # a failed render
+                status, headers, body = 500, [], _json({'error': f'{type(e).__name__}: {e}'})
+            if not any(k == 'Content-Type' for k, _ in headers):
+                headers.append(('Content-Type', 'application/json'))
+            head = [f'HTTP/1.1 {status} {_REASONS.get(status, "")}',
+                    f'Content-Length: {len(body)}', 'Connection: close']
+            head += [f'{k}: {v}' for k, v in headers]
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, 'malformed request line') from None
+        length = 0
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-length':
+                try:
+                    length = int(value.strip() or 0)
+                except ValueError:
+                    raise HTTPError(400, 'malformed Content-Length') from None
+                if length < 0:
+                    raise HTTPError(400, 'malformed Content-Length')
+        if length > MAX_BODY:
+            raise HTTPError(413, f'body larger than {MAX_BODY} bytes')
+        body = await reader.readexactly(length) if length else b''
+
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == '/health':
+            return 200, [], _json({'status': 'ok', 'pid': os.getpid(), 'workers': self.jobs})
+        if url.path == '/metrics':
+            return 200, [], _json(self.metrics.as_dict(self))
+        if url.path != '/render':
+            raise HTTPError(404, f'no route {url.path}')
+        if method != 'POST':
+            raise HTTPError(405, 'use POST /render')
+
+        spec = None
+        if body.strip():
+            try:
+                spec = json.loads(body)
+                validate_spec(spec)
+            except (ValueError, SpecError) as e:
+                raise HTTPError(400, f'invalid spec: {e}') from None
+            self._resolve_images(spec)
+        optimize = query.get('optimize', '0') not in ('0', 'false', '')
+        out = query.get('out')
+        if out is not None:
+            out = self._output_path(out)
+        result = await self.submit(spec, optimize, out)
+        if out is not None:
+            return 200, [], _json({'path': out, 'bytes': result})
+        return 200, [('Content-Type', DOCX_TYPE)], result
+
+    def _output_path(self, name):
+        """Absolute path of ``?out=name`` inside the output directory, or 403."""
+        if self.output_dir is None:
+            raise HTTPError(403, 'server-side output is disabled (start with --output-dir)')
+        path = _inside(self.output_dir, name)
+        if path is None:
+            raise HTTPError(403, f'out must be a file name inside the output directory: {name!r}')
+        if not os.path.isdir(os.path.dirname(path)):
+            raise HTTPError(404, f'no such directory in the output directory: {name!r}')
+        return path
+
+    def _resolve_images(self, spec):
+        """Point the image blocks of ``spec`` at files inside the asset directory, or 403."""
+        for section in spec['sections']:
+            for block in section['blocks']:
+                if block['type'] != 'image':
+                    continue
+                if self.asset_dir is None:
+                    raise HTTPError(403, 'images are disabled (start with --asset-dir)')
+                path = _inside(self.asset_dir, block['path'])
+                if path is None:
+                    raise HTTPError(403, 'image path must be inside the asset directory: '
+                                         f'{block["path"]!r}')
+                block['path'] = path
+
+
+def _inside(root, name):
+    """Real path of relative path ``name`` if it stays inside directory ``root``, else None."""
+    norm = os.path.normpath(name)
+    if (not name or os.path.isabs(name) or norm in ('.', '..')
+            or norm.startswith('..' + os.sep)):
+        return None
+    path = os.path.realpath(os.path.join(root, norm))
+    return path if path.startswith(root + os.sep) else None
+
+
+def _json(data):
+    return json.dumps(data).encode('utf-8')
+
+
+async def serve(host='127.0.0.1', port=DEFAULT_PORT, socket_path=None, jobs=None,
+                queue_size=16, ready=None, output_dir=None, asset_dir=None):
+    """Run the server until cancelled (or SIGINT/SIGTERM)."""
+    server = RenderServer(jobs, queue_size, output_dir, asset_dir)
+    await server.start()
+    if socket_path:
+        listener = await asyncio.start_unix_server(server.handle, socket_path)
+        where = socket_path
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        where = 'http://{}:{}'.format(*listener.sockets[0].getsockname()[:2])
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    print(f'Serveur de rendu sur {where} ({server.jobs} workers)', file=sys.stderr)
+    if ready is not None:
+        ready(where)
+    try:
+        async with listener:
+            await stop.wait()
+    finally:
+        await server.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m report.server',
+                                     description='Serveur local de rendu du rapport.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help='socket Unix au lieu de TCP')
+    parser.add_argument('--jobs', type=int, help='processus de rendu (defaut : CPU - 1)')
+    parser.add_argument('--queue', type=int, default=16,
+                        help='jobs en attente au-dela desquels on repond 503 (defaut : 16)')
+    parser.add_argument('--output-dir',
+                        help='dossier ou ?out= peut ecrire (sans : ?out= est refuse)')
+    parser.add_argument('--asset-dir',
+                        help='dossier des images des specs (sans : les images sont refusees)')
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port, args.socket, args.jobs, args.queue,
+                      output_dir=args.output_dir, asset_dir=args.asset_dir))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
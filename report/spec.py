@@ -0,0 +1,168 @@
+"""Report spec: a plain dict/JSON description of the document.
+
+A spec looks like::
+
+    {"sections": [{"id": "cover", "blocks": [...]}, ...]}
+
+Each block is a dict with a ``type`` and a few type-specific fields:
+
+- ``heading``:    text, level (1-9)
+- ``text``:       text, bold, color, size, align
+- ``bullet``:     text, color
+- ``table``:      headers, rows, accent
+- ``divider``
+- ``paragraph``:  runs [{text, font, size, color, bold, italic}], align,
+                  space_before, space_after (no runs = empty paragraph)
+- ``page_break``
+- ``image``:      path, width (cm, default: text width), caption, align
+
+Colours are palette names from ``theme.PALETTE`` or 6-digit hex strings,
+sizes are in points.  A page break is inserted between sections.
+
+This module must stay free of python-docx imports: it backs ``--check``.
+"""
+import json
+import re
+
+from . import theme
+
+
+class SpecError(ValueError):
+    """Raised when a spec is malformed."""
+
+
+ALIGNMENTS = ('left', 'center', 'right', 'justify')
+
+_HEX = re.compile(r'^[0-9A-Fa-f]{6}$')
+
+_RUN_KEYS = {'text', 'font', 'size', 'color', 'bold', 'italic'}
+
+_BLOCK_KEYS = {
+    'heading': {'text', 'level'},
+    'text': {'text', 'bold', 'color', 'size', 'align'},
+    'bullet': {'text', 'color'},
+    'table': {'headers', 'rows', 'accent'},
+    'divider': set(),
+    'paragraph': {'runs', 'align', 'space_before', 'space_after'},
+    'page_break': set(),
+    'image': {'path', 'width', 'caption', 'align'},
+}
+
+
+def load_spec(path):
+    """Read and validate a JSON spec file."""
+    with open(path, encoding='utf-8') as f:
+        try:
+            spec = json.load(f)
+        except json.JSONDecodeError as e:
+            raise SpecError(f'{path}: {e}') from None
+    validate_spec(spec)
+    return spec
+
+
+def validate_spec(spec):
+    """Check the structure of ``spec``, raising SpecError on the first problem."""
+    if not isinstance(spec, dict):
+        raise SpecError('spec must be an object')
+    sections = spec.get('sections')
+    if not isinstance(sections, list) or not sections:
+        raise SpecError('spec.sections must be a non-empty list')
+    seen = set()
+    for i, section in enumerate(sections):
+        where = f'sections[{i}]'
+        if not isinstance(section, dict):
+            raise SpecError(f'{where} must be an object')
+        sid = section.get('id')
+        if not isinstance(sid, str) or not sid:
+            raise SpecError(f'{where}.id must be a non-empty string')
+        if sid in seen:
+            raise SpecError(f'{where}.id {sid!r} is duplicated')
+        seen.add(sid)
+        blocks = section.get('blocks')
+        if isinstance(blocks, (str, bytes, dict)) or not hasattr(blocks, '__iter__'):
+            raise SpecError(f'{where}.blocks must be a list')
+        # Generators (streaming appendices) are validated as they are rendered.
+        if isinstance(blocks, list):
+            for j, block in enumerate(blocks):
+                validate_block(block, f'{where}.blocks[{j}]')
+
+
+def validate_block(block, where='block'):
+    if not isinstance(block, dict):
+        raise SpecError(f'{where} must be an object')
+    kind = block.get('type')
+    if kind not in _BLOCK_KEYS:
+        raise SpecError(f'{where}.type must be one of {sorted(_BLOCK_KEYS)}, got {kind!r}')
+    extra = set(block) - _BLOCK_KEYS[kind] - {'type'}
+    if extra:
+        raise SpecError(f'{where}: unknown field(s) {sorted(extra)} for {kind!r}')
+
+    if kind in ('heading', 'text', 'bullet'):
+        _check_str(block.get('text'), f'{where}.text')
+    if kind == 'image':
+        _check_str(block.get('path'), f'{where}.path')
+        if 'caption' in block:
+            _check_str(block['caption'], f'{where}.caption')
+        if 'width' in block:
+            _check_number(block['width'], f'{where}.width')
+    if kind == 'heading':
+        level = block.get('level', 1)
+        if not isinstance(level, int) or not 1 <= level <= 9:
+            raise SpecError(f'{where}.level must be an integer between 1 and 9')
+    if kind == 'table':
+        headers = block.get('headers')
+        if not isinstance(headers, list) or not headers:
+            raise SpecError(f'{where}.headers must be a non-empty list')
+        for k, h in enumerate(headers):
+            _check_str(h, f'{where}.headers[{k}]')
+        rows = block.get('rows')
+        if isinstance(rows, list):
+            for k, row in enumerate(rows):
+                if not isinstance(row, (list, tuple)) or len(row) != len(headers):
+                    raise SpecError(f'{where}.rows[{k}] must have {len(headers)} cells')
+        elif rows is None or isinstance(rows, (str, dict)):
+            raise SpecError(f'{where}.rows must be a list')
+    if kind == 'paragraph':
+        runs = block.get('runs', [])
+        if not isinstance(runs, list):
+            raise SpecError(f'{where}.runs must be a list')
+        for k, run in enumerate(runs):
+            rwhere = f'{where}.runs[{k}]'
+            if not isinstance(run, dict):
+                raise SpecError(f'{rwhere} must be an object')
+            extra = set(run) - _RUN_KEYS
+            if extra:
+                raise SpecError(f'{rwhere}: unknown field(s) {sorted(extra)}')
+            _check_str(run.get('text'), f'{rwhere}.text')
+            _check_style(run, rwhere)
+        for key in ('space_before', 'space_after'):
+            if key in block:
+                _check_number(block[key], f'{where}.{key}')
+    _check_style(block, where)
+    if 'align' in block and block['align'] not in ALIGNMENTS:
+        raise SpecError(f'{where}.align must be one of {ALIGNMENTS}')
+
+
+def _check_style(obj, where):
+    for key in ('color', 'accent'):
+        if obj.get(key) is not None:
+            value = obj[key]
+            if not isinstance(value, str) or not (value in theme.PALETTE or _HEX.match(value)):
+                raise SpecError(f'{where}.{key} must be a palette name or 6-digit hex')
+    if 'size' in obj:
+        _check_number(obj['size'], f'{where}.size')
+    for key in ('bold', 'italic'):
+        if key in obj and not isinstance(obj[key], bool):
+            raise SpecError(f'{where}.{key} must be a boolean')
+    if 'font' in obj and not isinstance(obj['font'], str):
+        raise SpecError(f'{where}.font must be a string')
+
+
+def _check_str(value, where):
+    if not isinstance(value, str):
+        raise SpecError(f'{where} must be a string')
+
+
+def _check_number(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise SpecError(f'{where} must be a positive number')
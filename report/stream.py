@@ -0,0 +1,252 @@
+"""Streaming writer: word/document.xml is written as the report is built.
+
+StreamingDocument implements the part of the python-docx Document API the
+helpers use (add_paragraph, add_heading, add_table, add_page_break), so
+add_body_text(), add_bullet(), make_dark_table() and add_section_divider()
+produce the same XML as on a regular Document; add_image() pictures too,
+their media parts being written on close().  Each block is serialized
+into the zip as soon as the next one is started; tables are written row
+batch by row batch.  Memory therefore stays flat however long the report
+is, as long as its sections are fed from generators.
+
+A block can no longer be modified once the next block has been added.
+If rendering raises inside ``with StreamingDocument(...)``, the output is
+abandoned (a path output is removed) rather than closed as a document.
+"""
+import io
+import re
+import time
+import zipfile
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.oxml.table import CT_Tbl
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from .fonts import FONT_TABLE_PART, FONT_TABLE_RELS_PART, FONTS_DIR, SETTINGS_PART
+from .package import (CONTENT_TYPES_PART, DOCUMENT_PART, DOCUMENT_RELS_PART, IMAGE_RELTYPE,
+                      STYLES_PART, PackageWriter)
+from .spec import validate_spec
+from .template import base_template
+from .trace import span
+
+FLUSH_SIZE = 1 << 16
+
+_BODY = qn('w:body')
+_SECT_PR = qn('w:sectPr')
+_DOC_PR_ID = re.compile(rb'(<wp:docPr id=")\d+')
+# Parts written on close when fonts are embedded.
+FONT_PARTS = (FONT_TABLE_PART, FONT_TABLE_RELS_PART, SETTINGS_PART)
+
+
+class StreamingDocument:
+    """Write-only stand-in for docx.Document backed by a PackageWriter."""
+
+    def __init__(self, out, base=None, compresslevel=6, optimize=False, embed_fonts=False):
+        base = base or base_template()
+        template = Document(io.BytesIO(base))
+        self.part = template.part
+        self._base = base
+        self._rels = set(self.part.rels)
+        self._drawings = 0
+        self.optimizer = None
+        if optimize:
+            from .optimize import Optimizer
+            self.optimizer = Optimizer(template)
+        self.fonts = self.font_stats = None
+        if embed_fonts:
+            from docx.opc.constants import RELATIONSHIP_TYPE as RT
+            from .fonts import FontUsage
+            self.fonts = FontUsage(self.part.styles.element,
+                                   self.part.part_related_by(RT.THEME).blob)
+        self._block_width = template._block_width
+        root = template.element
+        self._nsdecls = [f' xmlns:{prefix}="{uri}"'.encode() for prefix, uri in root.nsmap.items()]
+
+        self._package = PackageWriter(out, compresslevel)
+        with zipfile.ZipFile(io.BytesIO(base)) as src:
+            head = src.read(DOCUMENT_PART)
+        # styles.xml is written last: the optimizer may add styles to it;
+        # so are the content types and relationships, which images extend,
+        # and the font table and settings, which embedded fonts change.
+        skip = (DOCUMENT_PART, STYLES_PART, CONTENT_TYPES_PART, DOCUMENT_RELS_PART)
+        if self.fonts is not None:
+            skip += FONT_PARTS
+        self._package.copy_parts(base, skip=skip)
+        self._stream = self._package.open(DOCUMENT_PART)
+        self._buf = bytearray()
+        self._pending = None
+
+        # Everything up to <w:body> (declaration, root tag, w:background),
+        # and the final sectPr, come from the base document.xml.
+        body = root.find(_BODY)
+        self._sect_pr = body.find(_SECT_PR)
+        self._buf += head[:head.index(b'<w:body')] + b'<w:body>'
+
+    # -- python-docx Document API used by the helpers --
+
+    def add_paragraph(self, text='', style=None):
+        paragraph = Paragraph(self._add(OxmlElement('w:p')), self)
+        if text:
+            paragraph.add_run(text)
+        if style is not None:
+            paragraph.style = style
+        return paragraph
+
+    def add_heading(self, text='', level=1):
+        if not 0 <= level <= 9:
+            raise ValueError('level must be in range 0-9, got %d' % level)
+        style = 'Title' if level == 0 else 'Heading %d' % level
+        return self.add_paragraph(text, style)
+
+    def add_page_break(self):
+        paragraph = self.add_paragraph()
+        paragraph.add_run().add_break(WD_BREAK.PAGE)
+        return paragraph
+
+    def add_table(self, rows, cols, style=None):
+        table = Table(self._add(CT_Tbl.new_tbl(rows, cols, self._block_width)), self)
+        table.style = style
+        return table
+
+    def stream_rows(self, table, batches):
+        """Write ``table`` (must be the last block added) then its row batches."""
+        tbl = table._tbl
+        if tbl is not self._pending:
+            raise ValueError('stream_rows() expects the table that was just added')
+        self._pending = None
+        # Write the table start tag and its current children, then each batch.
+        head = self._serialize(tbl)
+        self._buf += head[:-len(b'</w:tbl>')]
+        for batch in batches:
+            for tr in batch:
+                self._buf += self._serialize(tr)
+            self._maybe_flush()
+        self._buf += b'</w:tbl>'
+
+    def add_xml(self, data):
+        """Append body XML already serialized (no namespace declarations)."""
+        self._flush_pending()
+        self._buf += data
+        self._maybe_flush()
+
+    # -- writing --
+
+    def _add(self, element):
+        self._flush_pending()
+        self._pending = element
+        return element
+
+    def _flush_pending(self):
+        if self._pending is not None:
+            self._buf += self._serialize(self._pending)
+            self._pending = None
+            self._maybe_flush()
+
+    def _serialize(self, element):
+        if self.optimizer is not None:
+            # Both sides measured as written, namespace declarations excluded.
+            stats = self.optimizer.stats
+            stats.bytes_before += len(self._tostring(element))
+            start = time.perf_counter()
+            self.optimizer.process(element)
+            stats.seconds += time.perf_counter() - start
+        data = self._tostring(element)
+        if self.optimizer is not None:
+            stats.bytes_after += len(data)
+        if self.fonts is not None:
+            self.fonts.add(element)
+        if b'<wp:docPr' in data:
+            # The template part numbers every picture alike; number them here.
+            data = _DOC_PR_ID.sub(self._drawing_id, data)
+        return data
+
+    def _tostring(self, element):
+        data = etree.tostring(element, encoding='UTF-8', xml_declaration=False)
+        # Namespaces are declared once on <w:document>; drop the copies
+        # lxml repeats on each detached element's start tag.
+        end = data.index(b'>')
+        tag = data[:end]
+        for decl in self._nsdecls:
+            if decl in tag:
+                tag = tag.replace(decl, b'', 1)
+        return tag + data[end:]
+
+    def _drawing_id(self, match):
+        self._drawings += 1
+        return match.group(1) + str(self._drawings).encode()
+
+    def _maybe_flush(self):
+        if len(self._buf) >= FLUSH_SIZE:
+            self._stream.write(self._buf)
+            self._buf.clear()
+
+    def close(self):
+        with span('close', 'package'):
+            try:
+                self._close()
+            except BaseException:
+                self._package.abort()
+                raise
+
+    def abort(self):
+        """Give up: the output is not completed (and removed if it is a path)."""
+        self._package.abort()
+
+    def _close(self):
+        self._flush_pending()
+        if self._sect_pr is not None:
+            self._buf += self._serialize(self._sect_pr)
+        self._buf += b'</w:body></w:document>'
+        self._stream.write(self._buf)
+        self._buf.clear()
+        self._stream.close()
+        self._package.write(STYLES_PART, serialize_part_xml(self.part.styles.element))
+        base = self._base
+        if self.fonts is not None:
+            from .fonts import EmbedStats, embed_base
+            self.font_stats = EmbedStats()
+            base = embed_base(base, self.fonts, self.font_stats)
+            with zipfile.ZipFile(io.BytesIO(base)) as src:
+                for name in src.namelist():
+                    if name in FONT_PARTS or name.startswith(FONTS_DIR):
+                        self._package.write(name, src.read(name))
+        rels = self.part.rels
+        self._package.write_images(base, {
+            rid: rels[rid].target_part.blob for rid in set(rels) - self._rels
+            if rels[rid].reltype == IMAGE_RELTYPE})
+        self._package.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        # A render that failed halfway must not leave a valid-looking,
+        # truncated document behind.
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def stream_report(spec, out, optimize=False, compresslevel=6, embed_fonts=False):
+    """Like build_report(), but written to ``out`` as it is rendered.
+
+    Section ``blocks`` may be generators; they are consumed lazily.  Returns
+    the OptimizeStats when ``optimize`` is set (the EmbedStats in its
+    ``fonts``), else the EmbedStats when ``embed_fonts`` is (see fonts.py).
+    """
+    from .build import render_spec
+    validate_spec(spec)
+    with StreamingDocument(out, compresslevel=compresslevel, optimize=optimize,
+                           embed_fonts=embed_fonts) as doc:
+        render_spec(doc, spec)
+    if doc.optimizer is None:
+        return doc.font_stats
+    doc.optimizer.stats.fonts = doc.font_stats
+    return doc.optimizer.stats
@@ -0,0 +1,243 @@
+"""Bulk builder for dark tables (used by make_dark_table).
+
+Styling every cell through python-docx proxies, with a freshly parsed
+shading element per cell, does not scale to exported tables.  The table
+style compiled by template.py (TABLE_STYLE) centres the table, draws its
+borders and shades every cell with the first band colour; the header row
+and the second band only override the shading.  The header row and the
+two banded data rows are styled once, through proxy calls, and then used
+as prototypes: each data row is a deep copy of
+its prototype (a single C-level copy in lxml) with the cell texts filled
+in.  Rows are produced in batches so callers can either append them to a
+table or write them out directly.
+
+Column widths are computed here from font metrics (see metrics.py) over
+the headers and the first SAMPLE_ROWS rows, and the table is written with
+a fixed layout and explicit grid and cell widths: Word and LibreOffice
+then do not have to lay out every row to size the columns on opening.
+"""
+import copy
+from itertools import chain, islice
+
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from . import theme
+from .metrics import longest_word, text_width
+
+BATCH_SIZE = 1024
+
+# Rows measured to size the columns (the rest are assumed alike).
+SAMPLE_ROWS = 1000
+# Default left + right cell margins in Word (0.08" each), in points.
+CELL_PADDING = 11.52
+HEADER_SIZE = 10
+CELL_SIZE = 9.5
+
+_T = qn('w:t')
+_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+_SPECIAL = frozenset('\t\n\r')
+
+
+class RowPrototypes:
+    """Styled header row and banded data-row prototypes for one table."""
+
+    def __init__(self, table, headers, accent=None):
+        from .helpers import set_cell_bg
+        from .template import TABLE_CELL_STYLE, TABLE_HEADER_STYLE
+        self.ncols = len(headers)
+        tbl = table._tbl
+
+        # Header row
+        for i, h_text in enumerate(headers):
+            cell = table.rows[0].cells[i]
+            set_cell_bg(cell, theme.TABLE_HEADER_BG)
+            p = cell.paragraphs[0]
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            run = p.add_run(h_text, TABLE_HEADER_STYLE)
+            if accent is not None:
+                run.font.color.rgb = accent
+
+        # Data rows, one per band colour, detached from the table; the
+        # first band is the table style's own shading.
+        self.rows = []
+        for bg in theme.TABLE_ROW_BG:
+            row = table.add_row()
+            for cell in row.cells:
+                if bg != theme.TABLE_ROW_BG[0]:
+                    set_cell_bg(cell, bg)
+                cell.paragraphs[0].add_run('x', TABLE_CELL_STYLE)
+            tbl.remove(row._tr)
+            self.rows.append(row._tr)
+
+    def make_row(self, index, values):
+        """Return a new ``w:tr`` for data row ``index`` holding ``values``."""
+        if len(values) != self.ncols:
+            raise ValueError(f'row {index} has {len(values)} cells, expected {self.ncols}')
+        tr = copy.deepcopy(self.rows[index % len(self.rows)])
+        for t, value in zip(list(tr.iter(_T)), values):
+            _set_text(t, value)
+        return tr
+
+    def iter_batches(self, rows, batch_size=BATCH_SIZE, start=0):
+        """Yield lists of ``w:tr`` elements, ``batch_size`` rows at a time."""
+        rows = iter(rows)
+        index = start
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                return
+            make_row = self.make_row
+            yield [make_row(i, values) for i, values in enumerate(chunk, index)]
+            index += len(chunk)
+
+
+def _set_text(t, value):
+    # Same result as Run.add_run(value): no w:t for an empty string, tabs and
+    # line breaks become w:tab/w:br, xml:space="preserve" on outer spaces.
+    if value is None:
+        value = ''
+    elif not isinstance(value, str):
+        value = str(value)
+    if not value:
+        t.getparent().remove(t)
+    elif _SPECIAL.isdisjoint(value):
+        t.text = value
+        if value[0].isspace() or value[-1].isspace():
+            t.set(_SPACE, 'preserve')
+    else:
+        r = t.getparent()
+        r.remove(t)
+        r.text = value
+
+
+def _lines(value):
+    if value is None:
+        return ('',)
+    return str(value).split('\n')
+
+
+def column_widths(headers, rows, total):
+    """Column widths in twips, adding up to ``total`` twips.
+
+    Each column gets its natural width (widest header or cell on one line)
+    when they all fit; otherwise columns shrink from natural towards the
+    width of their longest word, in proportion to what they can give.  When
+    even the longest words do not fit (an id or a URL in one column), the
+    columns narrower than an even share keep their longest word and only
+    the wider ones are cut, to a common width.
+    """
+    ncols = len(headers)
+    if not ncols:
+        return []
+    natural = [text_width(h, theme.HEADING_FONT, HEADER_SIZE, True) for h in headers]
+    minimum = [longest_word(h, theme.HEADING_FONT, HEADER_SIZE, True) for h in headers]
+    for row in rows:
+        if len(row) != ncols:
+            continue  # reported by make_row()
+        for i, value in enumerate(row):
+            for line in _lines(value):
+                natural[i] = max(natural[i], text_width(line, theme.BODY_FONT, CELL_SIZE))
+                minimum[i] = max(minimum[i], longest_word(line, theme.BODY_FONT, CELL_SIZE))
+    natural = [(w + CELL_PADDING) * 20 for w in natural]
+    minimum = [(w + CELL_PADDING) * 20 for w in minimum]
+    if sum(natural) <= total:
+        widths = [w * total / sum(natural) for w in natural]
+    elif sum(minimum) >= total:
+        cap = _cap(minimum, total)
+        widths = [min(w, cap) for w in minimum]
+    else:
+        give = sum(natural) - sum(minimum)
+        room = total - sum(minimum)
+        widths = [m + (n - m) * room / give for n, m in zip(natural, minimum)]
+    twips = [int(w) for w in widths]
+    twips[-1] += total - sum(twips)
+    return twips
+
+
+def _cap(widths, total):
+    """Width ``c`` such that the ``widths`` capped at ``c`` add up to ``total``."""
+    remaining, left = total, len(widths)
+    for w in sorted(widths):
+        if w * left > remaining:
+            break
+        remaining -= w
+        left -= 1
+    return remaining / left if left else max(widths)
+
+
+def set_column_widths(table, widths):
+    """Fixed layout with ``widths`` (twips) on the grid and the existing cells."""
+    tbl = table._tbl
+    table.autofit = False
+    tbl_w = tbl.tblPr.find(qn('w:tblW'))
+    if tbl_w is not None:
+        tbl_w.set(qn('w:type'), 'dxa')
+        tbl_w.set(qn('w:w'), str(sum(widths)))
+    for col, width in zip(tbl.tblGrid.gridCol_lst, widths):
+        col.set(qn('w:w'), str(width))
+    for tr in tbl.tr_lst:
+        for tc, width in zip(tr.tc_lst, widths):
+            tc_w = tc.get_or_add_tcPr().get_or_add_tcW()
+            tc_w.set(qn('w:type'), 'dxa')
+            tc_w.set(qn('w:w'), str(width))
+
+
+def _accent_borders(table, accent):
+    """Top and bottom borders in ``accent`` instead of the table style's gold."""
+    table._tbl.tblPr.insert_element_before(parse_xml(
+        f'<w:tblBorders {nsdecls("w")}>'
+        f'<w:top w:val="single" w:sz="4" w:space="0" w:color="{accent}"/>'
+        f'<w:bottom w:val="single" w:sz="4" w:space="0" w:color="{accent}"/>'
+        '</w:tblBorders>'
+    ), 'w:shd', 'w:tblLayout', 'w:tblCellMar', 'w:tblLook', 'w:tblCaption',
+        'w:tblDescription', 'w:tblPrChange')
+
+
+def new_dark_table(doc, headers, widths=None, accent=None):
+    """Add an empty dark table to ``doc``; return it with its row prototypes.
+
+    ``widths`` (twips) fixes the column widths; the prototypes take them too.
+    ``accent`` (an RGBColor) replaces the gold of the header text and of the
+    top and bottom borders.
+    """
+    from .template import TABLE_STYLE, style_id
+    table = doc.add_table(rows=1, cols=len(headers))
+    # Set by id, as the paragraph styles (see helpers._styled_paragraph).
+    table._tbl.tblPr.style = style_id(TABLE_STYLE)
+    if accent is not None and str(accent) == theme.PALETTE['gold']:
+        accent = None  # the table styles' own
+    if accent is not None:
+        _accent_borders(table, accent)
+    if widths is not None:
+        set_column_widths(table, widths)
+    protos = RowPrototypes(table, headers, accent)
+    return table, protos
+
+
+def add_dark_table(doc, headers, rows=(), columns=None, batch_size=BATCH_SIZE, accent=None):
+    """Add a dark table, same look as make_dark_table(), built in bulk.
+
+    ``rows`` is any iterable of row sequences; alternatively pass
+    ``columns``, a sequence of equally long column sequences.  ``accent``
+    is as for new_dark_table().
+    """
+    if columns is not None:
+        lengths = {len(column) for column in columns}
+        if len(lengths) > 1:
+            raise ValueError(f'columns have different lengths: {sorted(lengths)}')
+        rows = zip(*columns)
+    rows = iter(rows)
+    sample = list(islice(rows, SAMPLE_ROWS))
+    widths = column_widths(headers, sample, doc._block_width // 635)
+    table, protos = new_dark_table(doc, headers, widths, accent)
+    batches = protos.iter_batches(chain(sample, rows), batch_size)
+    if hasattr(doc, 'stream_rows'):
+        # StreamingDocument: rows go to the output without building the table.
+        doc.stream_rows(table, batches)
+    else:
+        tbl = table._tbl
+        for batch in batches:
+            tbl.extend(batch)
+    return table
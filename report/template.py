@@ -0,0 +1,208 @@
+"""Theme compiler: bake the report theme into a cached base package.
+
+compile_theme() applies the page setup and turns the theme constants into
+named styles.  base_template() does that once per theme version and keeps
+the resulting .docx in the report cache (named after theme_hash()) and in
+memory, so new_document() only has to open a small, pre-styled package.
+"""
+import hashlib
+import io
+import json
+import os
+
+from . import theme
+from .cache import atomic_write, cache_dir
+
+# Bump when compile_theme() output changes without a theme constant changing.
+TEMPLATE_VERSION = 2
+
+# Styles kept from python-docx's default template; everything else (the ~150
+# unused table/list styles and stylesWithEffects.xml) is dropped at compile
+# time, which is most of the per-document open/save cost.
+KEEP_STYLES = {
+    'Normal', 'Default Paragraph Font', 'Normal Table', 'No List',
+    'Title', 'List Bullet', 'Hyperlink',
+} | {f'Heading {i}' for i in range(1, 10)}
+
+BODY_STYLE = 'TT Body'
+BULLET_STYLE = 'TT Bullet'
+DIVIDER_STYLE = 'TT Divider'
+CAPTION_STYLE = 'TT Caption'
+ACCENT_STYLE = 'TT Accent'
+TABLE_HEADER_STYLE = 'TT Table Header'
+TABLE_CELL_STYLE = 'TT Table Cell'
+TABLE_STYLE = 'TT Dark Table'
+
+
+def style_id(name):
+    """styleId python-docx gives a style ``name`` added by compile_theme()."""
+    return name.replace(' ', '')
+
+
+def is_accent(font, color):
+    """Whether a run in ``font`` and ``color`` (hex) is what ACCENT_STYLE formats."""
+    return font == theme.HEADING_FONT and color == theme.PALETTE['gold']
+
+
+_DROP_RELTYPES = (
+    'http://schemas.openxmlformats.org/package/2006/relationships/metadata/thumbnail',
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships/customXml',
+    'http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects',
+)
+
+_base_blob = None
+
+
+def theme_hash():
+    """Hash of everything that goes into the compiled base package."""
+    import docx
+    constants = {k: v for k, v in vars(theme).items() if k.isupper()}
+    payload = json.dumps([TEMPLATE_VERSION, docx.__version__, constants],
+                         sort_keys=True, default=list)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def base_template():
+    """Return the compiled base package as bytes, compiling it if needed."""
+    global _base_blob
+    if _base_blob is None:
+        path = os.path.join(cache_dir('templates'), f'base-{theme_hash()}.docx')
+        try:
+            with open(path, 'rb') as f:
+                _base_blob = f.read()
+        except FileNotFoundError:
+            from docx import Document
+            buf = io.BytesIO()
+            compile_theme(Document()).save(buf)
+            _base_blob = buf.getvalue()
+            atomic_write(path, _base_blob)
+    return _base_blob
+
+
+def new_document():
+    """Return an empty Document opened from the compiled base package."""
+    from docx import Document
+    return Document(io.BytesIO(base_template()))
+
+
+def compile_theme(doc):
+    """Apply the theme to ``doc`` in place and return it."""
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Cm, Pt, RGBColor
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls, qn
+    from .tables import CELL_SIZE, HEADER_SIZE
+
+    # --- Margins ---
+    for section in doc.sections:
+        section.top_margin = Cm(theme.MARGINS['top'])
+        section.bottom_margin = Cm(theme.MARGINS['bottom'])
+        section.left_margin = Cm(theme.MARGINS['left'])
+        section.right_margin = Cm(theme.MARGINS['right'])
+
+    _prune(doc, qn)
+    styles = doc.styles
+
+    def font(style, name=None, size=None, color=None, bold=None, italic=None):
+        if name:
+            rfonts = style.element.get_or_add_rPr().get_or_add_rFonts()
+            for attr in ('w:asciiTheme', 'w:hAnsiTheme', 'w:eastAsiaTheme', 'w:cstheme'):
+                rfonts.attrib.pop(qn(attr), None)
+            style.font.name = name
+        if size:
+            style.font.size = Pt(size)
+        if color:
+            style.font.color.rgb = RGBColor.from_string(theme.resolve_color(color))
+        if bold is not None:
+            style.font.bold = bold
+        if italic is not None:
+            style.font.italic = italic
+        return style
+
+    def add(name, kind, base=None):
+        style = styles.add_style(name, kind)
+        if base:
+            style.base_style = styles[base]
+        return style
+
+    # Headings: Georgia / gold.
+    for i in range(1, 10):
+        font(styles[f'Heading {i}'], theme.HEADING_FONT, color='gold')
+    font(styles['Title'], theme.HEADING_FONT, color='gold')
+
+    body = font(add(BODY_STYLE, WD_STYLE_TYPE.PARAGRAPH, 'Normal'),
+                theme.BODY_FONT, theme.BODY_SIZE, theme.BODY_COLOR)
+    body.paragraph_format.space_after = Pt(6)
+    font(add(BULLET_STYLE, WD_STYLE_TYPE.PARAGRAPH, 'List Bullet'),
+         theme.BODY_FONT, theme.BULLET_SIZE, theme.BULLET_COLOR)
+    divider = font(add(DIVIDER_STYLE, WD_STYLE_TYPE.PARAGRAPH, 'Normal'), size=8, color='gold')
+    divider.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    divider.paragraph_format.space_before = Pt(12)
+    divider.paragraph_format.space_after = Pt(12)
+    caption = font(add(CAPTION_STYLE, WD_STYLE_TYPE.PARAGRAPH, 'Normal'),
+                   theme.BODY_FONT, theme.CAPTION_SIZE, theme.BULLET_COLOR, italic=True)
+    caption.paragraph_format.space_after = Pt(10)
+
+    font(add(ACCENT_STYLE, WD_STYLE_TYPE.CHARACTER), theme.HEADING_FONT, color='gold')
+    font(add(TABLE_HEADER_STYLE, WD_STYLE_TYPE.CHARACTER),
+         theme.HEADING_FONT, HEADER_SIZE, 'gold', bold=True)
+    font(add(TABLE_CELL_STYLE, WD_STYLE_TYPE.CHARACTER),
+         theme.BODY_FONT, CELL_SIZE, 'white_dim')
+
+    table = add(TABLE_STYLE, WD_STYLE_TYPE.TABLE, 'Normal Table')
+    table.element.append(parse_xml(
+        f'<w:tblPr {nsdecls("w")}>'
+        '<w:jc w:val="center"/>'
+        '<w:tblBorders>'
+        f'<w:top w:val="single" w:sz="4" w:space="0" w:color="{theme.TABLE_BORDER}"/>'
+        f'<w:bottom w:val="single" w:sz="4" w:space="0" w:color="{theme.TABLE_BORDER}"/>'
+        f'<w:insideH w:val="single" w:sz="2" w:space="0" w:color="{theme.TABLE_INNER_BORDER}"/>'
+        f'<w:insideV w:val="single" w:sz="2" w:space="0" w:color="{theme.TABLE_INNER_BORDER}"/>'
+        '</w:tblBorders>'
+        '</w:tblPr>'
+    ))
+    table.element.append(parse_xml(
+        f'<w:tcPr {nsdecls("w")}>'
+        f'<w:shd w:val="clear" w:fill="{theme.TABLE_ROW_BG[0]}"/><w:vAlign w:val="center"/>'
+        '</w:tcPr>'
+    ))
+
+    if theme.PAGE_BG:
+        from .helpers import set_page_bg
+        set_page_bg(doc, theme.PAGE_BG)
+        settings = doc.settings.element
+        zoom = settings.find(qn('w:zoom'))
+        at = settings.index(zoom) + 1 if zoom is not None else 0
+        settings.insert(at, parse_xml(f'<w:displayBackgroundShape {nsdecls("w")}/>'))
+    return doc
+
+
+def _prune(doc, qn):
+    """Drop unused styles and template-only parts (thumbnail, customXml...)."""
+    for rels in (doc.part.package.rels, doc.part.rels):
+        for rId, rel in list(rels.items()):
+            if rel.reltype in _DROP_RELTYPES:
+                rels.pop(rId)
+
+    root = doc.styles.element
+    by_id = {s.get(qn('w:styleId')): s for s in root.iterchildren(qn('w:style'))}
+    # styles.xml stores some built-in names lowercased ('heading 1').
+    names = {name.lower() for name in KEEP_STYLES}
+    keep = {sid for sid, s in by_id.items() if (s.name_val or '').lower() in names}
+    # Keep the styles referenced from numbering.xml and the basedOn/link/next chains.
+    numbering = doc.part.numbering_part.element
+    keep |= {el.get(qn('w:val')) for el in numbering.iter(qn('w:pStyle'))}
+    todo = list(keep)
+    while todo:
+        style = by_id.get(todo.pop())
+        if style is None:
+            continue
+        for tag in ('w:basedOn', 'w:link', 'w:next'):
+            ref = style.find(qn(tag))
+            if ref is not None and ref.get(qn('w:val')) not in keep:
+                keep.add(ref.get(qn('w:val')))
+                todo.append(ref.get(qn('w:val')))
+    for sid, style in by_id.items():
+        if sid not in keep:
+            root.remove(style)
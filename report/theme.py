@@ -0,0 +1,46 @@
+# --- COULEURS DU SITE ---
+# Kept as plain hex strings so the theme can be read (and hashed) without
+# importing python-docx; helpers.py turns them into RGBColor values.
+PALETTE = {
+    'gold': 'D4AF37',
+    'gold_dark': '8B6914',
+    'dark_bg': '030014',
+    'dark_card': '0A062A',
+    'white': 'FFFFFF',
+    'white_dim': 'AAAABB',
+    'electric': '00D4FF',
+    'emerald': '00C896',
+    'cosmic': '7B2FBE',
+}
+
+HEADING_FONT = 'Georgia'
+BODY_FONT = 'Calibri'
+
+BODY_COLOR = '333333'
+BULLET_COLOR = '444444'
+
+# --- Sizes (pt) ---
+BODY_SIZE = 11
+BULLET_SIZE = 10.5
+CAPTION_SIZE = 9
+
+# Text of add_section_divider().
+DIVIDER = '─' * 40
+
+TABLE_HEADER_BG = '030014'
+TABLE_ROW_BG = ('0A062A', '0F0B35')
+TABLE_BORDER = 'D4AF37'
+TABLE_INNER_BORDER = '1A1640'
+
+# --- Margins (cm) ---
+MARGINS = {'top': 2, 'bottom': 2, 'left': 2.5, 'right': 2.5}
+
+# Page colour for set_page_bg(); None keeps Word's default white page.
+PAGE_BG = None
+
+
+def resolve_color(value):
+    """Return the hex string for a palette name or a 6-digit hex colour."""
+    if value is None:
+        return None
+    return PALETTE.get(value, value).upper()
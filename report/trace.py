@@ -0,0 +1,182 @@
+"""Opt-in tracing of report builds: sections, helpers, XML parsing, save.
+
+    from report import trace
+    tracer = trace.enable()
+    build_report(spec, 'out.docx')
+    trace.disable()
+    tracer.write('trace.json')   # + trace.summary.json
+
+or ``python -m report --trace trace.json``.  The trace file is in Chrome
+trace format (chrome://tracing, Perfetto); the summary gives, per span
+name, the call count, total and self time and the net number of memory
+blocks allocated (sys.getallocatedblocks(), so lxml's own C allocations
+are not counted).
+
+enable() wraps the helpers and parse_xml in place; the sections and the
+package write are marked with span() in the build code.  While disabled,
+span() returns a shared no-op context manager and the helpers are the
+original functions, so the cost is one function call per section.
+"""
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Functions wrapped by enable(), per module, as 'category': names.
+INSTRUMENTED = {
+    'report.helpers': {
+        'helper': ('set_page_bg', 'set_cell_bg', 'add_styled_heading', 'add_body_text',
+                   'add_bullet', 'make_dark_table', 'add_section_divider'),
+        'xml': ('parse_xml',),
+    },
+    'report.tables': {
+        'helper': ('add_dark_table',),
+        'xml': ('parse_xml',),
+    },
+    'report.build': {
+        'helper': ('add_paragraph',),
+    },
+    'report.optimize': {
+        'pass': ('optimize',),
+    },
+}
+
+_NULL = contextlib.nullcontext()
+
+_tracer = None
+
+
+class Tracer:
+    """Collects completed spans as Chrome trace 'X' events."""
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._local = threading.local()
+
+    def span(self, name, cat='report', **args):
+        return _Span(self, name, cat, args)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def summary(self):
+        """{name: {count, total_ms, self_ms, blocks}}, slowest first."""
+        out = {}
+        for ev in self.events:
+            s = out.setdefault(ev['name'], {'cat': ev['cat'], 'count': 0, 'total_ms': 0.0,
+                                            'self_ms': 0.0, 'blocks': 0})
+            s['count'] += 1
+            s['total_ms'] += ev['dur'] / 1000
+            s['self_ms'] += ev['args']['self_us'] / 1000
+            s['blocks'] += ev['args']['blocks']
+        for s in out.values():
+            s['total_ms'] = round(s['total_ms'], 3)
+            s['self_ms'] = round(s['self_ms'], 3)
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]['self_ms']))
+
+    def write(self, path, summary_path=None):
+        """Write the Chrome trace to ``path`` and the summary next to it."""
+        if summary_path is None:
+            root, _ = os.path.splitext(path)
+            summary_path = f'{root}.summary.json'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        return summary_path
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start', 'blocks', 'child_ns')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.child_ns = 0
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        tracer = self.tracer
+        stack = tracer._stack()
+        stack.pop()
+        dur = end - self.start
+        if stack:
+            stack[-1].child_ns += dur
+        args = dict(self.args, blocks=sys.getallocatedblocks() - self.blocks,
+                    self_us=(dur - self.child_ns) / 1000)
+        tracer.events.append({
+            'name': self.name, 'cat': self.cat, 'ph': 'X',
+            'ts': (self.start - tracer._origin) / 1000, 'dur': dur / 1000,
+            'pid': tracer._pid, 'tid': threading.get_ident(), 'args': args,
+        })
+        return False
+
+
+def span(name, cat='report', **args):
+    """Context manager timing a block when tracing is enabled, no-op otherwise."""
+    if _tracer is None:
+        return _NULL
+    return _tracer.span(name, cat, **args)
+
+
+def enabled():
+    return _tracer is not None
+
+
+def _wrap(fn, cat):
+    @functools.wraps(fn)
+    def traced(*args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return fn(*args, **kwargs)
+        with tracer.span(fn.__name__, cat):
+            return fn(*args, **kwargs)
+    traced.__wrapped_original__ = fn
+    return traced
+
+
+def enable():
+    """Start tracing; return the Tracer collecting the spans."""
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    from importlib import import_module
+    for module_name, groups in INSTRUMENTED.items():
+        module = import_module(module_name)
+        for cat, names in groups.items():
+            for name in names:
+                setattr(module, name, _wrap(getattr(module, name), cat))
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable():
+    """Stop tracing, restore the original functions; return the Tracer."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    for module_name, groups in INSTRUMENTED.items():
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        for names in groups.values():
+            for name in names:
+                fn = getattr(module, name)
+                setattr(module, name, getattr(fn, '__wrapped_original__', fn))
+    return tracer
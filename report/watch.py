@@ -0,0 +1,170 @@
+"""Watch mode: rebuild the report whenever one of its sources changes.
+
+    python -m report --watch [SPEC] [-o OUT]...
+
+The sources are polled (stat() only, every POLL_INTERVAL): the spec file,
+or for the built-in content src/components, package.json and
+docs/screenshots; the images the spec uses; and the report package's own
+modules, theme.py included.  A burst of saves is taken as one change once
+the files have been quiet for DEBOUNCE.
+
+A content change is rebuilt in this process, through the incremental
+build: only the sections whose content changed are rendered again, and
+every output is replaced atomically, so a viewer never reads a
+half-written file.  A change to the code or the theme restarts the
+process instead (like a development server), so that every module sees
+the new constants; the fragment cache keeps that rebuild incremental too.
+"""
+import os
+import sys
+import time
+
+from .components import COMPONENTS_DIR, REPO_ROOT, _walk
+
+POLL_INTERVAL = 0.1
+DEBOUNCE = 0.05
+# A source that keeps changing still gets rebuilt this often.
+MAX_DEBOUNCE = 1.0
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def code_files():
+    return [os.path.join(PACKAGE_DIR, name) for name in sorted(os.listdir(PACKAGE_DIR))
+            if name.endswith('.py')]
+
+
+def content_files(spec_path, spec, root=REPO_ROOT):
+    """Files the spec depends on: the spec itself or the repository sources, and its images."""
+    if spec_path:
+        files = [spec_path]
+    else:
+        from .content import SCREENSHOTS_DIR
+        files = [os.path.join(root, 'package.json')]
+        for folder in (COMPONENTS_DIR, SCREENSHOTS_DIR):
+            directory = os.path.join(root, folder)
+            files.append(directory)  # its mtime changes when files come or go
+            if os.path.isdir(directory):
+                files.extend(os.path.join(directory, rel) for rel, _ in _walk(directory))
+    if spec is not None:
+        files.extend(block['path'] for section in spec['sections']
+                     if isinstance(section['blocks'], list)
+                     for block in section['blocks'] if block['type'] == 'image')
+    return files
+
+
+def snapshot(paths):
+    """{path: (mtime_ns, size)}, None for a missing file."""
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            state[path] = None
+        else:
+            state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def changed(before, after):
+    return sorted(p for p in set(before) | set(after) if before.get(p) != after.get(p))
+
+
+class Watcher:
+    """Rebuilds ``outputs`` from ``load()`` on every change of the sources."""
+
+    def __init__(self, load, spec_path, outputs, options, log=sys.stdout,
+                 interval=POLL_INTERVAL, debounce=DEBOUNCE):
+        self.load = load
+        self.spec_path = spec_path
+        self.outputs = outputs
+        self.options = options
+        self.log = log
+        self.interval = interval
+        self.debounce = debounce
+        self.code = snapshot(code_files())
+        self.spec = None
+        self.content = {}
+
+    def print(self, message):
+        print(f'[{time.strftime("%H:%M:%S")}] {message}', file=self.log, flush=True)
+
+    def build(self, reason, saved_at=None):
+        """Load the spec and render every output; errors are reported, not raised."""
+        from .formats import render_outputs
+        from .spec import SpecError
+        start = time.perf_counter()
+        try:
+            spec = self.load()
+        except (OSError, SpecError) as e:
+            self._watch(content_files(self.spec_path, None))
+            self.print(f'{reason} : spec invalide, document conserve ({e})')
+            return
+        self.spec = spec
+        self._watch(content_files(self.spec_path, spec))
+        try:
+            results = render_outputs(spec, self.outputs, self.options)
+        except Exception as e:  # keep watching: the next save may fix it
+            self.print(f'{reason} : echec du rendu ({type(e).__name__}: {e})')
+            return
+        message = f'{reason} : reconstruit en {(time.perf_counter() - start) * 1000:.0f} ms'
+        if saved_at is not None:
+            message += f', {(time.time() - saved_at) * 1000:.0f} ms apres l\'enregistrement'
+        stats = '; '.join(str(r) for r in results.values() if r is not None)
+        self.print(message + (f' ({stats})' if stats else ''))
+
+    def _watch(self, files):
+        # Files already watched keep the state seen before the build, so a
+        # save during the build is still noticed.
+        self.content.update(snapshot(f for f in files if f not in self.content))
+
+    def wait(self):
+        """Block until the sources change and settle.
+
+        Returns the changed paths, whether code changed, and the time of
+        the last save (None if the files were removed).
+        """
+        while True:
+            time.sleep(self.interval)
+            content = snapshot(self.content)
+            code = snapshot(self.code)
+            if content != self.content or code != self.code:
+                break
+        first = time.monotonic()
+        while time.monotonic() - first < MAX_DEBOUNCE:
+            time.sleep(self.debounce)
+            settled = snapshot(self.content), snapshot(self.code)
+            if settled == (content, code):
+                break
+            content, code = settled
+        paths = changed(self.content, content) + changed(self.code, code)
+        self.content = content
+        restart = code != self.code
+        self.code = code
+        stamps = [state[0] for state in (content.get(p) or code.get(p) for p in paths) if state]
+        return paths, restart, max(stamps) / 1e9 if stamps else None
+
+    def run(self):
+        self.build('Build initial')
+        self.print('En attente de modifications (Ctrl+C pour quitter)...')
+        while True:
+            paths, restart, saved_at = self.wait()
+            names = ', '.join(_display(p) for p in paths[:3])
+            if len(paths) > 3:
+                names += f' (+{len(paths) - 3})'
+            if restart:
+                self.print(f'{names} : code ou theme modifie, redemarrage')
+                restart_process()
+            self.build(names, saved_at)
+
+
+def _display(path):
+    rel = os.path.relpath(path)
+    return path if rel.startswith('..') else rel
+
+
+def restart_process():
+    """Replace this process with a fresh run of the same command line."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execv(sys.executable, [sys.executable] + sys.orig_argv[1:])
@@ -0,0 +1,35 @@
+import io
+import zipfile
+
+import pytest
+
+from report import diff
+from report.content import default_spec
+from report.stream import stream_report
+
+
+def _docx(patch=None):
+    buf = io.BytesIO()
+    stream_report(default_spec(), buf)
+    if patch is None:
+        return buf.getvalue()
+    out = io.BytesIO()
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            dst.writestr(info, patch(data) if info.filename == diff.DOCUMENT_PART else data)
+    return out.getvalue()
+
+
+def _background(xml):
+    body = xml.index(b'<w:body>')
+    return xml[:body] + b'<w:background w:color="0A0E27"/>' + xml[body:]
+
+
+@pytest.mark.parametrize('chunk_size', [diff.CHUNK_SIZE, 64])
+def test_change_outside_the_body_elements_is_reported(monkeypatch, chunk_size):
+    monkeypatch.setattr(diff, 'CHUNK_SIZE', chunk_size)
+    assert not diff.diff_documents(_docx(), _docx())
+    report = diff.diff_documents(_docx(), _docx(_background))
+    assert report.parts == [('changed', 'word/document.xml (hors du corps)')]
+    assert not report.sections
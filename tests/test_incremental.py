@@ -0,0 +1,24 @@
+import io
+import zipfile
+
+from report.incremental import FragmentCache, build_incremental
+
+
+def _spec():
+    rows = ((f'TT-{i:03d}', f'Voyageur {i}') for i in range(5))
+    return {'sections': [{'id': 'reservations', 'blocks': [
+        {'type': 'table', 'headers': ['Réservation', 'Voyageur'], 'rows': rows},
+    ]}]}
+
+
+def _rows(cache):
+    buf = io.BytesIO()
+    build_incremental(_spec(), buf, cache=cache)
+    with zipfile.ZipFile(buf) as zf:
+        return zf.read('word/document.xml').count(b'<w:tr>')
+
+
+def test_generator_rows_are_rendered_and_cached(tmp_path):
+    cache = FragmentCache(str(tmp_path))
+    assert _rows(cache) == 6  # header row and 5 data rows
+    assert _rows(cache) == 6  # served from the fragment cache
@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+from report.content import default_spec
+from report.ir import ir_report
+from report.stream import stream_report
+
+
+def _document_xml(render, spec):
+    buf = io.BytesIO()
+    render(spec, buf)
+    with zipfile.ZipFile(buf) as zf:
+        return zf.read('word/document.xml')
+
+
+def _overrides_spec():
+    return {'sections': [
+        {'id': 'texte', 'blocks': [
+            {'type': 'heading', 'text': 'Titre', 'level': 1},
+            {'type': 'heading', 'text': 'Partie', 'level': 3},
+            {'type': 'text', 'text': 'Gras et doré', 'bold': True, 'color': 'gold',
+             'size': 13, 'align': 'right'},
+            {'type': 'text', 'text': ' espaces\tet\nlignes ', 'size': 11},
+            {'type': 'bullet', 'text': 'Puce', 'color': '00D4FF'},
+            {'type': 'divider'},
+            {'type': 'paragraph', 'align': 'center', 'space_before': 4, 'space_after': 2,
+             'runs': [{'text': 'A', 'font': 'Georgia', 'size': 20, 'italic': True},
+                      {'text': ' & <b>', 'color': 'emerald', 'bold': True}]},
+        ]},
+        {'id': 'table', 'blocks': [
+            {'type': 'table', 'headers': ['Clé', 'Valeur'],
+             'rows': [('a', '1'), ('b', None), ('c', 'deux\nlignes')]},
+            {'type': 'table', 'headers': ['Destination'], 'rows': [['Crétacé']],
+             'accent': 'emerald'},
+        ]},
+    ]}
+
+
+def test_ir_matches_stream_on_default_report():
+    assert _document_xml(ir_report, default_spec()) == _document_xml(stream_report, default_spec())
+
+
+def test_ir_matches_stream_on_overrides():
+    spec = _overrides_spec()
+    assert _document_xml(ir_report, spec) == _document_xml(stream_report, _overrides_spec())
+
+
+def test_table_accent_colours_the_header():
+    xml = _document_xml(stream_report, _overrides_spec())
+    assert xml.count(b'w:color="00C896"') == 2  # top and bottom borders
+    assert b'<w:color w:val="00C896"/></w:rPr><w:t>Destination</w:t>' in xml
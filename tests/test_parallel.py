@@ -0,0 +1,47 @@
+import io
+
+from report.incremental import build_incremental
+from report.parallel import slices
+
+
+def _spec(rows=None):
+    rows = rows or [[f'TT-{i:05d}', 'Paris 1889', f'Voyageur {i}', f'{i % 7 + 1} 250 €']
+                    for i in range(3000)]
+    intro = [{'type': 'text', 'text': f'Paragraphe {i}'} for i in range(40)]
+    return {'sections': [
+        {'id': 'intro', 'blocks': intro},
+        {'id': 'reservations', 'blocks': [
+            {'type': 'heading', 'text': 'Réservations', 'level': 2},
+            {'type': 'table', 'headers': ['Réservation', 'Destination', 'Voyageur', 'Prix'],
+             'rows': rows},
+            {'type': 'bullet', 'text': 'Fin des réservations'},
+        ]},
+    ]}
+
+
+def _build(jobs, spec=None):
+    buf = io.BytesIO()
+    build_incremental(spec or _spec(), buf, cache=False, jobs=jobs)
+    return buf.getvalue()
+
+
+def _generator_spec():
+    return _spec(iter(_spec()['sections'][1]['blocks'][1]['rows']))
+
+
+def test_large_table_is_split():
+    kinds = [kind for i, (kind, _) in slices(_spec()['sections'], 2) if i == 1]
+    assert kinds.count('rows') >= 2
+
+
+def test_parallel_build_matches_serial_build():
+    assert _build(2) == _build(1)
+
+
+def test_generator_rows_are_split():
+    kinds = [kind for i, (kind, _) in slices(_generator_spec()['sections'], 2) if i == 1]
+    assert kinds.count('rows') >= 2
+
+
+def test_parallel_build_of_generator_rows_matches_serial_build():
+    assert _build(2, _generator_spec()) == _build(1)
@@ -0,0 +1,43 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of report.cli (fresh interpreter, best of RUNS).
+# It is mostly argparse, json and re; python-docx alone takes ~300 ms.
+IMPORT_BUDGET_MS = 100
+RUNS = 3
+
+HEAVY = ('docx', 'lxml', 'PIL', 'fontTools', 'concurrent')
+
+_STARTUP = '''
+import sys
+import report.cli
+from report.spec import validate_spec
+try:
+    report.cli.parse_args(['--help'])
+except SystemExit:
+    pass
+validate_spec({'sections': [{'id': 'a', 'blocks': [{'type': 'text', 'text': 'x'}]}]})
+print('heavy:', *sorted({m.split('.')[0] for m in sys.modules} & set(sys.argv[1:])))
+'''
+
+
+def _python(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True,
+                          check=True)
+
+
+def test_help_and_validation_import_no_heavy_module():
+    out = _python('-c', _STARTUP, *HEAVY).stdout
+    assert out.splitlines()[-1] == 'heavy:'
+
+
+def test_cli_import_time_budget():
+    times = []
+    for _ in range(RUNS):
+        err = _python('-X', 'importtime', '-c', 'import report.cli').stderr
+        times.append(int(re.search(r'\|\s*(\d+) \| report\.cli$', err, re.M).group(1)) / 1000)
+    assert min(times) < IMPORT_BUDGET_MS, f'import report.cli: {min(times):.0f} ms'
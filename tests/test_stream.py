@@ -0,0 +1,89 @@
+import io
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+from report.content import default_spec
+from report.stream import stream_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peak RSS of a fresh interpreter streaming the benchmark report: unlike
+# tracemalloc, it sees what lxml and zlib allocate.
+_PEAK_RSS = '''
+import resource, sys
+sys.path.insert(0, 'benchmarks')
+from bench_stream import _Sink, appendix, bookings
+from report.stream import stream_report
+paragraphs, rows = map(int, sys.argv[1:])
+stream_report({'sections': [
+    {'id': 'appendix', 'blocks': appendix(paragraphs)},
+    {'id': 'bookings', 'blocks': iter([{
+        'type': 'table', 'headers': ['Reservation', 'Destination', 'Voyageur', 'Prix'],
+        'rows': bookings(rows)}])},
+]}, _Sink())
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(peak if sys.platform == 'darwin' else peak * 1024)
+'''
+# Both sizes are past the first row batch and the column sample (tables.py),
+# after which the peak should no longer depend on the length of the report.
+SMALL = (2000, 3000)
+LARGE = (8000, 12000)
+RSS_GROWTH_MB = 4
+
+
+def _failing_blocks():
+    yield {'type': 'text', 'text': 'avant'}
+    raise RuntimeError('rendu interrompu')
+
+
+def _failing_spec():
+    spec = default_spec()
+    spec['sections'].append({'id': 'annexe', 'blocks': _failing_blocks()})
+    return spec
+
+
+def _peak_rss_mb(paragraphs, rows):
+    out = subprocess.run([sys.executable, '-c', _PEAK_RSS, str(paragraphs), str(rows)],
+                         cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return int(out.split()[-1]) / 2**20
+
+
+def test_failed_render_leaves_no_output(tmp_path):
+    out = tmp_path / 'rapport.docx'
+    with pytest.raises(RuntimeError):
+        stream_report(_failing_spec(), str(out))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_render_to_file_object_is_not_a_package():
+    buf = io.BytesIO()
+    with pytest.raises(RuntimeError):
+        stream_report(_failing_spec(), buf)
+    assert not zipfile.is_zipfile(io.BytesIO(buf.getvalue()))
+
+
+def test_stream_report_writes_a_package(tmp_path):
+    out = tmp_path / 'rapport.docx'
+    stream_report(default_spec(), str(out))
+    with zipfile.ZipFile(out) as zf:
+        assert zf.testzip() is None
+        assert b'</w:body></w:document>' in zf.read('word/document.xml')
+
+
+def test_peak_rss_does_not_grow_with_the_report():
+    pytest.importorskip('resource')
+    small, large = _peak_rss_mb(*SMALL), _peak_rss_mb(*LARGE)
+    assert large - small < RSS_GROWTH_MB, f'peak RSS {small:.1f} MiB -> {large:.1f} MiB'
+
+
+def test_optimizer_stats_count_the_bytes_written():
+    buf = io.BytesIO()
+    stats = stream_report(default_spec(), buf, optimize=True)
+    with zipfile.ZipFile(buf) as zf:
+        xml = zf.read('word/document.xml')
+    body = xml[xml.index(b'<w:body>') + len(b'<w:body>'):-len(b'</w:body></w:document>')]
+    assert stats.bytes_after == len(body)